@@ -1,31 +1,84 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from app.models.investment import (
+    BatchSearchResult,
+    InvestmentBatchSearchRequest,
     InvestmentIngestRequest,
     InvestmentSearchRequest,
+    QuantizationProfileRequest,
     SearchResult,
     DocumentType
 )
 from app.services.embeddings import EmbeddingService
 from app.services.qdrant import QdrantService
-from app.services.document_processing import prepare_retrieval_text, validate_document_schema
+from app.services.document_processing import validate_document_schema
+from app.services.ingest import ingest_batch, stream_ingest, to_ndjson
+from app.services.ingest_jobs import IngestJobRunner, IngestJobStore
+from app.services.reranking import build_reranking_service
+from app.services.search_cache import SearchResultCache, search_cache_key
 from app.core.config import settings
-from typing import List, Dict, Any, Optional
+from app.core.metrics import span
+from typing import List, Dict, Any, Optional, Tuple
 
 router = APIRouter()
 
 # Services initialized at startup
 embedding_service = None
 qdrant_service = None
+ingest_job_runner = None
+reranking_service = None
+search_cache = SearchResultCache(
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+)
 
 async def initialize_services():
-    global embedding_service, qdrant_service
+    global embedding_service, qdrant_service, ingest_job_runner, reranking_service
     embedding_service = EmbeddingService()
     qdrant_service = QdrantService()
     await qdrant_service._ensure_collection()
+    ingest_job_runner = IngestJobRunner(
+        IngestJobStore(settings.INGEST_JOBS_PATH),
+        embedding_service,
+        qdrant_service,
+        workers=settings.INGEST_JOB_WORKERS,
+    )
+    await ingest_job_runner.start()
+    reranking_service = build_reranking_service()
+
+async def shutdown_services():
+    if ingest_job_runner is not None:
+        await ingest_job_runner.stop()
+    if reranking_service is not None:
+        reranking_service.shutdown()
+    if qdrant_service is not None:
+        qdrant_service.close()
 
 def get_services():
     return embedding_service, qdrant_service
 
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that may keep reading the request body while it streams.
+
+    Starlette's default response listens for client disconnects by calling
+    `receive()` concurrently, which would consume request body chunks meant
+    for the endpoint, so that listener is dropped. A disconnect instead
+    surfaces as `ClientDisconnect` from `request.stream()` in the ingest
+    reader, which ends the stream once the batch in progress finishes. While
+    the reader is paused for backpressure, a disconnect is noticed only when
+    it resumes, so up to `STREAM_INGEST_QUEUE_BATCHES` buffered batches may
+    still be ingested.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
 @router.post("/documents", response_model=Dict[str, Any])
 async def ingest_documents(request: InvestmentIngestRequest):
     """
@@ -37,7 +90,8 @@ async def ingest_documents(request: InvestmentIngestRequest):
     - content, document_date, source (required)
     - Optional metadata: title, symbols, subsectors, subindustries, etc.
     
-    Uses dense embeddings plus server-side BM25 text for retrieval.
+    Uses dense embeddings plus BM25 sparse vectors for retrieval, encoded by
+    Qdrant's server-side model or the client-side encoder (`BM25_ENCODER`).
     Includes deduplication check to avoid storing similar documents within a date range.
     """
     emb_svc, qdrant_svc = get_services()
@@ -52,104 +106,110 @@ async def ingest_documents(request: InvestmentIngestRequest):
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
     
-    # Prepare enriched texts for embedding
-    retrieval_texts = [prepare_retrieval_text(doc) for doc in documents]
-    
-    # Generate embeddings in batch (with batch size of 50 for optimal performance)
-    batch_embeddings = await emb_svc.embed_documents(retrieval_texts, batch_size=50)
-    
-    # Check for duplicates
-    non_duplicate_docs = []
-    non_duplicate_embeddings = []
-    skipped_count = 0
-    skipped_docs = []
-    
-    for doc, dense_vector in zip(documents, batch_embeddings):
-        # Check if document with same ID already exists
-        existing_doc = await qdrant_svc.retrieve(doc["id"])
-        
-        if existing_doc:
-            # Document with same ID exists, allow update (no deduplication check)
-            non_duplicate_docs.append(doc)
-            non_duplicate_embeddings.append(dense_vector)
-        else:
-            # New document, check for duplicates (only for news type)
-            similar_docs = await qdrant_svc.find_similar_documents(
-                dense_vector=dense_vector,
-                document_date=doc["document_date"],
-                document_type=doc["type"],
-                similarity_threshold=settings.DEDUPLICATION_SIMILARITY_THRESHOLD,
-                date_range_days=settings.DEDUPLICATION_DATE_RANGE_DAYS
-            )
-            
-            if similar_docs:
-                # Skip this document as it's too similar to existing ones
-                skipped_count += 1
-                skipped_docs.append({
-                    "id": doc["id"],
-                    "title": doc.get("title", "No title"),
-                    "similar_to": similar_docs[0]["id"],
-                    "similarity_score": similar_docs[0]["score"]
-                })
-            else:
-                # No similar documents found, include this one
-                non_duplicate_docs.append(doc)
-                non_duplicate_embeddings.append(dense_vector)
-    
-    # Combine embeddings with original document payloads
-    processed_docs = []
-    for doc, dense_vector in zip(non_duplicate_docs, non_duplicate_embeddings):
-        processed_docs.append({
-            "id": doc["id"],
-            "payload": doc,  # Store original structured document
-            "dense_vector": dense_vector,
-            "bm25_text": prepare_retrieval_text(doc),
-        })
-        
-    # Upsert non-duplicate documents to Qdrant
-    if processed_docs:
-        await qdrant_svc.upsert_documents(processed_docs)
-    
+    result = await ingest_batch(emb_svc, qdrant_svc, documents)
+
     response = {
         "status": "success",
-        "count": len(processed_docs),
-        "skipped_count": skipped_count
+        "count": result["count"],
+        "skipped_count": result["skipped_count"]
     }
     
     # Include details about skipped documents if any
-    if skipped_docs:
-        response["skipped_documents"] = skipped_docs
+    if result["skipped_documents"]:
+        response["skipped_documents"] = result["skipped_documents"]
     
     return response
 
-@router.post("/documents/search", response_model=List[SearchResult])
-async def search_documents(request: InvestmentSearchRequest):
+@router.post("/documents/stream")
+async def ingest_documents_stream(
+    request: Request,
+    batch_size: int = Query(default=50, ge=1, le=500),
+):
     """
-    Search for documents using dense + BM25 retrieval with metadata filtering.
+    Ingest newline-delimited JSON documents as they are uploaded.
 
-    Supports filtering by:
-    - symbols: List of symbols
-    - subsectors: List of subsectors
-    - subindustries: List of subindustries
-    - types: List of document types
-    - date_from/date_to: Date range filtering (ISO format)
-    - pure_sector: Filter for documents without symbols (pure sector/market news)
-    - source_names: List of source.name values
-    - include_ids: Only include documents with these IDs (whitelist)
-    - exclude_ids: Exclude documents with these IDs (blacklist)
-    - use_dense: Enable/disable dense vector search (default: true)
-      When false, uses BM25-only retrieval and skips the embedding API call
+    Each line is one document with the same schema as `POST /documents`.
+    Documents are processed in micro-batches of `batch_size`, and each
+    batch's result is streamed back as one NDJSON line:
+    - batch, count, skipped_count, and skipped_documents / errors when present
+
+    A final line carries the totals with `"status": "success"`. Invalid lines
+    are reported in their batch's `errors` instead of failing the upload. If
+    a batch fails to ingest, an error line for it is followed by the totals
+    with `"status": "failed"` and the upload stops; earlier batches are kept.
     """
     emb_svc, qdrant_svc = get_services()
 
-    query_vector = None
-    if request.use_dense:
+    results = stream_ingest(
+        emb_svc,
+        qdrant_svc,
+        request.stream(),
+        batch_size=batch_size,
+    )
+
+    return RequestBodyStreamingResponse(
+        (to_ndjson(result) async for result in results),
+        media_type="application/x-ndjson",
+    )
+
+@router.post("/documents/jobs", response_model=Dict[str, Any], status_code=202)
+async def create_ingest_job(request: InvestmentIngestRequest):
+    """
+    Queue documents for background ingestion.
+
+    Takes the same body as `POST /documents` and returns a job ID immediately.
+    Poll `GET /documents/jobs/{job_id}` for progress.
+    """
+    documents = [doc.model_dump() for doc in request.documents]
+
+    for doc in documents:
         try:
-            query_vector = await emb_svc.embed_query(request.query)
-        except RuntimeError as e:
-            raise HTTPException(status_code=502, detail=str(e))
+            validate_document_schema(doc)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    job_id = await ingest_job_runner.submit(
+        documents, batch_size=settings.INGEST_JOB_BATCH_SIZE
+    )
+
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "total_documents": len(documents),
+    }
+
+@router.get("/documents/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_ingest_job(job_id: str):
+    """
+    Report an ingest job's status, progress, skipped duplicates and throughput.
+    """
+    job = await asyncio.to_thread(ingest_job_runner.store.get_job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+@router.post("/documents/jobs/{job_id}/resume", response_model=Dict[str, Any])
+async def resume_ingest_job(job_id: str):
+    """
+    Requeue a failed ingest job from its first uncommitted batch.
+
+    Batches committed before the failure are not ingested again.
+    """
+    if not await ingest_job_runner.resume(job_id):
+        job = await asyncio.to_thread(ingest_job_runner.store.get_job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only failed jobs can be resumed; job is {job['status']}",
+        )
+
+    return await asyncio.to_thread(ingest_job_runner.store.get_job, job_id)
 
-    # Build filter from request parameters
+def search_filters(request: InvestmentSearchRequest) -> Dict[str, Any]:
+    """Build the `build_filter` input from a search request's filter fields."""
     filters = {}
     if request.symbols:
         filters['symbols'] = request.symbols
@@ -171,17 +231,123 @@ async def search_documents(request: InvestmentSearchRequest):
         filters['include_ids'] = request.include_ids
     if request.exclude_ids:
         filters['exclude_ids'] = request.exclude_ids
+    return filters
+
+def requested_search_params(request: InvestmentSearchRequest) -> Dict[str, Any]:
+    """The request's explicit dense search knobs, for cache keys."""
+    return {
+        "hnsw_ef": request.hnsw_ef,
+        "exact": request.exact,
+        "indexed_only": request.indexed_only,
+    }
+
+def dense_search_params(
+    qdrant_svc: QdrantService,
+    request: InvestmentSearchRequest,
+    filters: Dict[str, Any],
+):
+    """Dense search params for a request; `exact` defaults from filter selectivity."""
+    exact = request.exact
+    if exact is None:
+        exact = qdrant_svc.prefers_exact_search(filters)
+    return qdrant_svc.dense_search_params(
+        hnsw_ef=request.hnsw_ef,
+        exact=exact,
+        indexed_only=request.indexed_only,
+    )
+
+def use_reranker(request: InvestmentSearchRequest) -> bool:
+    return reranking_service is not None and request.rerank is not False
+
+async def rerank_hits(
+    request: InvestmentSearchRequest,
+    query_vector: Optional[List[float]],
+    candidates: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Rerank first-stage candidates; returns hits and whether reranking completed."""
+    with span("rerank"):
+        hits, reranked = await reranking_service.rerank(
+            request.query,
+            query_vector,
+            candidates,
+            limit=request.limit,
+            budget_ms=request.rerank_budget_ms,
+        )
+    # Vectors were only fetched for the scorer
+    return [{k: v for k, v in hit.items() if k != "vector"} for hit in hits], reranked
+
+@router.post("/documents/search", response_model=List[SearchResult])
+async def search_documents(request: InvestmentSearchRequest):
+    """
+    Search for documents using dense + BM25 retrieval with metadata filtering.
+
+    Supports filtering by:
+    - symbols: List of symbols
+    - subsectors: List of subsectors
+    - subindustries: List of subindustries
+    - types: List of document types
+    - date_from/date_to: Date range filtering (ISO format)
+    - pure_sector: Filter for documents without symbols (pure sector/market news)
+    - source_names: List of source.name values
+    - include_ids: Only include documents with these IDs (whitelist)
+    - exclude_ids: Exclude documents with these IDs (blacklist)
+    - use_dense: Enable/disable dense vector search (default: true)
+      When false, uses BM25-only retrieval and skips the embedding API call
+    - rerank / rerank_budget_ms: With a reranker configured, the top
+      prefetch-size candidates are reordered by it. If it misses the budget,
+      the first-stage order is returned.
+    - hnsw_ef / exact / indexed_only: Dense search knobs. Without `exact`,
+      very selective filters (few include_ids, a narrow date range) use
+      exact search.
+
+    Results are cached for SEARCH_CACHE_TTL_SECONDS; any upsert or delete
+    invalidates them.
+    """
+    emb_svc, qdrant_svc = get_services()
 
-    query_filter = qdrant_svc.build_filter(filters) if filters else None
+    filters = search_filters(request)
 
-    # Search with filter
-    results = await qdrant_svc.search(
-        query_text=request.query,
-        query_vector=query_vector,
-        limit=request.limit,
-        query_filter=query_filter,
-        use_dense=request.use_dense
+    rerank = use_reranker(request)
+    cache_key = search_cache_key(
+        request.query,
+        filters,
+        request.limit,
+        request.use_dense,
+        generation=qdrant_svc.generation,
+        reference_time=qdrant_svc.reference_time(),
+        rerank=rerank,
+        search_params=requested_search_params(request),
     )
+    results = search_cache.get(cache_key) if search_cache.enabled else None
+
+    if results is None:
+        query_vector = None
+        if request.use_dense:
+            try:
+                query_vector = await emb_svc.embed_query(request.query)
+            except RuntimeError as e:
+                raise HTTPException(status_code=502, detail=str(e))
+
+        query_filter = qdrant_svc.build_filter(filters) if filters else None
+
+        # Search with filter; a reranker gets the full prefetch-size candidate set
+        results = await qdrant_svc.search(
+            query_text=request.query,
+            query_vector=query_vector,
+            limit=qdrant_svc.prefetch_limit(request.limit) if rerank else request.limit,
+            query_filter=query_filter,
+            use_dense=request.use_dense,
+            with_vectors=rerank and reranking_service.scorer.needs_vectors,
+            search_params=dense_search_params(qdrant_svc, request, filters),
+        )
+
+        cacheable = True
+        if rerank:
+            results, cacheable = await rerank_hits(request, query_vector, results)
+        if cacheable:
+            search_cache.put(
+                cache_key, results, last_write_at=qdrant_svc.last_write_at
+            )
 
     return [
         SearchResult(
@@ -192,6 +358,119 @@ async def search_documents(request: InvestmentSearchRequest):
         for point in results
     ]
 
+@router.post("/documents/search/batch", response_model=List[BatchSearchResult])
+async def search_documents_batch(request: InvestmentBatchSearchRequest):
+    """
+    Run several searches in one call.
+
+    Each entry in `queries` takes the same fields as `POST /documents/search`.
+    Queries not answered by the search cache are embedded together in one
+    request and run through a single Qdrant `query_batch_points` call.
+    Results come back per query, in request order.
+
+    With `dedupe`, a document retrieved by several queries is only returned
+    under the first of them.
+    """
+    emb_svc, qdrant_svc = get_services()
+
+    generation = qdrant_svc.generation
+    reference_time = qdrant_svc.reference_time()
+    filters = [search_filters(search) for search in request.queries]
+    reranks = [use_reranker(search) for search in request.queries]
+    cache_keys = [
+        search_cache_key(
+            search.query,
+            search_filter,
+            search.limit,
+            search.use_dense,
+            generation=generation,
+            reference_time=reference_time,
+            rerank=rerank,
+            search_params=requested_search_params(search),
+        )
+        for search, search_filter, rerank in zip(request.queries, filters, reranks)
+    ]
+    results = [
+        search_cache.get(cache_key) if search_cache.enabled else None
+        for cache_key in cache_keys
+    ]
+    pending = [index for index, result in enumerate(results) if result is None]
+
+    if pending:
+        dense_queries = [
+            request.queries[index].query
+            for index in pending
+            if request.queries[index].use_dense
+        ]
+        query_vectors = {}
+        if dense_queries:
+            try:
+                query_vectors = dict(zip(
+                    dense_queries, await emb_svc.embed_queries(dense_queries)
+                ))
+            except RuntimeError as e:
+                raise HTTPException(status_code=502, detail=str(e))
+
+        searches = []
+        for index in pending:
+            search = request.queries[index]
+            searches.append({
+                "query_text": search.query,
+                "query_vector": query_vectors.get(search.query)
+                if search.use_dense else None,
+                "limit": qdrant_svc.prefetch_limit(search.limit)
+                if reranks[index] else search.limit,
+                "query_filter": qdrant_svc.build_filter(filters[index])
+                if filters[index] else None,
+                "use_dense": search.use_dense,
+                "with_vectors": reranks[index] and reranking_service.scorer.needs_vectors,
+                "search_params": dense_search_params(qdrant_svc, search, filters[index]),
+            })
+        fetched = await qdrant_svc.search_batch(searches)
+
+        outcomes = {index: (points, True) for index, points in zip(pending, fetched)}
+        # Rerank the queries that asked for it concurrently
+        to_rerank = [
+            (index, search["query_vector"], points)
+            for index, search, points in zip(pending, searches, fetched)
+            if reranks[index]
+        ]
+        reranked = await asyncio.gather(*(
+            rerank_hits(request.queries[index], query_vector, points)
+            for index, query_vector, points in to_rerank
+        ))
+        for (index, _, _), outcome in zip(to_rerank, reranked):
+            outcomes[index] = outcome
+
+        for index, (points, cacheable) in outcomes.items():
+            results[index] = points
+            if cacheable:
+                search_cache.put(
+                    cache_keys[index], points, last_write_at=qdrant_svc.last_write_at
+                )
+
+    seen_ids = set()
+    response = []
+    for search, points in zip(request.queries, results):
+        if request.dedupe:
+            points = [point for point in points if str(point["id"]) not in seen_ids]
+            seen_ids.update(str(point["id"]) for point in points)
+        response.append(
+            BatchSearchResult(
+                query=search.query,
+                results=[
+                    SearchResult(
+                        id=str(point["id"]),
+                        score=point["score"],
+                        payload=point["payload"]
+                    )
+                    for point in points
+                ],
+            )
+        )
+
+    return response
+
 @router.get("/documents/{document_id}", response_model=Dict[str, Any])
 async def get_document(document_id: str):
     """
@@ -223,7 +502,15 @@ async def delete_document(document_id: str):
 @router.get("/documents", response_model=Dict[str, Any])
 async def list_documents(
     limit: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque cursor from the previous page's next_cursor"
+    ),
     offset: Optional[int] = Query(default=None, ge=0),
+    include_total: bool = Query(
+        default=True,
+        description="Include total_count (cached per filter for a short TTL)"
+    ),
     symbols: Optional[List[str]] = Query(default=None),
     subsectors: Optional[List[str]] = Query(default=None),
     subindustries: Optional[List[str]] = Query(default=None),
@@ -257,7 +544,12 @@ async def list_documents(
 
     Pagination:
     - limit: Number of results per page (1-100)
-    - offset: Numeric pagination offset from previous response's next_page_offset (default: 0)
+    - cursor: Pass the previous response's next_cursor to get the next page;
+      next_cursor is null on the last page. Cost per page does not grow with depth.
+    - offset: Legacy numeric offset (default: 0). Deep offsets get slower and
+      the response has no next_cursor; prefer cursor.
+    - include_total: Set to false to skip total_count. The count is exact but
+      cached per filter for LIST_COUNT_CACHE_TTL_SECONDS.
     """
     _, qdrant_svc = get_services()
     
@@ -286,14 +578,26 @@ async def list_documents(
 
     scroll_filter = qdrant_svc.build_filter(filters) if filters else None
     
-    # Scroll with filter
-    result = await qdrant_svc.scroll(
-        limit=limit,
-        offset=offset,
-        scroll_filter=scroll_filter
-    )
-    
-    return result
+    if offset is not None:
+        if cursor:
+            raise HTTPException(
+                status_code=400, detail="Use either cursor or offset, not both"
+            )
+        return await qdrant_svc.scroll(
+            limit=limit,
+            offset=offset,
+            scroll_filter=scroll_filter
+        )
+
+    try:
+        return await qdrant_svc.scroll_page(
+            limit=limit,
+            cursor=cursor,
+            scroll_filter=scroll_filter,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/sources", response_model=List[str])
 async def list_source_names():
@@ -311,6 +615,68 @@ async def list_source_names():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/admin/embedding-cache", response_model=Dict[str, Any])
+async def embedding_cache_stats():
+    """
+    Report embedding cache size and hit-rate counters since startup.
+    """
+    emb_svc, _ = get_services()
+    return emb_svc.cache_stats()
+
+@router.get("/admin/search-cache", response_model=Dict[str, Any])
+async def search_cache_stats():
+    """
+    Report search result cache size and hit-rate counters since startup.
+    """
+    _, qdrant_svc = get_services()
+    stats = {**search_cache.stats(), "generation": qdrant_svc.generation}
+    if qdrant_svc.sparse_encoder is not None:
+        stats["bm25_encoder"] = qdrant_svc.sparse_encoder.stats()
+    return stats
+
+@router.get("/admin/reranker", response_model=Dict[str, Any])
+async def reranker_stats():
+    """
+    Report the configured reranker and how often it met its latency budget.
+    """
+    if reranking_service is None:
+        return {"scorer": "none"}
+    return reranking_service.stats()
+
+@router.get("/admin/quantization", response_model=Dict[str, Any])
+async def quantization_report(
+    probe_queries: int = Query(
+        0,
+        ge=0,
+        le=50,
+        description="Time this many dense searches with and without quantization",
+    ),
+):
+    """
+    Report the active quantization profile and each profile's memory cost.
+
+    Per profile: RAM held by quantized vectors, oversampling, and how many
+    original vectors a dense prefetch rescores from disk.
+    """
+    _, qdrant_svc = get_services()
+    return await qdrant_svc.quantization_report(probe_queries=probe_queries)
+
+@router.post("/admin/quantization", response_model=Dict[str, Any])
+async def set_quantization_profile(request: QuantizationProfileRequest):
+    """
+    Switch the dense vector quantization profile (none, scalar or binary).
+
+    Qdrant rebuilds quantized vectors in the background; check
+    `optimizer_status` in the report to see when it is done.
+    """
+    _, qdrant_svc = get_services()
+
+    try:
+        await qdrant_svc.set_quantization_profile(request.profile.value)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return await qdrant_svc.quantization_report()
+
 @router.post("/admin/enable-indexing")
 async def enable_indexing():
     """
@@ -12,9 +12,76 @@ class Settings(BaseSettings):
     
     # API Keys
     OPENROUTER_API_KEY: str | None = None
+
+    # Embedding requests
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_RATE_LIMIT_RETRIES: int = 5
+
+    # Embedding cache (empty path disables it)
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100_000
+    QUERY_EMBEDDING_LRU_SIZE: int = 4096
     
     # Deduplication settings
     DEDUPLICATION_SIMILARITY_THRESHOLD: float = 0.87
     DEDUPLICATION_DATE_RANGE_DAYS: int = 7
 
+    # Dense vector quantization profile for new collections: none, scalar
+    # (int8) or binary. Existing collections switch via POST /admin/quantization.
+    # Oversampling 0 uses the profile's default.
+    QUANTIZATION_PROFILE: str = "none"
+    QUANTIZATION_OVERSAMPLING: float = 0.0
+    QUANTIZATION_RESCORE: bool = True
+
+    # Exact dense search is used when filters are this selective, unless a
+    # request sets `exact` itself
+    EXACT_SEARCH_MAX_IDS: int = 1000
+    EXACT_SEARCH_MAX_DATE_RANGE_DAYS: int = 14
+
+    # Collection partitioning for new collections: none, type_tenant (is_tenant
+    # index on `type`) or month_shards (custom shard key per document month)
+    COLLECTION_PARTITIONING: str = "none"
+
+    # BM25 sparse encoding: server (Qdrant's qdrant/bm25 model) or client
+    # (local encoder in a process pool). Changing it requires reindexing.
+    BM25_ENCODER: str = "server"
+    BM25_ENCODER_WORKERS: int = 2
+    BM25_AVG_DOC_LENGTH: float = 256.0
+    BM25_QUERY_CACHE_SIZE: int = 4096
+
+    # Chunked indexing: long content is split into overlapping chunks, each
+    # its own point, and search groups hits back to documents. Changing this
+    # requires reindexing the collection.
+    CHUNK_INDEXING: bool = False
+    CHUNK_SIZE_CHARS: int = 1500
+    CHUNK_OVERLAP_CHARS: int = 200
+
+    # Payload storage: full (content stored and text-indexed as is) or compact
+    # (content stored zlib-compressed, not text-indexed and not boosted)
+    PAYLOAD_MODE: str = "full"
+
+    # Search result cache (0 disables it)
+    SEARCH_CACHE_TTL_SECONDS: int = 300
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+
+    # Second-stage reranking: none, linear or cross-encoder
+    RERANKER: str = "none"
+    RERANKER_BUDGET_MS: int = 150
+    RERANKER_WORKERS: int = 2
+    RERANKER_LINEAR_WEIGHTS_PATH: str = ""
+    RERANKER_CROSS_ENCODER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+    # GET /documents total_count reuse per filter
+    LIST_COUNT_CACHE_TTL_SECONDS: int = 60
+
+    # Streaming ingest: parsed batches buffered ahead of embedding/upsert
+    STREAM_INGEST_QUEUE_BATCHES: int = 2
+    # Longer lines are reported as errors and skipped, unbuffered
+    STREAM_INGEST_MAX_LINE_BYTES: int = 1_048_576
+
+    # Background ingest jobs
+    INGEST_JOBS_PATH: str = "data/ingest_jobs.sqlite3"
+    INGEST_JOB_WORKERS: int = 1
+    INGEST_JOB_BATCH_SIZE: int = 50
+
 settings = Settings()
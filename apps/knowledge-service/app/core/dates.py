@@ -0,0 +1,84 @@
+"""
+`document_date` parsing and normalization.
+
+Shared by the request models, which normalize dates at validation, and the
+services, which compare, bucket and filter on them.
+"""
+
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+# Non-ISO formats accepted at ingest, by separator layout. Numeric dates
+# with the year last are read day-first, falling back to month-first.
+YEAR_FIRST_DATE = re.compile(
+    r"(\d{4})([/-])(\d{1,2})\2(\d{1,2})(?:[ T](\d{1,2}):(\d{2}):(\d{2}))?"
+)
+YEAR_LAST_DATE = re.compile(
+    r"(\d{1,2})([/-])(\d{1,2})\2(\d{4})(?: (\d{1,2}):(\d{2}):(\d{2}))?"
+)
+
+
+@lru_cache(maxsize=65536)
+def parse_document_date(document_date: str) -> datetime:
+    """
+    Parse the `document_date` formats accepted at ingest.
+
+    ISO 8601 goes through `datetime.fromisoformat`; anything else is matched
+    against the separator layouts above instead of trying formats in turn.
+    Results are memoized, since feeds repeat the same dates.
+    """
+    try:
+        return datetime.fromisoformat(document_date)
+    except ValueError:
+        pass
+
+    match = YEAR_FIRST_DATE.fullmatch(document_date)
+    if match:
+        year, _, month, day, *time = match.groups()
+        candidates = [(year, month, day)]
+    else:
+        match = YEAR_LAST_DATE.fullmatch(document_date)
+        if not match:
+            raise ValueError(f"Unable to parse date: {document_date}")
+        first, _, second, year, *time = match.groups()
+        candidates = [(year, second, first), (year, first, second)]
+
+    clock = [int(part) for part in time] if time[0] is not None else []
+    for year, month, day in candidates:
+        try:
+            return datetime(int(year), int(month), int(day), *clock)
+        except ValueError:
+            continue
+    raise ValueError(f"Unable to parse date: {document_date}")
+
+
+@lru_cache(maxsize=65536)
+def normalize_document_date(document_date: str) -> str:
+    """
+    Canonical RFC 3339 form of a `document_date`, as stored in payloads.
+
+    Naive values are read as UTC; explicit offsets are kept, so the date
+    part stays the publisher's local date.
+
+    Raises:
+        ValueError: If the date cannot be parsed
+    """
+    parsed = parse_document_date(document_date)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    timespec = "microseconds" if parsed.microsecond else "seconds"
+    normalized = parsed.isoformat(timespec=timespec)
+    if normalized.endswith("+00:00"):
+        normalized = normalized[: -len("+00:00")] + "Z"
+    return normalized
+
+
+def document_timestamp(document_date: str) -> float:
+    """Epoch seconds of a `document_date`, reading naive values as UTC."""
+    parsed = parse_document_date(document_date)
+    if parsed.tzinfo is None:
+        # Qdrant reads naive datetimes as UTC
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
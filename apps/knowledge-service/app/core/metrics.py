@@ -0,0 +1,97 @@
+"""
+Prometheus latency metrics.
+
+`MetricsMiddleware` times every request by route template. Code on the
+request path marks its stages with `span(...)`, which are recorded under the
+route that is being served, so a route's latency can be broken down into
+embedding, Qdrant calls and deduplication. Work outside a request (startup,
+background ingest jobs) is recorded under the route `background`.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from prometheus_client import Histogram
+from starlette.routing import Match
+
+# Seconds; spans range from sub-millisecond Qdrant lookups to multi-second
+# embedding batches
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+BACKGROUND_ROUTE = "background"
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "knowledge_service_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status_code"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "knowledge_service_stage_duration_seconds",
+    "Latency of request stages (embedding, Qdrant calls, deduplication) by route",
+    ["route", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+current_route: ContextVar[str] = ContextVar("current_route", default=BACKGROUND_ROUTE)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Record the duration of the enclosed block as `stage` of the current route."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(current_route.get(), stage).observe(
+            time.perf_counter() - started
+        )
+
+
+def _route_template(app, scope) -> str:
+    """The matched route's path template, so path parameters don't become labels."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency.
+
+    Timed until the response body has been sent, so streaming responses
+    count in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = _route_template(scope["app"], scope)
+        token = current_route.set(route)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(scope["method"], route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            current_route.reset(token)
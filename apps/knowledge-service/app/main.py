@@ -1,7 +1,9 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.core.config import settings
-from app.api.routes import router as api_router, initialize_services
+from app.core.metrics import MetricsMiddleware
+from app.api.routes import router as api_router, initialize_services, shutdown_services
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -10,19 +12,25 @@ async def lifespan(app: FastAPI):
     await initialize_services()
     print("Services initialized successfully")
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop ingest job workers; unfinished jobs resume on next start
+    await shutdown_services()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(api_router)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
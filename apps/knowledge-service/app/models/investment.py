@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
+from app.core.dates import normalize_document_date
+
 
 class DocumentType(str, Enum):
     """Document type enum for investment documents."""
@@ -11,6 +13,13 @@ class DocumentType(str, Enum):
     RUMOUR = "rumour"
 
 
+class QuantizationProfile(str, Enum):
+    """Dense vector quantization profiles."""
+    NONE = "none"
+    SCALAR = "scalar"
+    BINARY = "binary"
+
+
 class InvestmentDocument(BaseModel):
     """
     Investment document model matching the Qdrant schema design.
@@ -24,7 +33,10 @@ class InvestmentDocument(BaseModel):
     # Temporal Fields (Required)
     document_date: str = Field(
         ...,
-        description="ISO 8601 format: '2025-10-31' (date only) or '2025-10-31T14:30:00+07:00' (datetime)"
+        description=(
+            "ISO 8601 format: '2025-10-31' (date only) or '2025-10-31T14:30:00+07:00' (datetime). "
+            "Stored normalized to RFC 3339, e.g. '2025-10-31T00:00:00Z'"
+        )
     )
     
     # Source Fields (Required)
@@ -58,6 +70,12 @@ class InvestmentDocument(BaseModel):
         description="Relevant indices: 'IHSG', 'LQ45', 'IDX30', etc."
     )
 
+    @field_validator("document_date")
+    @classmethod
+    def normalize_date(cls, value: str) -> str:
+        """Store one canonical format, so date filters and windows compare cleanly."""
+        return normalize_document_date(value)
+
     def model_dump(self, **kwargs) -> Dict[str, Any]:
         """Override to exclude None values from output."""
         data = super().model_dump(**kwargs)
@@ -81,6 +99,34 @@ class InvestmentSearchRequest(BaseModel):
         description="Use dense vector search with hybrid fusion. "
                     "When false, use BM25 only and skip the embedding API call."
     )
+    rerank: Optional[bool] = Field(
+        default=None,
+        description="Rerank candidates with the configured reranker. "
+                    "Defaults to on when a reranker is configured."
+    )
+    rerank_budget_ms: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=10000,
+        description="Reranking latency budget; over budget keeps the first-stage order"
+    )
+    hnsw_ef: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=4096,
+        description="HNSW search beam for the dense retriever; higher trades "
+                    "latency for recall. Defaults to the collection's ef."
+    )
+    exact: Optional[bool] = Field(
+        default=None,
+        description="Exact dense search instead of HNSW. Defaults to on when the "
+                    "filters are very selective (few include_ids or a narrow date range)."
+    )
+    indexed_only: bool = Field(
+        default=False,
+        description="Skip segments not yet indexed, for bounded latency during "
+                    "heavy ingest; recent documents may be missing."
+    )
 
     # Metadata filters (all optional)
     symbols: Optional[List[str]] = Field(
@@ -125,8 +171,34 @@ class InvestmentSearchRequest(BaseModel):
     )
 
 
+class InvestmentBatchSearchRequest(BaseModel):
+    """Several searches answered with one embedding call and one Qdrant round-trip."""
+    queries: List[InvestmentSearchRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=50,
+        description="Searches to run, each with its own filters and limit"
+    )
+    dedupe: bool = Field(
+        default=False,
+        description="Return each document only under the first query (in request "
+                    "order) that retrieved it"
+    )
+
+
+class QuantizationProfileRequest(BaseModel):
+    """Switch the collection's dense vector quantization profile."""
+    profile: QuantizationProfile = Field(..., description="Profile to switch to")
+
+
 class SearchResult(BaseModel):
     """Search result model."""
     id: str
     score: float
     payload: Dict[str, Any]
+
+
+class BatchSearchResult(BaseModel):
+    """Results of one query within a batch search."""
+    query: str
+    results: List[SearchResult]
@@ -1,6 +1,10 @@
 """Document processing utilities for investment documents."""
 
-from typing import Dict, Any
+from typing import Any, Collection, Dict, List, Sequence
+
+import numpy as np
+
+from app.core.dates import document_timestamp
 
 
 def prepare_retrieval_text(doc: Dict[str, Any]) -> str:
@@ -57,8 +61,10 @@ def prepare_retrieval_text(doc: Dict[str, Any]) -> str:
     if doc.get('indices'):
         parts.append(f"Markets: {', '.join(doc['indices'])}")
     
-    # 6. Temporal context
-    parts.append(f"Date: {doc['document_date']}")
+    # 6. Temporal context: the date part of the normalized `document_date`,
+    # the same text a date-only input always produced. Inputs with a time
+    # of day used to embed it too, so those re-embed when re-ingested.
+    parts.append(f"Date: {doc['document_date'][:10]}")
     
     # 7. Document type
     doc_type = doc['type'].replace('_', ' ').title()
@@ -81,6 +87,48 @@ def prepare_bm25_text(doc: Dict[str, Any]) -> str:
     return prepare_retrieval_text(doc)
 
 
+CHUNK_BREAKS = ("\n\n", "\n", ". ", " ")
+
+
+def split_content_chunks(content: str, chunk_size: int, overlap: int) -> List[str]:
+    """
+    Split content into overlapping chunks of at most `chunk_size` characters.
+
+    Chunks end at the last paragraph, line, sentence or word break in their
+    second half when there is one, and each chunk repeats roughly the last
+    `overlap` characters of the previous one. Content that fits in one chunk
+    is returned as is.
+    """
+    content = content.strip()
+    if len(content) <= chunk_size:
+        return [content]
+
+    chunks = []
+    start = 0
+    while start < len(content):
+        end = min(start + chunk_size, len(content))
+        if end < len(content):
+            window = content[start:end]
+            for separator in CHUNK_BREAKS:
+                cut = window.rfind(separator, chunk_size // 2)
+                if cut != -1:
+                    end = start + cut + len(separator)
+                    break
+
+        chunk = content[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(content):
+            break
+
+        # Step back by the overlap, then forward to the next word start
+        next_start = max(end - overlap, start + 1)
+        space = content.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+
+    return chunks
+
+
 def validate_document_schema(doc: Dict[str, Any]) -> bool:
     """
     Validate that a document has the required fields.
@@ -110,3 +158,66 @@ def validate_document_schema(doc: Dict[str, Any]) -> bool:
         raise ValueError(f"Source must be a dict, got {type(doc['source'])}")
     
     return True
+
+
+def find_batch_duplicates(
+    documents: Sequence[Dict[str, Any]],
+    dense_vectors: Sequence[List[float]],
+    similarity_threshold: float,
+    date_range_days: int,
+    exempt: Collection[int] = (),
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Find near-duplicate news documents within a single ingest batch.
+
+    Applies the same rule as the Qdrant-side check (dense cosine similarity at
+    or above the threshold, document dates within the window) to every pair
+    of news documents in the batch. Documents are kept in input order; a
+    later document is a duplicate if it matches an earlier kept one.
+    Documents in `exempt` (e.g. updates of stored IDs) are never dropped but
+    still count as kept.
+
+    Args:
+        documents: Documents in ingest order
+        dense_vectors: Dense vectors aligned with `documents`
+        similarity_threshold: Minimum cosine similarity to count as duplicate
+        date_range_days: Maximum distance between document dates, in days
+        exempt: Indices that must not be reported as duplicates
+
+    Returns:
+        Mapping of duplicate index to {"index": kept index, "score": similarity}
+    """
+    news = [index for index, doc in enumerate(documents) if doc["type"] == "news"]
+    if len(news) < 2:
+        return {}
+
+    matrix = np.asarray([dense_vectors[index] for index in news], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    similarity = matrix @ matrix.T
+
+    timestamps = np.array(
+        [document_timestamp(documents[index]["document_date"]) for index in news]
+    )
+    in_window = (
+        np.abs(timestamps[:, None] - timestamps[None, :])
+        <= date_range_days * 24 * 60 * 60
+    )
+    candidates = (similarity >= similarity_threshold) & in_window
+
+    duplicates: Dict[int, Dict[str, Any]] = {}
+    kept = np.zeros(len(news), dtype=bool)
+    for row, index in enumerate(news):
+        earlier = np.flatnonzero(candidates[row, :row] & kept[:row])
+        if earlier.size and index not in exempt:
+            best = earlier[np.argmax(similarity[row, earlier])]
+            duplicates[index] = {
+                "index": news[best],
+                "score": float(similarity[row, best]),
+            }
+        else:
+            kept[row] = True
+
+    return duplicates
+
@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache with LRU eviction by entry count.
+
+    Entries are keyed by sha256 over (model, dimension, is_query, text) and
+    vectors are stored as float16, the same precision the collection keeps.
+    Access order is tracked with a monotonically increasing counter so
+    eviction drops the least recently read or written entries first.
+    """
+
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._clock = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @staticmethod
+    def key(model: str, dimension: int, is_query: bool, text: str) -> str:
+        payload = [model, dimension, is_query, text]
+        return hashlib.sha256(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def quantize(vector: Sequence[float]) -> List[float]:
+        """Round a vector to the float16 precision it is stored with."""
+        return np.asarray(vector, dtype=np.float16).astype(np.float32).tolist()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for `keys`, marking them as recently used."""
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for start in range(0, len(unique_keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = unique_keys[start : start + self.LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? "
+                        f"WHERE key IN ({','.join('?' * len(rows))})",
+                        [self._tick(), *(key for key, _ in rows)],
+                    )
+            self._conn.commit()
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, vectors: Dict[str, List[float]]):
+        """Store vectors and evict least recently used entries over the limit."""
+        if not vectors:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float16).tobytes(), self._tick())
+                    for key, vector in vectors.items()
+                ],
+            )
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            entries = self._count()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SingleFlightLRU:
+    """
+    In-process LRU of vectors with single-flight loading.
+
+    Concurrent lookups of the same missing key share one in-flight load.
+    The load runs as its own task, so a cancelled caller (e.g. a dropped
+    HTTP request) does not cancel it for the others. Failed loads are not
+    cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Task[List[float]]"] = {}
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[List[float]]],
+    ) -> List[float]:
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector.tolist()
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, load))
+            # Mark the error retrieved even if every caller was cancelled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def peek(self, key: str) -> Optional[List[float]]:
+        """Return a cached vector without loading, counting hit or miss."""
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector.tolist()
+
+    def put(self, key: str, vector: List[float]):
+        if not self.max_entries:
+            return
+        self._entries[key] = np.asarray(vector, dtype=np.float32)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[List[float]]],
+    ) -> List[float]:
+        try:
+            vector = await load()
+        finally:
+            self._in_flight.pop(key, None)
+
+        self.put(key, vector)
+        return vector
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "hit_rate": (
+                round((self.hits + self.coalesced) / lookups, 4) if lookups else None
+            ),
+        }
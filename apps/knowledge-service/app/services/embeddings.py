@@ -1,14 +1,54 @@
-from typing import List
+import asyncio
+import random
+from typing import Any, Dict, List, Optional
 
 from openrouter import OpenRouter
-from openrouter.errors import ResponseValidationError
+from openrouter.errors import ResponseValidationError, TooManyRequestsResponseError
 
 from app.core.config import settings
+from app.core.metrics import span
+from app.services.embedding_cache import EmbeddingCache, SingleFlightLRU
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps in-flight requests at a limit that adapts to rate limiting.
+
+    The limit halves whenever a request is throttled and grows back by one
+    after `limit` consecutive successes, never exceeding `max_in_flight`.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self.limit = self.max_in_flight
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, *, throttled: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self.limit < self.max_in_flight and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
 
 
 class EmbeddingService:
     DENSE_MODEL: str = "qwen/qwen3-embedding-8b"
     DENSE_DIMENSION: int = 1024
+    RATE_LIMIT_BACKOFF_SECONDS: float = 1.0
+    RATE_LIMIT_BACKOFF_MAX_SECONDS: float = 30.0
 
     def __init__(self):
         if not settings.OPENROUTER_API_KEY:
@@ -16,6 +56,15 @@ class EmbeddingService:
 
         print("Loading dense embedding service...")
         self.openrouter_client = OpenRouter(api_key=settings.OPENROUTER_API_KEY)
+        self.limiter = AdaptiveConcurrencyLimiter(settings.EMBEDDING_MAX_CONCURRENCY)
+        self.max_rate_limit_retries = settings.EMBEDDING_RATE_LIMIT_RETRIES
+        self.cache: Optional[EmbeddingCache] = None
+        if settings.EMBEDDING_CACHE_PATH:
+            self.cache = EmbeddingCache(
+                settings.EMBEDDING_CACHE_PATH,
+                max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        self.query_lru = SingleFlightLRU(settings.QUERY_EMBEDDING_LRU_SIZE)
         print("Dense embedding service loaded.")
 
     async def _embed_dense_batch(
@@ -49,20 +98,172 @@ class EmbeddingService:
 
         return [item.embedding for item in result.data]
 
+    async def _embed_with_backoff(
+        self,
+        texts: List[str],
+        *,
+        is_query: bool,
+    ) -> List[List[float]]:
+        """Embed one batch under the concurrency limiter, backing off on 429s."""
+        for attempt in range(self.max_rate_limit_retries + 1):
+            await self.limiter.acquire()
+            throttled = False
+            try:
+                return await self._embed_dense_batch(texts, is_query=is_query)
+            except TooManyRequestsResponseError as e:
+                throttled = True
+                if attempt == self.max_rate_limit_retries:
+                    raise RuntimeError(
+                        f"OpenRouter embeddings API rate limited model "
+                        f"'{self.DENSE_MODEL}' after {attempt + 1} attempts: {e}"
+                    ) from e
+                delay = self._rate_limit_delay(e, attempt)
+            finally:
+                await self.limiter.release(throttled=throttled)
+
+            print(
+                f"Embedding request rate limited, retrying in {delay:.1f}s "
+                f"(concurrency limit {self.limiter.limit})"
+            )
+            await asyncio.sleep(delay)
+
+    def _rate_limit_delay(
+        self,
+        error: TooManyRequestsResponseError,
+        attempt: int,
+    ) -> float:
+        retry_after = self._retry_after_seconds(error)
+        if retry_after is None:
+            retry_after = self.RATE_LIMIT_BACKOFF_SECONDS * (2 ** attempt)
+            retry_after += random.uniform(0, self.RATE_LIMIT_BACKOFF_SECONDS)
+        return min(retry_after, self.RATE_LIMIT_BACKOFF_MAX_SECONDS)
+
+    @staticmethod
+    def _retry_after_seconds(error: TooManyRequestsResponseError) -> Optional[float]:
+        try:
+            return max(0.0, float(error.headers.get("retry-after")))
+        except (TypeError, ValueError):
+            return None
+
     async def embed_query(self, text: str) -> List[float]:
-        return (await self._embed_dense_batch([text], is_query=True))[0]
+        """
+        Embed a search query.
+
+        Hot queries are served from an in-process LRU, and concurrent
+        identical queries share a single embedding call.
+        """
+
+        async def load() -> List[float]:
+            return (await self._embed_cached([text], is_query=True, batch_size=1))[0]
+
+        with span("embed_query"):
+            return await self.query_lru.get_or_load(text, load)
+
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several search queries with at most one embedding request.
+
+        Queries already in the in-process LRU are served from it; the rest
+        go out together (through the persistent cache) and are added to it.
+        """
+        vectors: Dict[str, List[float]] = {}
+        for text in dict.fromkeys(texts):
+            vector = self.query_lru.peek(text)
+            if vector is not None:
+                vectors[text] = vector
+
+        missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+        if missing:
+            with span("embed_query"):
+                embedded = await self._embed_cached(
+                    missing, is_query=True, batch_size=len(missing)
+                )
+            for text, vector in zip(missing, embedded):
+                self.query_lru.put(text, vector)
+                vectors[text] = vector
+
+        return [vectors[text] for text in texts]
 
     async def embed_documents(
         self,
         texts: List[str],
         batch_size: int = 50,
     ) -> List[List[float]]:
-        embeddings: List[List[float]] = []
+        """
+        Embed `texts`, serving repeats from the embedding cache.
+
+        Uncached texts are embedded in batches dispatched concurrently;
+        in-flight requests are bounded by `EMBEDDING_MAX_CONCURRENCY`,
+        shared with every other caller of this service. Output order matches
+        input.
+        """
+        with span("embed_documents"):
+            return await self._embed_cached(texts, is_query=False, batch_size=batch_size)
+
+    async def _embed_cached(
+        self,
+        texts: List[str],
+        *,
+        is_query: bool,
+        batch_size: int,
+    ) -> List[List[float]]:
+        if self.cache is None:
+            return await self._embed_concurrently(
+                texts, is_query=is_query, batch_size=batch_size
+            )
+
+        keys = [
+            self.cache.key(self.DENSE_MODEL, self.DENSE_DIMENSION, is_query, text)
+            for text in texts
+        ]
+        vectors = await asyncio.to_thread(self.cache.get_many, keys)
 
-        for start in range(0, len(texts), batch_size):
-            batch = texts[start : start + batch_size]
-            embeddings.extend(
-                await self._embed_dense_batch(batch, is_query=False)
+        # Embed each missing text once, even if it repeats within the request
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            embedded = await self._embed_concurrently(
+                list(missing.values()), is_query=is_query, batch_size=batch_size
             )
+            # Round fresh vectors like cached ones so results never depend
+            # on whether a text was already cached
+            fresh = {
+                key: self.cache.quantize(vector)
+                for key, vector in zip(missing.keys(), embedded)
+            }
+            await asyncio.to_thread(self.cache.put_many, fresh)
+            vectors.update(fresh)
+
+        return [vectors[key] for key in keys]
+
+    async def _embed_concurrently(
+        self,
+        texts: List[str],
+        *,
+        is_query: bool,
+        batch_size: int,
+    ) -> List[List[float]]:
+        tasks = [
+            asyncio.ensure_future(
+                self._embed_with_backoff(
+                    texts[start : start + batch_size],
+                    is_query=is_query,
+                )
+            )
+            for start in range(0, len(texts), batch_size)
+        ]
+
+        try:
+            batches = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return [embedding for batch in batches for embedding in batch]
 
-        return embeddings
+    def cache_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"enabled": False}
+        if self.cache is not None:
+            stats = {"enabled": True, **self.cache.stats()}
+        stats["query_lru"] = self.query_lru.stats()
+        return stats
@@ -0,0 +1,335 @@
+"""Ingest pipeline shared by the batch and streaming document endpoints."""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.models.investment import InvestmentDocument
+from app.services.document_processing import (
+    find_batch_duplicates,
+    prepare_retrieval_text,
+    split_content_chunks,
+    validate_document_schema,
+)
+from app.services.embeddings import EmbeddingService
+from app.services.qdrant import QdrantService
+
+
+async def ingest_batch(
+    emb_svc: EmbeddingService,
+    qdrant_svc: QdrantService,
+    documents: List[Dict[str, Any]],
+    *,
+    wait: bool = False,
+) -> Dict[str, Any]:
+    """
+    Embed, deduplicate and upsert one batch of validated documents.
+
+    Args:
+        emb_svc: Embedding service
+        qdrant_svc: Qdrant service
+        documents: Validated document dicts
+        wait: Wait for the upsert to be applied, so later batches deduplicate
+            against this one
+
+    Returns:
+        Dict with count, skipped_count and skipped_documents
+    """
+    if qdrant_svc.chunked:
+        # Every chunk is embedded with the document's title and metadata.
+        # The first chunk's vector stands in for the document in
+        # deduplication, which only looks at first chunks.
+        document_chunks = [
+            split_content_chunks(
+                doc["content"],
+                settings.CHUNK_SIZE_CHARS,
+                settings.CHUNK_OVERLAP_CHARS,
+            )
+            for doc in documents
+        ]
+        chunk_texts = [
+            [prepare_retrieval_text({**doc, "content": chunk}) for chunk in chunks]
+            for doc, chunks in zip(documents, document_chunks)
+        ]
+        chunk_embeddings = await emb_svc.embed_documents(
+            [text for texts in chunk_texts for text in texts], batch_size=50
+        )
+        chunk_vectors = []
+        for texts in chunk_texts:
+            chunk_vectors.append(chunk_embeddings[: len(texts)])
+            chunk_embeddings = chunk_embeddings[len(texts):]
+        batch_embeddings = [vectors[0] for vectors in chunk_vectors]
+    else:
+        # Prepare enriched texts for embedding
+        retrieval_texts = [prepare_retrieval_text(doc) for doc in documents]
+
+        # Generate embeddings in batch (with batch size of 50 for optimal performance)
+        batch_embeddings = await emb_svc.embed_documents(retrieval_texts, batch_size=50)
+
+    with span("dedup"):
+        # Check for duplicates: one existence lookup for the whole batch, an
+        # in-memory pass over the batch itself, then one batched similarity query
+        # for the remaining new news documents.
+        existing_ids = await qdrant_svc.retrieve_existing_ids(
+            [doc["id"] for doc in documents]
+        )
+        update_indices = {
+            index
+            for index, doc in enumerate(documents)
+            if doc["id"] in existing_ids
+        }
+        batch_duplicates = find_batch_duplicates(
+            documents,
+            batch_embeddings,
+            similarity_threshold=settings.DEDUPLICATION_SIMILARITY_THRESHOLD,
+            date_range_days=settings.DEDUPLICATION_DATE_RANGE_DAYS,
+            exempt=update_indices,
+        )
+        new_indices = [
+            index
+            for index in range(len(documents))
+            if index not in update_indices and index not in batch_duplicates
+        ]
+        similar_by_index = dict(zip(
+            new_indices,
+            await qdrant_svc.find_similar_documents_batch(
+                [
+                    {
+                        "dense_vector": batch_embeddings[index],
+                        "document_date": documents[index]["document_date"],
+                        "type": documents[index]["type"],
+                    }
+                    for index in new_indices
+                ],
+                similarity_threshold=settings.DEDUPLICATION_SIMILARITY_THRESHOLD,
+                date_range_days=settings.DEDUPLICATION_DATE_RANGE_DAYS,
+            ),
+        ))
+
+        non_duplicate_indices = []
+        non_duplicate_docs = []
+        non_duplicate_embeddings = []
+        skipped_count = 0
+        skipped_docs = []
+
+        for index, (doc, dense_vector) in enumerate(zip(documents, batch_embeddings)):
+            # Documents whose ID already exists are updates and skip deduplication
+            similar_docs = similar_by_index.get(index)
+
+            if index in batch_duplicates:
+                # Skip this document as it's too similar to an earlier one in the batch
+                duplicate = batch_duplicates[index]
+                skipped_count += 1
+                skipped_docs.append({
+                    "id": doc["id"],
+                    "title": doc.get("title", "No title"),
+                    "similar_to": documents[duplicate["index"]]["id"],
+                    "similarity_score": duplicate["score"]
+                })
+            elif similar_docs:
+                # Skip this document as it's too similar to existing ones
+                skipped_count += 1
+                skipped_docs.append({
+                    "id": doc["id"],
+                    "title": doc.get("title", "No title"),
+                    "similar_to": similar_docs[0]["id"],
+                    "similarity_score": similar_docs[0]["score"]
+                })
+            else:
+                non_duplicate_indices.append(index)
+                non_duplicate_docs.append(doc)
+                non_duplicate_embeddings.append(dense_vector)
+
+    # Combine embeddings with original document payloads
+    processed_docs = []
+    for index, doc, dense_vector in zip(
+        non_duplicate_indices, non_duplicate_docs, non_duplicate_embeddings
+    ):
+        if qdrant_svc.chunked:
+            processed_docs.append({
+                "id": doc["id"],
+                "payload": doc,  # Stored in full on the first chunk
+                "chunks": [
+                    {"content": chunk, "dense_vector": vector, "bm25_text": text}
+                    for chunk, vector, text in zip(
+                        document_chunks[index], chunk_vectors[index], chunk_texts[index]
+                    )
+                ],
+            })
+            continue
+        processed_docs.append({
+            "id": doc["id"],
+            "payload": doc,  # Store original structured document
+            "dense_vector": dense_vector,
+            "bm25_text": retrieval_texts[index],
+        })
+
+    # Upsert non-duplicate documents to Qdrant
+    if processed_docs:
+        await qdrant_svc.upsert_documents(processed_docs, wait=wait)
+
+    return {
+        "count": len(processed_docs),
+        "skipped_count": skipped_count,
+        "skipped_documents": skipped_docs,
+    }
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into non-empty lines without buffering the whole body.
+
+    A line longer than `max_line_bytes` is discarded as it arrives and yielded
+    as None, so memory stays bounded even without newlines.
+    """
+    buffer = bytearray()
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            end = len(chunk) if newline == -1 else newline
+            if not too_long:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    too_long = True
+                    buffer.clear()
+            if newline == -1:
+                break
+            if too_long:
+                yield None
+            elif buffer.strip():
+                yield bytes(buffer)
+            buffer.clear()
+            too_long = False
+            start = newline + 1
+    if too_long:
+        yield None
+    elif buffer.strip():
+        yield bytes(buffer)
+
+
+def parse_ndjson_document(line: bytes) -> Dict[str, Any]:
+    """Parse and validate one NDJSON document line, raising ValueError if invalid."""
+    try:
+        doc = InvestmentDocument.model_validate_json(line).model_dump()
+    except ValidationError as e:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'document'}: {error['msg']}"
+                for error in e.errors()
+            )
+        ) from e
+    validate_document_schema(doc)
+    return doc
+
+
+async def stream_ingest(
+    emb_svc: EmbeddingService,
+    qdrant_svc: QdrantService,
+    chunks: AsyncIterator[bytes],
+    *,
+    batch_size: int = 50,
+    queue_batches: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Ingest an NDJSON document stream in micro-batches.
+
+    A reader task parses lines into batches and hands them over through a
+    bounded queue. When ingest falls behind, the reader blocks on the full
+    queue and stops pulling the request body, so memory stays bounded by
+    `queue_batches * batch_size` lines regardless of upload size.
+
+    Yields one result per batch, then a final summary. Invalid lines are
+    reported in the batch they fall into, count towards its size, and do not
+    stop the stream. If a
+    batch fails to ingest, or the body cannot be read, an error record is
+    yielded and the summary has `"status": "failed"`; batches reported before
+    it are committed, later ones are not attempted.
+    """
+    if queue_batches is None:
+        queue_batches = settings.STREAM_INGEST_QUEUE_BATCHES
+    max_line_bytes = settings.STREAM_INGEST_MAX_LINE_BYTES
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_batches))
+    done = object()
+
+    async def read_batches():
+        documents: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        line_number = 0
+        try:
+            async for line in iter_ndjson_lines(chunks, max_line_bytes):
+                line_number += 1
+                if line is None:
+                    errors.append({
+                        "line": line_number,
+                        "error": f"line exceeds {max_line_bytes} bytes",
+                    })
+                    continue
+                try:
+                    documents.append(parse_ndjson_document(line))
+                except ValueError as e:
+                    errors.append({"line": line_number, "error": str(e)})
+                # Invalid lines count too, so a run of them cannot pile up
+                if len(documents) + len(errors) >= batch_size:
+                    await queue.put((documents, errors))
+                    documents, errors = [], []
+            if documents or errors:
+                await queue.put((documents, errors))
+            await queue.put(done)
+        except Exception as e:
+            await queue.put(e)
+
+    reader = asyncio.ensure_future(read_batches())
+    totals = {"batches": 0, "count": 0, "skipped_count": 0, "error_count": 0}
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                # Also how a client disconnect surfaces; the records below
+                # then go nowhere, and no further batch is ingested
+                yield {"status": "failed", "error": f"reading request body: {item!r}", **totals}
+                return
+
+            documents, errors = item
+            result = {"batch": totals["batches"], "count": 0, "skipped_count": 0}
+            if documents:
+                try:
+                    ingested = await ingest_batch(emb_svc, qdrant_svc, documents, wait=True)
+                except Exception as e:
+                    failed = {"batch": totals["batches"], "status": "error", "error": str(e)}
+                    if errors:
+                        failed["errors"] = errors
+                    totals["error_count"] += len(errors)
+                    yield failed
+                    yield {"status": "failed", **totals}
+                    return
+                result["count"] = ingested["count"]
+                result["skipped_count"] = ingested["skipped_count"]
+                if ingested["skipped_documents"]:
+                    result["skipped_documents"] = ingested["skipped_documents"]
+            if errors:
+                result["errors"] = errors
+
+            totals["batches"] += 1
+            totals["count"] += result["count"]
+            totals["skipped_count"] += result["skipped_count"]
+            totals["error_count"] += len(errors)
+            yield result
+    finally:
+        reader.cancel()
+
+    yield {"status": "success", **totals}
+
+
+def to_ndjson(record: Dict[str, Any]) -> str:
+    return json.dumps(record) + "\n"
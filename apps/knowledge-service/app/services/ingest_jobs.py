@@ -0,0 +1,349 @@
+"""Durable background ingest jobs backed by SQLite."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.embeddings import EmbeddingService
+from app.services.ingest import ingest_batch
+from app.services.qdrant import QdrantService
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class IngestJobStore:
+    """
+    SQLite store for ingest jobs and their document batches.
+
+    Documents are split into batches when the job is submitted. Each batch's
+    result is committed together with the job's progress, so a job
+    interrupted mid-way resumes from its first uncommitted batch.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS ingest_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                total_documents INTEGER NOT NULL,
+                total_batches INTEGER NOT NULL,
+                completed_batches INTEGER NOT NULL DEFAULT 0,
+                processed_documents INTEGER NOT NULL DEFAULT 0,
+                count INTEGER NOT NULL DEFAULT 0,
+                skipped_count INTEGER NOT NULL DEFAULT 0,
+                elapsed_seconds REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS ingest_job_batches (
+                job_id TEXT NOT NULL,
+                batch_index INTEGER NOT NULL,
+                documents TEXT NOT NULL,
+                result TEXT,
+                PRIMARY KEY (job_id, batch_index)
+            );
+            CREATE INDEX IF NOT EXISTS ingest_jobs_status
+                ON ingest_jobs (status, created_at);
+            """
+        )
+        self._conn.commit()
+
+    def create_job(self, documents: List[Dict[str, Any]], batch_size: int) -> str:
+        job_id = uuid.uuid4().hex
+        batch_size = max(1, batch_size)
+        batches = [
+            documents[start : start + batch_size]
+            for start in range(0, len(documents), batch_size)
+        ]
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO ingest_jobs (id, status, total_documents, total_batches, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, len(documents), len(batches), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO ingest_job_batches (job_id, batch_index, documents) VALUES (?, ?, ?)",
+                [(job_id, index, json.dumps(batch)) for index, batch in enumerate(batches)],
+            )
+            self._conn.commit()
+
+        return job_id
+
+    def requeue_interrupted(self) -> int:
+        """Return jobs left running by a previous process to the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE ingest_jobs SET status = ? WHERE status = ?",
+                (JOB_QUEUED, JOB_RUNNING),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def resume_job(self, job_id: str) -> bool:
+        """Requeue a failed job; it continues from its first uncommitted batch."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, error = NULL, finished_at = NULL "
+                "WHERE id = ? AND status = ?",
+                (JOB_QUEUED, job_id, JOB_FAILED),
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def claim_next_job(self) -> Optional[str]:
+        """Mark the oldest queued job as running and return its ID."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM ingest_jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (JOB_QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, started_at = COALESCE(started_at, ?) "
+                "WHERE id = ?",
+                (JOB_RUNNING, time.time(), row["id"]),
+            )
+            self._conn.commit()
+            return row["id"]
+
+    def next_batch(self, job_id: str) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch_index, documents FROM ingest_job_batches "
+                "WHERE job_id = ? AND result IS NULL ORDER BY batch_index LIMIT 1",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row["batch_index"], json.loads(row["documents"])
+
+    def commit_batch(
+        self,
+        job_id: str,
+        batch_index: int,
+        batch_documents: int,
+        result: Dict[str, Any],
+        elapsed_seconds: float,
+    ):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ingest_job_batches SET result = ?, documents = '[]' "
+                "WHERE job_id = ? AND batch_index = ?",
+                (json.dumps(result), job_id, batch_index),
+            )
+            self._conn.execute(
+                "UPDATE ingest_jobs SET completed_batches = completed_batches + 1, "
+                "processed_documents = processed_documents + ?, count = count + ?, "
+                "skipped_count = skipped_count + ?, elapsed_seconds = elapsed_seconds + ? "
+                "WHERE id = ?",
+                (
+                    batch_documents,
+                    result["count"],
+                    result["skipped_count"],
+                    elapsed_seconds,
+                    job_id,
+                ),
+            )
+            self._conn.commit()
+
+    def finish_job(self, job_id: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (JOB_FAILED if error else JOB_COMPLETED, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            results = self._conn.execute(
+                "SELECT result FROM ingest_job_batches "
+                "WHERE job_id = ? AND result IS NOT NULL ORDER BY batch_index",
+                (job_id,),
+            ).fetchall()
+
+        skipped_documents = [
+            skipped
+            for row in results
+            for skipped in json.loads(row["result"])["skipped_documents"]
+        ]
+        total = job["total_documents"]
+        processed = job["processed_documents"]
+        elapsed = job["elapsed_seconds"]
+
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "progress": {
+                "total_documents": total,
+                "processed_documents": processed,
+                "total_batches": job["total_batches"],
+                "completed_batches": job["completed_batches"],
+                "percent": round(100 * processed / total, 1) if total else 100.0,
+            },
+            "count": job["count"],
+            "skipped_count": job["skipped_count"],
+            "skipped_documents": skipped_documents,
+            "throughput_docs_per_second": round(processed / elapsed, 2) if elapsed else None,
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class IngestJobRunner:
+    """
+    Worker pool that drains queued ingest jobs one batch at a time.
+
+    A failing batch is retried with exponential backoff. Once its retries
+    are exhausted the job is marked failed, keeping its committed batches,
+    and `resume` requeues it from the failed batch.
+    """
+
+    POLL_INTERVAL_SECONDS = 5.0
+    BATCH_RETRIES = 3
+    RETRY_BACKOFF_SECONDS = 2.0
+    RETRY_BACKOFF_MAX_SECONDS = 60.0
+
+    def __init__(
+        self,
+        store: IngestJobStore,
+        emb_svc: EmbeddingService,
+        qdrant_svc: QdrantService,
+        workers: int = 1,
+    ):
+        self.store = store
+        self.emb_svc = emb_svc
+        self.qdrant_svc = qdrant_svc
+        self.workers = max(1, workers)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        resumed = await asyncio.to_thread(self.store.requeue_interrupted)
+        if resumed:
+            print(f"Resuming {resumed} interrupted ingest job(s)")
+        self._tasks = [
+            asyncio.ensure_future(self._work()) for _ in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, documents: List[Dict[str, Any]], batch_size: int) -> str:
+        job_id = await asyncio.to_thread(self.store.create_job, documents, batch_size)
+        self._wakeup.set()
+        return job_id
+
+    async def resume(self, job_id: str) -> bool:
+        """Requeue a failed job; returns False if it is not in the failed state."""
+        resumed = await asyncio.to_thread(self.store.resume_job, job_id)
+        if resumed:
+            self._wakeup.set()
+        return resumed
+
+    async def _work(self):
+        while True:
+            # Cleared before claiming, so a job submitted after the claim
+            # query still wakes this worker
+            self._wakeup.clear()
+            job_id = await asyncio.to_thread(self.store.claim_next_job)
+            if job_id is None:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.POLL_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.run_job(job_id)
+            except asyncio.CancelledError:
+                # Left as running; requeued and resumed on the next start
+                raise
+            except Exception as e:
+                print(f"Ingest job {job_id} failed: {e}")
+                await asyncio.to_thread(self.store.finish_job, job_id, str(e) or repr(e))
+
+    async def run_job(self, job_id: str):
+        while True:
+            batch = await asyncio.to_thread(self.store.next_batch, job_id)
+            if batch is None:
+                break
+
+            batch_index, documents = batch
+            started = time.perf_counter()
+            result = await self._ingest_with_retries(job_id, batch_index, documents)
+            await asyncio.to_thread(
+                self.store.commit_batch,
+                job_id,
+                batch_index,
+                len(documents),
+                result,
+                time.perf_counter() - started,
+            )
+
+        await asyncio.to_thread(self.store.finish_job, job_id)
+
+    async def _ingest_with_retries(
+        self,
+        job_id: str,
+        batch_index: int,
+        documents: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        for attempt in range(self.BATCH_RETRIES + 1):
+            try:
+                return await ingest_batch(
+                    self.emb_svc, self.qdrant_svc, documents, wait=True
+                )
+            except Exception as e:
+                if attempt == self.BATCH_RETRIES:
+                    raise
+                delay = min(
+                    self.RETRY_BACKOFF_SECONDS * (2 ** attempt),
+                    self.RETRY_BACKOFF_MAX_SECONDS,
+                )
+                print(
+                    f"Ingest job {job_id} batch {batch_index} failed ({e}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
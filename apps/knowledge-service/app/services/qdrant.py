@@ -1,11 +1,19 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import base64
+import json
+import time
 import uuid
+import zlib
 
 from qdrant_client import AsyncQdrantClient, models
 
 from app.core.config import settings
+from app.core.dates import document_timestamp, parse_document_date
+from app.core.metrics import span
 from app.services.embeddings import EmbeddingService
+from app.services.sparse_encoding import BM25Encoder
 
 
 DENSE_VECTOR_NAME = "dense"
@@ -13,11 +21,156 @@ BM25_VECTOR_NAME = "bm25"
 SERVER_SIDE_BM25_MODEL = "qdrant/bm25"
 PREFETCH_CANDIDATE_MULTIPLIER = 5
 PREFETCH_MAX_LIMIT = 200
+FUSION_METHOD = models.Fusion.DBSF
 TITLE_BOOST = 0.25
 CONTENT_BOOST = 0.1
 RECENCY_BOOST = 0.15
 RECENCY_SCALE_SECONDS = 60 * 60 * 24 * 180
 RECENCY_MIDPOINT = 0.5
+# The recency reference time is floored to this, so identical searches
+# within the window rank identically and can be cached
+RECENCY_REFERENCE_QUANTUM_SECONDS = 60 * 60
+SIMILARITY_QUERY_BATCH_SIZE = 100
+COUNT_CACHE_MAX_ENTRIES = 1024
+# Chunked indexing: every chunk point carries its document's ID in
+# `parent_id`. The first chunk keeps the document ID and full payload;
+# later chunks get derived IDs and only the filterable fields. Every chunk's
+# `content` is its own text, so the content index and boost score chunks
+# alike; the first chunk keeps the whole document's content under
+# DOCUMENT_CONTENT_FIELD, which is not indexed, for lookups and retrieval.
+PARENT_ID_FIELD = "parent_id"
+CHUNK_INDEX_FIELD = "chunk_index"
+DOCUMENT_CONTENT_FIELD = "document_content"
+CHUNK_ID_NAMESPACE = uuid.UUID("0f3c6a7e-52d4-4a8e-9a51-6f3b1c2d9e47")
+CHUNK_PAYLOAD_FIELDS = (
+    "type",
+    "title",
+    "symbols",
+    "subsectors",
+    "subindustries",
+    "indices",
+    "document_date",
+    "source",
+)
+
+
+# Dense vector quantization profiles. Quantized vectors are kept in RAM while
+# the FLOAT16 originals stay on disk: searches score `oversampling` times the
+# requested candidates on the quantized vectors, then rescore those from disk.
+QUANTIZATION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "none": {"bits_per_dimension": 0, "oversampling": None},
+    "scalar": {"bits_per_dimension": 8, "oversampling": 2.0},
+    "binary": {"bits_per_dimension": 1, "oversampling": 3.0},
+}
+ORIGINAL_VECTOR_BYTES_PER_DIMENSION = 2  # FLOAT16
+QUANTIZATION_REPORT_SEARCH_LIMIT = 10
+
+
+def quantization_config(profile: str) -> Any:
+    """Collection quantization config for a profile; `Disabled` for "none"."""
+    if profile == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            )
+        )
+    if profile == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    if profile == "none":
+        return models.Disabled.DISABLED
+    raise ValueError(
+        f"Unknown quantization profile {profile!r}; "
+        f"expected one of {sorted(QUANTIZATION_PROFILES)}"
+    )
+
+
+def quantization_profile_of(config: Any) -> str:
+    """Profile name of a collection's or vector's quantization config."""
+    if isinstance(config, models.ScalarQuantization):
+        return "scalar"
+    if isinstance(config, models.BinaryQuantization):
+        return "binary"
+    return "none"
+
+
+# Optional collection partitioning (COLLECTION_PARTITIONING):
+#   type_tenant   `type` is indexed with is_tenant, so Qdrant stores each
+#                 type's points together and type-filtered queries read less
+#   month_shards  custom sharding with one shard key per UTC year-month of
+#                 `document_date`; queries bounded by date only touch the
+#                 shards of the months they cover
+PARTITIONING_MODES = ("none", "type_tenant", "month_shards")
+# Date ranges spanning more months than this query every shard
+MAX_ROUTED_SHARD_KEYS = 36
+# Compact payloads (PAYLOAD_MODE=compact) store `content` zlib-compressed and
+# base64-encoded under this field instead
+PAYLOAD_MODES = ("full", "compact")
+# Collection metadata key recording which BM25 encoder built the sparse
+# vectors; the two encoders' term IDs are not comparable
+BM25_ENCODER_METADATA_KEY = "bm25_encoder"
+COMPRESSED_CONTENT_FIELD = "content_zlib"
+CONTENT_COMPRESSION_LEVEL = 6
+
+
+def month_shard_key(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m")
+
+
+def month_shard_keys(start: float, end: float) -> List[str]:
+    """Year-month keys from `start` to `end` inclusive (UTC)."""
+    first = datetime.fromtimestamp(start, timezone.utc)
+    last = datetime.fromtimestamp(end, timezone.utc)
+    keys = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def _range_timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return document_timestamp(str(value))
+
+
+def chunk_point_id(document_id: str, chunk_index: int) -> str:
+    """Point ID of a document's chunk; the first chunk uses the document ID."""
+    if chunk_index == 0:
+        return document_id
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{document_id}:{chunk_index}"))
+
+
+def compress_content(content: str) -> str:
+    compressed = zlib.compress(content.encode("utf-8"), CONTENT_COMPRESSION_LEVEL)
+    return base64.b64encode(compressed).decode("ascii")
+
+
+def decompress_content(data: str) -> str:
+    return zlib.decompress(base64.b64decode(data)).decode("utf-8")
+
+
+def encode_page_cursor(document_date: str, resume_id: Optional[str]) -> str:
+    raw = json.dumps([document_date, resume_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str) -> Tuple[str, Optional[str]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        document_date, resume_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(document_date, str):
+            raise TypeError(document_date)
+        document_timestamp(document_date)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return document_date, resume_id
 
 
 class QdrantService:
@@ -28,6 +181,44 @@ class QdrantService:
             prefer_grpc=True,
         )
         self.collection_name = settings.QDRANT_COLLECTION_NAME
+        self._count_cache: Dict[str, Tuple[float, int]] = {}
+        # Bumped on every write so read caches can key on it
+        self.generation = 0
+        self.last_write_at: Optional[float] = None
+        self.chunked = settings.CHUNK_INDEXING
+        quantization_config(settings.QUANTIZATION_PROFILE)  # validate early
+        self.quantization_profile = settings.QUANTIZATION_PROFILE
+        if settings.COLLECTION_PARTITIONING not in PARTITIONING_MODES:
+            raise ValueError(
+                f"Unknown COLLECTION_PARTITIONING {settings.COLLECTION_PARTITIONING!r}; "
+                f"expected one of {list(PARTITIONING_MODES)}"
+            )
+        self.partitioning = settings.COLLECTION_PARTITIONING
+        self._shard_keys: Set[str] = set()
+        if settings.PAYLOAD_MODE not in PAYLOAD_MODES:
+            raise ValueError(
+                f"Unknown PAYLOAD_MODE {settings.PAYLOAD_MODE!r}; "
+                f"expected one of {list(PAYLOAD_MODES)}"
+            )
+        self.compact_payload = settings.PAYLOAD_MODE == "compact"
+        if settings.BM25_ENCODER not in ("server", "client"):
+            raise ValueError(
+                f"Unknown BM25_ENCODER {settings.BM25_ENCODER!r}; expected server or client"
+            )
+        # Client-side BM25: sparse vectors are encoded here instead of by the
+        # server-side model; the two produce different term IDs
+        self.bm25_encoder = settings.BM25_ENCODER
+        self.sparse_encoder: Optional[BM25Encoder] = None
+        if settings.BM25_ENCODER == "client":
+            self.sparse_encoder = BM25Encoder(
+                workers=settings.BM25_ENCODER_WORKERS,
+                avg_doc_length=settings.BM25_AVG_DOC_LENGTH,
+                query_cache_size=settings.BM25_QUERY_CACHE_SIZE,
+            )
+
+    def close(self):
+        if self.sparse_encoder is not None:
+            self.sparse_encoder.close()
 
     async def _ensure_collection(self):
         """Create the collection and require the steady-state dense + BM25 schema."""
@@ -44,12 +235,30 @@ class QdrantService:
                         on_disk=True,
                         datatype=models.Datatype.FLOAT16,
                         hnsw_config=models.HnswConfigDiff(m=0),
+                        quantization_config=(
+                            quantization_config(self.quantization_profile)
+                            if self.quantization_profile != "none"
+                            else None
+                        ),
                     ),
                 },
                 sparse_vectors_config={
                     BM25_VECTOR_NAME: self._build_bm25_sparse_vector_params(),
                 },
+                sharding_method=(
+                    models.ShardingMethod.CUSTOM
+                    if self.partitioning == "month_shards"
+                    else None
+                ),
+                metadata={BM25_ENCODER_METADATA_KEY: self.bm25_encoder},
             )
+            if self.partitioning == "type_tenant":
+                # Before any data, so points are laid out by type from the start
+                await self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name="type",
+                    field_schema=self._type_index_schema(),
+                )
             print("Collection created.")
 
         await self._validate_collection_schema()
@@ -63,6 +272,216 @@ class QdrantService:
                 f"{BM25_VECTOR_NAME!r} sparse vector. Expected the migrated v2 collection."
             )
 
+        await self._validate_bm25_encoder(info)
+
+        if self.partitioning == "month_shards":
+            if info.config.params.sharding_method != models.ShardingMethod.CUSTOM:
+                raise ValueError(
+                    f"COLLECTION_PARTITIONING=month_shards needs custom sharding, but "
+                    f"collection {self.collection_name!r} was created without it. "
+                    "Sharding cannot be changed in place; migrate to a new collection."
+                )
+            cluster = await self.client.collection_cluster_info(self.collection_name)
+            self._shard_keys = {
+                str(shard.shard_key)
+                for shard in [*cluster.local_shards, *cluster.remote_shards]
+                if shard.shard_key is not None
+            }
+
+        # The collection is the source of truth once it exists; profiles
+        # are switched through `set_quantization_profile`
+        active = self._active_quantization_profile(info)
+        if active != self.quantization_profile:
+            print(
+                f"Collection uses quantization profile {active!r}, "
+                f"not QUANTIZATION_PROFILE={self.quantization_profile!r}"
+            )
+        self.quantization_profile = active
+
+    async def _validate_bm25_encoder(self, info: models.CollectionInfo):
+        metadata = info.config.metadata or {}
+        recorded = metadata.get(BM25_ENCODER_METADATA_KEY)
+        if recorded is None:
+            # Collections from before the marker were all server-encoded
+            recorded = "server"
+            if self.bm25_encoder == recorded:
+                await self.client.update_collection(
+                    collection_name=self.collection_name,
+                    metadata={BM25_ENCODER_METADATA_KEY: recorded},
+                )
+        if recorded != self.bm25_encoder:
+            raise ValueError(
+                f"BM25_ENCODER={self.bm25_encoder} but collection {self.collection_name!r} "
+                f"was indexed with the {recorded} encoder, whose term IDs differ. "
+                "Reindex into a new collection to switch encoders."
+            )
+
+    @staticmethod
+    def _active_quantization_profile(info: models.CollectionInfo) -> str:
+        vectors = info.config.params.vectors
+        dense = vectors.get(DENSE_VECTOR_NAME) if isinstance(vectors, dict) else None
+        if dense is not None and dense.quantization_config is not None:
+            return quantization_profile_of(dense.quantization_config)
+        return quantization_profile_of(info.config.quantization_config)
+
+    async def set_quantization_profile(self, profile: str):
+        """
+        Switch the dense vector's quantization profile.
+
+        Qdrant rebuilds the quantized vectors in the background; searches
+        keep working meanwhile.
+
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        config = quantization_config(profile)
+        await self.client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={
+                DENSE_VECTOR_NAME: models.VectorParamsDiff(
+                    quantization_config=config,
+                ),
+            },
+        )
+        self.quantization_profile = profile
+        # Rescored rankings can differ slightly between profiles
+        self.generation += 1
+
+    def dense_search_params(
+        self,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        indexed_only: bool = False,
+    ) -> Optional[models.SearchParams]:
+        """
+        Search params for dense queries: the HNSW knobs plus oversampling and
+        rescoring under the active quantization profile.
+        """
+        quantization = None
+        if self.quantization_profile != "none":
+            quantization = models.QuantizationSearchParams(
+                rescore=settings.QUANTIZATION_RESCORE,
+                oversampling=self._oversampling(self.quantization_profile),
+            )
+        if quantization is None and hnsw_ef is None and not exact and not indexed_only:
+            return None
+        return models.SearchParams(
+            hnsw_ef=hnsw_ef,
+            exact=exact,
+            indexed_only=indexed_only,
+            quantization=quantization,
+        )
+
+    @staticmethod
+    def prefers_exact_search(filters: Dict[str, Any]) -> bool:
+        """
+        Whether filters are selective enough for exact search.
+
+        HNSW degrades under restrictive filters, while exact search over a
+        small filtered set is both fast and complete.
+        """
+        include_ids = filters.get("include_ids")
+        if include_ids and len(include_ids) <= settings.EXACT_SEARCH_MAX_IDS:
+            return True
+
+        if filters.get("date_from") and filters.get("date_to"):
+            try:
+                window_seconds = document_timestamp(filters["date_to"]) - document_timestamp(
+                    filters["date_from"]
+                )
+            except ValueError:
+                return False
+            return window_seconds <= settings.EXACT_SEARCH_MAX_DATE_RANGE_DAYS * 86400
+
+        return False
+
+    @staticmethod
+    def _oversampling(profile: str) -> Optional[float]:
+        if profile == "none":
+            return None
+        return (
+            settings.QUANTIZATION_OVERSAMPLING
+            or QUANTIZATION_PROFILES[profile]["oversampling"]
+        )
+
+    async def quantization_report(self, probe_queries: int = 0) -> Dict[str, Any]:
+        """
+        Estimated memory per profile and, optionally, measured dense latency.
+
+        The probe reuses `probe_queries` stored vectors as queries and times
+        each with quantization ignored and with the active profile's params.
+        """
+        info = await self.client.get_collection(self.collection_name)
+        points = info.points_count or 0
+        dimension = EmbeddingService.DENSE_DIMENSION
+        candidates = self.prefetch_limit(QUANTIZATION_REPORT_SEARCH_LIMIT)
+
+        profiles = {}
+        for name, profile in QUANTIZATION_PROFILES.items():
+            oversampling = self._oversampling(name)
+            profiles[name] = {
+                "quantized_ram_bytes": points * dimension * profile["bits_per_dimension"] // 8,
+                "oversampling": oversampling,
+                # Original vectors read from disk to rescore one dense
+                # prefetch; without quantization the HNSW traversal itself
+                # reads originals from disk
+                "rescored_vectors_per_search": (
+                    int(candidates * oversampling)
+                    if oversampling and settings.QUANTIZATION_RESCORE
+                    else None
+                ),
+            }
+
+        report: Dict[str, Any] = {
+            "profile": self.quantization_profile,
+            "rescore": settings.QUANTIZATION_RESCORE,
+            "points": points,
+            "dimension": dimension,
+            "original_vectors_disk_bytes": points * dimension * ORIGINAL_VECTOR_BYTES_PER_DIMENSION,
+            "collection_status": info.status,
+            "optimizer_status": str(info.optimizer_status),
+            "profiles": profiles,
+        }
+        if probe_queries > 0:
+            report["probe"] = await self._probe_dense_latency(probe_queries, candidates)
+        return report
+
+    async def _probe_dense_latency(self, queries: int, limit: int) -> Dict[str, Any]:
+        points, _ = await self.client.scroll(
+            collection_name=self.collection_name,
+            limit=queries,
+            with_payload=False,
+            with_vectors=[DENSE_VECTOR_NAME],
+        )
+        vectors = [point.vector[DENSE_VECTOR_NAME] for point in points]
+
+        async def timed(search_params: Optional[models.SearchParams]) -> float:
+            samples = []
+            for vector in vectors:
+                started = time.perf_counter()
+                await self.client.query_points(
+                    collection_name=self.collection_name,
+                    query=vector,
+                    using=DENSE_VECTOR_NAME,
+                    limit=limit,
+                    search_params=search_params,
+                    with_payload=False,
+                    timeout=60,
+                )
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            return round(samples[len(samples) // 2], 2) if samples else 0.0
+
+        return {
+            "queries": len(vectors),
+            "full_precision_p50_ms": await timed(
+                models.SearchParams(
+                    quantization=models.QuantizationSearchParams(ignore=True)
+                )
+            ),
+            "active_profile_p50_ms": await timed(self.dense_search_params()),
+        }
+
     def _build_bm25_sparse_vector_params(self) -> models.SparseVectorParams:
         return models.SparseVectorParams(
             modifier=models.Modifier.IDF,
@@ -98,13 +517,15 @@ class QdrantService:
         print("Creating payload indexes...")
 
         indexes: Dict[str, Any] = {
-            "type": models.PayloadSchemaType.KEYWORD,
+            "type": self._type_index_schema(),
             "symbols": models.PayloadSchemaType.KEYWORD,
             "subsectors": models.PayloadSchemaType.KEYWORD,
             "subindustries": models.PayloadSchemaType.KEYWORD,
             "indices": models.PayloadSchemaType.KEYWORD,
             "document_date": models.PayloadSchemaType.DATETIME,
             "source.name": models.PayloadSchemaType.KEYWORD,
+            PARENT_ID_FIELD: models.PayloadSchemaType.KEYWORD,
+            CHUNK_INDEX_FIELD: models.PayloadSchemaType.INTEGER,
             "title": models.TextIndexParams(
                 type=models.TextIndexType.TEXT,
                 tokenizer=models.TokenizerType.MULTILINGUAL,
@@ -112,14 +533,16 @@ class QdrantService:
                 ascii_folding=True,
                 on_disk=True,
             ),
-            "content": models.TextIndexParams(
+        }
+        if not self.compact_payload:
+            # Only the content score boost reads this index
+            indexes["content"] = models.TextIndexParams(
                 type=models.TextIndexType.TEXT,
                 tokenizer=models.TokenizerType.MULTILINGUAL,
                 lowercase=True,
                 ascii_folding=True,
                 on_disk=True,
-            ),
-        }
+            )
 
         for field_name, field_schema in indexes.items():
             try:
@@ -134,31 +557,348 @@ class QdrantService:
 
         print("Payload indexes created.")
 
-    async def upsert_documents(self, documents: List[Dict[str, Any]]):
+    def _type_index_schema(self) -> Any:
+        if self.partitioning == "type_tenant":
+            return models.KeywordIndexParams(
+                type=models.KeywordIndexType.KEYWORD,
+                is_tenant=True,
+            )
+        return models.PayloadSchemaType.KEYWORD
+
+    async def upsert_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        wait: bool = False,
+    ):
         """
-        Upsert processed documents using dense vectors plus server-side BM25 text.
+        Upsert processed documents using dense vectors plus BM25 text, encoded
+        by the server-side model or by the client-side encoder.
+
+        A document with `chunks` (each with `content`, `dense_vector` and
+        `bm25_text`) is stored as one point per chunk, and chunks left over
+        from a longer previous version are deleted.
         """
+        if self.sparse_encoder is not None:
+            with span("bm25_encode"):
+                documents = await self._with_bm25_vectors(documents)
+
         points = []
         for doc in documents:
+            if "chunks" in doc:
+                points.extend(self._chunk_points(doc))
+                continue
             points.append(
                 models.PointStruct(
                     id=doc.get("id", str(uuid.uuid4())),
-                    payload=doc.get("payload", {}),
-                    vector={
-                        DENSE_VECTOR_NAME: doc["dense_vector"],
-                        BM25_VECTOR_NAME: models.Document(
-                            text=doc["bm25_text"],
-                            model=SERVER_SIDE_BM25_MODEL,
-                        ),
-                    },
+                    payload=self._stored_payload(doc.get("payload", {})),
+                    vector=self._point_vector(
+                        doc["dense_vector"], doc["bm25_text"], doc.get("bm25_vector")
+                    ),
                 )
             )
 
-        await self.client.upsert(
-            collection_name=self.collection_name,
-            points=points,
-            wait=False,
-        )
+        if self.partitioning == "month_shards":
+            await self._upsert_month_sharded(documents, points, wait)
+        else:
+            with span("qdrant_upsert"):
+                await self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=wait,
+                )
+
+        stale_chunks = [
+            models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key=PARENT_ID_FIELD,
+                        match=models.MatchValue(value=doc["id"]),
+                    ),
+                    models.FieldCondition(
+                        key=CHUNK_INDEX_FIELD,
+                        range=models.Range(gte=len(doc["chunks"])),
+                    ),
+                ]
+            )
+            for doc in documents
+            if "chunks" in doc
+        ]
+        if stale_chunks:
+            await self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(
+                    filter=models.Filter(should=stale_chunks)
+                ),
+                wait=wait,
+            )
+        self._mark_written()
+
+    async def _upsert_month_sharded(
+        self,
+        documents: List[Dict[str, Any]],
+        points: List[models.PointStruct],
+        wait: bool,
+    ):
+        """
+        Upsert points into their month's shard.
+
+        Documents are overwritten in place; only those whose stored copy is
+        in another month's shard are deleted from it, after the new copy is
+        written, so no document is ever missing.
+        """
+        by_shard: Dict[str, List[models.PointStruct]] = {}
+        for point in points:
+            key = month_shard_key(document_timestamp(point.payload["document_date"]))
+            by_shard.setdefault(key, []).append(point)
+
+        moved = await self._documents_in_other_shards(documents)
+
+        for key, shard_points in sorted(by_shard.items()):
+            await self._ensure_shard_key(key)
+            with span("qdrant_upsert"):
+                await self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=shard_points,
+                    shard_key_selector=key,
+                    wait=wait,
+                )
+
+        for key, document_ids in sorted(moved.items()):
+            # Chunk points share their document's month, and so its shard
+            previous_copies: List[Any] = [models.HasIdCondition(has_id=document_ids)]
+            if self.chunked:
+                previous_copies.append(
+                    models.FieldCondition(
+                        key=PARENT_ID_FIELD,
+                        match=models.MatchAny(any=document_ids),
+                    )
+                )
+            await self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(
+                    filter=models.Filter(should=previous_copies)
+                ),
+                shard_key_selector=key,
+                wait=wait,
+            )
+
+    async def _documents_in_other_shards(
+        self,
+        documents: List[Dict[str, Any]],
+    ) -> Dict[str, List[str]]:
+        """IDs of already stored `documents` whose month changed, by previous shard key."""
+        new_months = {
+            self._normalize_point_id(doc["id"]): (
+                doc["id"],
+                month_shard_key(document_timestamp(doc["payload"]["document_date"])),
+            )
+            for doc in documents
+            if "id" in doc
+        }
+        if not new_months:
+            return {}
+
+        with span("qdrant_retrieve"):
+            stored = await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[document_id for document_id, _ in new_months.values()],
+                with_payload=["document_date"],
+                with_vectors=False,
+            )
+
+        moved: Dict[str, List[str]] = {}
+        for point in stored:
+            document_id, month = new_months[self._normalize_point_id(point.id)]
+            previous = month_shard_key(document_timestamp(point.payload["document_date"]))
+            if month != previous:
+                moved.setdefault(previous, []).append(document_id)
+        return moved
+
+    async def _ensure_shard_key(self, key: str):
+        if key in self._shard_keys:
+            return
+        try:
+            await self.client.create_shard_key(self.collection_name, key)
+            print(f"Created shard key {key}")
+        except Exception as error:
+            # Another writer may have created it first
+            if "already exists" not in str(error).lower():
+                raise
+        self._shard_keys.add(key)
+
+    def _shard_key_selector(self, query_filter: Optional[models.Filter]) -> Optional[List[str]]:
+        """
+        Shard keys a month-sharded query has to read, or None for all shards.
+
+        Routing uses the `document_date` range in the filter's `must` clauses.
+        A range without an upper bound reads every known month from its start.
+        Queries fall back to all shards when there is no lower bound, when
+        the range covers more than MAX_ROUTED_SHARD_KEYS months, or when one
+        of its months has no shard yet.
+        """
+        if self.partitioning != "month_shards" or query_filter is None:
+            return None
+
+        start, end = self._date_bounds(query_filter)
+        if start is None:
+            return None
+
+        if end is None:
+            first = month_shard_key(start)
+            keys = sorted(key for key in self._shard_keys if key >= first)
+            keys = keys or [first]
+        else:
+            keys = month_shard_keys(start, end)
+
+        if len(keys) > MAX_ROUTED_SHARD_KEYS or not set(keys) <= self._shard_keys:
+            return None
+        return keys
+
+    @classmethod
+    def _date_bounds(
+        cls,
+        query_filter: models.Filter,
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Tightest `document_date` bounds required by a filter's `must` clauses."""
+        start = end = None
+        for condition in query_filter.must or []:
+            if isinstance(condition, models.Filter):
+                lower, upper = cls._date_bounds(condition)
+            elif (
+                isinstance(condition, models.FieldCondition)
+                and condition.key == "document_date"
+                and isinstance(condition.range, models.DatetimeRange)
+            ):
+                date_range = condition.range
+                lower = date_range.gte if date_range.gte is not None else date_range.gt
+                upper = date_range.lte if date_range.lte is not None else date_range.lt
+                lower = _range_timestamp(lower) if lower is not None else None
+                upper = _range_timestamp(upper) if upper is not None else None
+            else:
+                continue
+
+            if lower is not None:
+                start = lower if start is None else max(start, lower)
+            if upper is not None:
+                end = upper if end is None else min(end, upper)
+        return start, end
+
+    async def _with_bm25_vectors(
+        self,
+        documents: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Copies of `documents` with client-encoded `bm25_vector`s, one batch for all."""
+        texts = [
+            item["bm25_text"]
+            for doc in documents
+            for item in doc.get("chunks", [doc])
+        ]
+        vectors = iter(await self.sparse_encoder.encode_documents(texts))
+
+        encoded = []
+        for doc in documents:
+            if "chunks" in doc:
+                encoded.append({
+                    **doc,
+                    "chunks": [
+                        {**chunk, "bm25_vector": next(vectors)}
+                        for chunk in doc["chunks"]
+                    ],
+                })
+            else:
+                encoded.append({**doc, "bm25_vector": next(vectors)})
+        return encoded
+
+    def _point_vector(
+        self,
+        dense_vector: List[float],
+        bm25_text: str,
+        bm25_vector: Optional[models.SparseVector] = None,
+    ) -> Dict[str, Any]:
+        return {
+            DENSE_VECTOR_NAME: dense_vector,
+            BM25_VECTOR_NAME: (
+                bm25_vector
+                if bm25_vector is not None
+                else models.Document(
+                    text=bm25_text,
+                    model=SERVER_SIDE_BM25_MODEL,
+                )
+            ),
+        }
+
+    def _chunk_points(self, doc: Dict[str, Any]) -> List[models.PointStruct]:
+        payload = doc.get("payload", {})
+        chunk_count = len(doc["chunks"])
+        points = []
+        for index, chunk in enumerate(doc["chunks"]):
+            if index == 0:
+                chunk_payload = dict(payload)
+                if "content" in payload:
+                    chunk_payload[DOCUMENT_CONTENT_FIELD] = payload["content"]
+            else:
+                chunk_payload = {
+                    field: payload[field]
+                    for field in CHUNK_PAYLOAD_FIELDS
+                    if field in payload
+                }
+            chunk_payload["content"] = chunk["content"]
+            chunk_payload[PARENT_ID_FIELD] = doc["id"]
+            chunk_payload[CHUNK_INDEX_FIELD] = index
+            chunk_payload["chunk_count"] = chunk_count
+
+            points.append(
+                models.PointStruct(
+                    id=chunk_point_id(doc["id"], index),
+                    payload=self._stored_payload(chunk_payload),
+                    vector=self._point_vector(
+                        chunk["dense_vector"], chunk["bm25_text"], chunk.get("bm25_vector")
+                    ),
+                )
+            )
+        return points
+
+    def _stored_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.compact_payload or "content" not in payload:
+            return payload
+        # Content is not indexed in compact mode, so a first chunk only needs
+        # its document's content
+        content = payload.get(DOCUMENT_CONTENT_FIELD, payload["content"])
+        stored = {
+            key: value
+            for key, value in payload.items()
+            if key not in ("content", DOCUMENT_CONTENT_FIELD)
+        }
+        stored[COMPRESSED_CONTENT_FIELD] = compress_content(content)
+        return stored
+
+    @staticmethod
+    def _expanded_payload(payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Payload as ingested; points stored in either payload mode can be read."""
+        if not payload or (
+            COMPRESSED_CONTENT_FIELD not in payload and DOCUMENT_CONTENT_FIELD not in payload
+        ):
+            return payload
+        expanded = {
+            key: value
+            for key, value in payload.items()
+            if key not in (COMPRESSED_CONTENT_FIELD, DOCUMENT_CONTENT_FIELD)
+        }
+        if COMPRESSED_CONTENT_FIELD in payload:
+            expanded["content"] = decompress_content(payload[COMPRESSED_CONTENT_FIELD])
+        else:
+            expanded["content"] = payload[DOCUMENT_CONTENT_FIELD]
+        return expanded
+
+    def _point_dict(self, point: Any) -> Dict[str, Any]:
+        data = point.model_dump()
+        data["payload"] = self._expanded_payload(data["payload"])
+        return data
+
+    def _mark_written(self):
+        self.generation += 1
+        self.last_write_at = time.monotonic()
+        self._count_cache.clear()
 
     def build_filter(self, filters: Dict[str, Any]) -> Optional[models.Filter]:
         must_conditions = []
@@ -236,14 +976,10 @@ class QdrantService:
             )
 
         if filters.get("include_ids"):
-            must_conditions.append(
-                models.HasIdCondition(has_id=filters["include_ids"])
-            )
+            must_conditions.append(self._document_ids_condition(filters["include_ids"]))
 
         if filters.get("exclude_ids"):
-            must_not_conditions.append(
-                models.HasIdCondition(has_id=filters["exclude_ids"])
-            )
+            must_not_conditions.append(self._document_ids_condition(filters["exclude_ids"]))
 
         if not must_conditions and not must_not_conditions:
             return None
@@ -256,6 +992,15 @@ class QdrantService:
 
         return models.Filter(**filter_params)
 
+    def _document_ids_condition(self, document_ids: List[str]) -> Any:
+        """Matches the points of these documents; with chunking, all of their chunks."""
+        if self.chunked:
+            return models.FieldCondition(
+                key=PARENT_ID_FIELD,
+                match=models.MatchAny(any=[str(doc_id) for doc_id in document_ids]),
+            )
+        return models.HasIdCondition(has_id=document_ids)
+
     async def search(
         self,
         query_text: str,
@@ -263,20 +1008,171 @@ class QdrantService:
         limit: int = 10,
         query_filter: Optional[models.Filter] = None,
         use_dense: bool = True,
+        with_vectors: bool = False,
+        search_params: Optional[models.SearchParams] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search using dense vectors and server-side BM25 with score boosting.
+
+        `with_vectors` also returns each hit's dense vector, for rerankers.
+        `search_params` apply to the dense retriever and default to
+        `dense_search_params()`.
+        With chunked indexing, hits are grouped by document and each document
+        is scored by its best chunk.
         """
-        prefetch_limit = min(
+        if self.chunked:
+            return await self._search_grouped(
+                query_text,
+                query_vector,
+                limit,
+                query_filter,
+                use_dense,
+                with_vectors,
+                search_params,
+            )
+
+        with span("qdrant_query_points"):
+            results = await self.client.query_points(
+                collection_name=self.collection_name,
+                **self._search_query(
+                    query_text, query_vector, limit, query_filter, use_dense, search_params
+                ),
+                with_payload=True,
+                with_vectors=[DENSE_VECTOR_NAME] if with_vectors else False,
+                shard_key_selector=self._shard_key_selector(query_filter),
+                timeout=60,
+            )
+
+        return [self._point_dict(point) for point in results.points]
+
+    async def search_batch(
+        self,
+        searches: List[Dict[str, Any]],
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several `search` calls in one `query_batch_points` round-trip.
+
+        Each item takes the keyword arguments of `search`. Results are
+        returned in input order.
+        """
+        if not searches:
+            return []
+
+        if self.chunked:
+            # There is no batch variant of query_points_groups
+            return await asyncio.gather(*(
+                self.search(
+                    search["query_text"],
+                    search.get("query_vector"),
+                    limit=search.get("limit", 10),
+                    query_filter=search.get("query_filter"),
+                    use_dense=search.get("use_dense", True),
+                    with_vectors=search.get("with_vectors", False),
+                    search_params=search.get("search_params"),
+                )
+                for search in searches
+            ))
+
+        with span("qdrant_query_points"):
+            responses = await self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    models.QueryRequest(
+                        **self._search_query(
+                            search["query_text"],
+                            search.get("query_vector"),
+                            search.get("limit", 10),
+                            search.get("query_filter"),
+                            search.get("use_dense", True),
+                            search.get("search_params"),
+                        ),
+                        with_payload=True,
+                        with_vector=(
+                            [DENSE_VECTOR_NAME] if search.get("with_vectors") else False
+                        ),
+                        shard_key=self._shard_key_selector(search.get("query_filter")),
+                    )
+                    for search in searches
+                ],
+                timeout=60,
+            )
+
+        return [
+            [self._point_dict(point) for point in response.points]
+            for response in responses
+        ]
+
+    async def _search_grouped(
+        self,
+        query_text: str,
+        query_vector: Optional[List[float]],
+        limit: int,
+        query_filter: Optional[models.Filter],
+        use_dense: bool,
+        with_vectors: bool,
+        search_params: Optional[models.SearchParams],
+    ) -> List[Dict[str, Any]]:
+        with span("qdrant_query_points"):
+            results = await self.client.query_points_groups(
+                collection_name=self.collection_name,
+                **self._search_query(
+                    query_text, query_vector, limit, query_filter, use_dense, search_params
+                ),
+                group_by=PARENT_ID_FIELD,
+                group_size=1,
+                # The full document lives on its first chunk, whose ID is the group ID
+                with_lookup=models.WithLookup(
+                    collection=self.collection_name,
+                    with_payload=True,
+                    with_vectors=False,
+                ),
+                with_payload=False,
+                with_vectors=[DENSE_VECTOR_NAME] if with_vectors else False,
+                shard_key_selector=self._shard_key_selector(query_filter),
+                timeout=60,
+            )
+
+        hits = []
+        for group in results.groups:
+            if not group.hits or group.lookup is None:
+                continue
+            best = group.hits[0]
+            hits.append({
+                **best.model_dump(),
+                "id": str(group.id),
+                "payload": self._expanded_payload(group.lookup.payload),
+            })
+        return hits
+
+    @staticmethod
+    def prefetch_limit(limit: int) -> int:
+        """Candidates fetched per retriever for a search returning `limit` hits."""
+        return min(
             PREFETCH_MAX_LIMIT,
             max(limit, limit * PREFETCH_CANDIDATE_MULTIPLIER),
         )
 
+    def _search_query(
+        self,
+        query_text: str,
+        query_vector: Optional[List[float]],
+        limit: int,
+        query_filter: Optional[models.Filter],
+        use_dense: bool,
+        search_params: Optional[models.SearchParams] = None,
+    ) -> Dict[str, Any]:
+        """Prefetch, fusion and formula arguments shared by single and batch search."""
+        prefetch_limit = self.prefetch_limit(limit)
+
         prefetches = [
             models.Prefetch(
-                query=models.Document(
-                    text=query_text,
-                    model=SERVER_SIDE_BM25_MODEL,
+                query=(
+                    self.sparse_encoder.encode_query(query_text)
+                    if self.sparse_encoder is not None
+                    else models.Document(
+                        text=query_text,
+                        model=SERVER_SIDE_BM25_MODEL,
+                    )
                 ),
                 using=BM25_VECTOR_NAME,
                 limit=prefetch_limit,
@@ -292,41 +1188,47 @@ class QdrantService:
                     using=DENSE_VECTOR_NAME,
                     limit=prefetch_limit,
                     filter=query_filter,
+                    params=(
+                        search_params
+                        if search_params is not None
+                        else self.dense_search_params()
+                    ),
                 ),
             )
 
         formula_query = self._build_formula_query(query_text)
 
         if len(prefetches) == 1:
-            results = await self.client.query_points(
-                collection_name=self.collection_name,
-                prefetch=prefetches[0],
-                query=formula_query,
-                limit=limit,
-                with_payload=True,
-                timeout=60,
-            )
-            return [point.model_dump() for point in results.points]
+            return {
+                "prefetch": prefetches[0],
+                "query": formula_query,
+                "limit": limit,
+            }
 
         fused_candidates = models.Prefetch(
             prefetch=prefetches,
-            query=models.FusionQuery(fusion=models.Fusion.DBSF),
+            query=models.FusionQuery(fusion=FUSION_METHOD),
             limit=max(prefetch_limit, limit),
         )
 
-        results = await self.client.query_points(
-            collection_name=self.collection_name,
-            prefetch=fused_candidates,
-            query=formula_query,
-            limit=limit,
-            with_payload=True,
-            timeout=60,
-        )
+        return {
+            "prefetch": fused_candidates,
+            "query": formula_query,
+            "limit": limit,
+        }
 
-        return [point.model_dump() for point in results.points]
+    def reference_time(self) -> str:
+        """Recency reference time, floored to RECENCY_REFERENCE_QUANTUM_SECONDS."""
+        now = int(time.time())
+        quantized = now - now % RECENCY_REFERENCE_QUANTUM_SECONDS
+        return (
+            datetime.fromtimestamp(quantized, timezone.utc)
+            .isoformat()
+            .replace("+00:00", "Z")
+        )
 
     def _build_formula_query(self, query_text: str) -> models.FormulaQuery:
-        reference_time = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        reference_time = self.reference_time()
 
         score_parts: List[Any] = [
             "$score",
@@ -339,15 +1241,6 @@ class QdrantService:
                     ),
                 ]
             ),
-            models.MultExpression(
-                mult=[
-                    CONTENT_BOOST,
-                    models.FieldCondition(
-                        key="content",
-                        match=models.MatchText(text=query_text),
-                    ),
-                ]
-            ),
             models.MultExpression(
                 mult=[
                     RECENCY_BOOST,
@@ -364,6 +1257,19 @@ class QdrantService:
                 ]
             ),
         ]
+        if not self.compact_payload:
+            # Compact payloads have no content text to match
+            score_parts.append(
+                models.MultExpression(
+                    mult=[
+                        CONTENT_BOOST,
+                        models.FieldCondition(
+                            key="content",
+                            match=models.MatchText(text=query_text),
+                        ),
+                    ]
+                )
+            )
 
         return models.FormulaQuery(
             formula=models.SumExpression(sum=score_parts),
@@ -375,27 +1281,72 @@ class QdrantService:
         )
 
     async def retrieve(self, document_id: str) -> Optional[Dict[str, Any]]:
-        point = await self.client.retrieve(
-            collection_name=self.collection_name,
-            ids=[document_id],
-            with_payload=True,
-            with_vectors=False,
-        )
+        with span("qdrant_retrieve"):
+            point = await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[document_id],
+                with_payload=True,
+                with_vectors=False,
+            )
 
         if not point:
             return None
 
-        return point[0].model_dump()
+        return self._point_dict(point[0])
+
+    async def retrieve_existing_ids(self, document_ids: List[str]) -> Set[str]:
+        """Return the subset of `document_ids` already stored, in one round-trip."""
+        if not document_ids:
+            return set()
+
+        with span("qdrant_retrieve"):
+            points = await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(dict.fromkeys(document_ids)),
+                with_payload=False,
+                with_vectors=False,
+            )
+
+        stored = {self._normalize_point_id(point.id) for point in points}
+        return {
+            document_id
+            for document_id in document_ids
+            if self._normalize_point_id(document_id) in stored
+        }
+
+    @staticmethod
+    def _normalize_point_id(point_id: Any) -> str:
+        # Qdrant echoes UUIDs back in canonical lowercase-hyphenated form.
+        try:
+            return str(uuid.UUID(str(point_id)))
+        except ValueError:
+            return str(point_id)
 
     async def delete_document(self, document_id: str) -> bool:
         existing = await self.retrieve(document_id)
         if not existing:
             return False
 
+        if self.chunked:
+            points_selector = models.FilterSelector(
+                filter=models.Filter(
+                    should=[
+                        models.HasIdCondition(has_id=[document_id]),
+                        models.FieldCondition(
+                            key=PARENT_ID_FIELD,
+                            match=models.MatchValue(value=document_id),
+                        ),
+                    ]
+                )
+            )
+        else:
+            points_selector = models.PointIdsList(points=[document_id])
+
         await self.client.delete(
             collection_name=self.collection_name,
-            points_selector=models.PointIdsList(points=[document_id]),
+            points_selector=points_selector,
         )
+        self._mark_written()
 
         return True
 
@@ -403,13 +1354,32 @@ class QdrantService:
         self,
         count_filter: Optional[models.Filter] = None,
     ) -> int:
-        count_result = await self.client.count(
-            collection_name=self.collection_name,
-            count_filter=count_filter,
-            exact=True,
-        )
+        with span("qdrant_count"):
+            count_result = await self.client.count(
+                collection_name=self.collection_name,
+                count_filter=self._documents_only(count_filter),
+                exact=True,
+                shard_key_selector=self._shard_key_selector(count_filter),
+            )
         return count_result.count
 
+    async def cached_count_documents(
+        self,
+        count_filter: Optional[models.Filter] = None,
+    ) -> int:
+        """Exact count, reused per filter for `LIST_COUNT_CACHE_TTL_SECONDS`."""
+        key = count_filter.model_dump_json() if count_filter else ""
+        now = time.monotonic()
+        cached = self._count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        count = await self.count_documents(count_filter)
+        if len(self._count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            self._count_cache.clear()
+        self._count_cache[key] = (now + settings.LIST_COUNT_CACHE_TTL_SECONDS, count)
+        return count
+
     async def scroll(
         self,
         limit: int = 10,
@@ -419,29 +1389,209 @@ class QdrantService:
         if offset is None:
             offset = 0
 
-        total_count = await self.count_documents(scroll_filter)
+        total_count = await self.cached_count_documents(scroll_filter)
 
-        results = await self.client.query_points(
-            collection_name=self.collection_name,
-            query=models.OrderByQuery(
-                order_by=models.OrderBy(
-                    key="document_date",
-                    direction=models.Direction.DESC,
-                )
-            ),
-            limit=limit,
-            offset=offset,
-            query_filter=scroll_filter,
-            with_payload=True,
-            with_vectors=False,
-            timeout=60,
-        )
+        with span("qdrant_query_points"):
+            results = await self.client.query_points(
+                collection_name=self.collection_name,
+                query=models.OrderByQuery(
+                    order_by=models.OrderBy(
+                        key="document_date",
+                        direction=models.Direction.DESC,
+                    )
+                ),
+                limit=limit,
+                offset=offset,
+                query_filter=self._documents_only(scroll_filter),
+                with_payload=True,
+                with_vectors=False,
+                shard_key_selector=self._shard_key_selector(scroll_filter),
+                timeout=60,
+            )
 
         return {
-            "items": [point.model_dump() for point in results.points],
+            "items": [self._point_dict(point) for point in results.points],
             "total_count": total_count,
         }
 
+    async def scroll_page(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        scroll_filter: Optional[models.Filter] = None,
+        include_total: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Keyset pagination ordered by (document_date desc, id asc).
+
+        The cursor encodes the last page's boundary date and, when that date's
+        documents continue onto the next page, the ID to resume from. Each
+        page costs at most three bounded queries however deep it is: the rest
+        of the boundary date (scrolled by ID), the newer-than-boundary dates
+        via `OrderByQuery`, and the start of the new boundary date.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        items: List[Dict[str, Any]] = []
+        boundary = decode_page_cursor(cursor) if cursor else None
+        older_than = None
+
+        if boundary is not None:
+            boundary_date, resume_id = boundary
+            if resume_id is not None:
+                block, next_id = await self._scroll_date_block(
+                    boundary_date, scroll_filter, limit, resume_id
+                )
+                items.extend(block)
+                if next_id is not None:
+                    return await self._page_result(
+                        items,
+                        encode_page_cursor(boundary_date, next_id),
+                        scroll_filter,
+                        include_total,
+                    )
+            older_than = boundary_date
+
+        remaining = limit - len(items)
+        if remaining == 0:
+            # The boundary date ended exactly at the page edge
+            return await self._page_result(
+                items,
+                encode_page_cursor(older_than, None),
+                scroll_filter,
+                include_total,
+            )
+
+        ordered = await self._ordered_by_date(scroll_filter, remaining, older_than)
+        if len(ordered) < remaining:
+            items.extend(ordered)
+            return await self._page_result(items, None, scroll_filter, include_total)
+
+        # Dates newer than the last one returned are complete; documents
+        # sharing the last date are re-read in ID order so the page edge is
+        # stable.
+        last_date = ordered[-1]["payload"]["document_date"]
+        last_timestamp = document_timestamp(last_date)
+        items.extend(
+            point
+            for point in ordered
+            if document_timestamp(point["payload"]["document_date"]) != last_timestamp
+        )
+        block, next_id = await self._scroll_date_block(
+            last_date, scroll_filter, limit - len(items)
+        )
+        items.extend(block)
+
+        return await self._page_result(
+            items,
+            encode_page_cursor(last_date, next_id),
+            scroll_filter,
+            include_total,
+        )
+
+    async def _page_result(
+        self,
+        items: List[Dict[str, Any]],
+        next_cursor: Optional[str],
+        scroll_filter: Optional[models.Filter],
+        include_total: bool,
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"items": items, "next_cursor": next_cursor}
+        if include_total:
+            result["total_count"] = await self.cached_count_documents(scroll_filter)
+        return result
+
+    async def _ordered_by_date(
+        self,
+        scroll_filter: Optional[models.Filter],
+        limit: int,
+        older_than: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        query_filter = scroll_filter
+        if older_than is not None:
+            query_filter = self._combine_filters(
+                scroll_filter,
+                models.FieldCondition(
+                    key="document_date",
+                    range=models.DatetimeRange(lt=older_than),
+                ),
+            )
+
+        with span("qdrant_query_points"):
+            results = await self.client.query_points(
+                collection_name=self.collection_name,
+                query=models.OrderByQuery(
+                    order_by=models.OrderBy(
+                        key="document_date",
+                        direction=models.Direction.DESC,
+                    )
+                ),
+                limit=limit,
+                query_filter=self._documents_only(query_filter),
+                with_payload=True,
+                with_vectors=False,
+                shard_key_selector=self._shard_key_selector(query_filter),
+                timeout=60,
+            )
+        return [self._point_dict(point) for point in results.points]
+
+    async def _scroll_date_block(
+        self,
+        document_date: str,
+        scroll_filter: Optional[models.Filter],
+        limit: int,
+        start_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Documents with exactly `document_date`, in ID order from `start_id`."""
+        date_filter = self._combine_filters(
+            scroll_filter,
+            models.FieldCondition(
+                key="document_date",
+                range=models.DatetimeRange(gte=document_date, lte=document_date),
+            ),
+        )
+        with span("qdrant_scroll"):
+            points, next_id = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._documents_only(date_filter),
+                limit=limit,
+                offset=start_id,
+                with_payload=True,
+                with_vectors=False,
+                shard_key_selector=self._shard_key_selector(date_filter),
+                timeout=60,
+            )
+        # Same keys as the scored points returned by `_ordered_by_date`
+        items = [
+            {"version": None, "score": 0.0, **self._point_dict(point)}
+            for point in points
+        ]
+        return items, (str(next_id) if next_id is not None else None)
+
+    @staticmethod
+    def _combine_filters(
+        base: Optional[models.Filter],
+        condition: models.Condition,
+    ) -> models.Filter:
+        if base is None:
+            return models.Filter(must=[condition])
+        return models.Filter(must=[base, condition])
+
+    def _documents_only(self, base: Optional[models.Filter]) -> Optional[models.Filter]:
+        """Restrict a listing, count or deduplication filter to one point per document."""
+        if not self.chunked:
+            return base
+        return models.Filter(
+            must=[base] if base is not None else None,
+            must_not=[
+                models.FieldCondition(
+                    key=CHUNK_INDEX_FIELD,
+                    range=models.Range(gte=1),
+                )
+            ],
+        )
+
     async def find_similar_documents(
         self,
         dense_vector: List[float],
@@ -456,82 +1606,132 @@ class QdrantService:
         if document_type.lower() != "news":
             return []
 
+        similarity_filter = self._similarity_filter(document_date, date_range_days)
+        with span("qdrant_find_similar"):
+            results = await self.client.query_points(
+                collection_name=self.collection_name,
+                query=dense_vector,
+                using=DENSE_VECTOR_NAME,
+                limit=100,
+                query_filter=similarity_filter,
+                with_payload=True,
+                score_threshold=similarity_threshold,
+                search_params=self._similarity_search_params(date_range_days),
+                shard_key_selector=self._shard_key_selector(similarity_filter),
+                timeout=60,
+            )
+
+        return self._similar_points(results.points, similarity_threshold)
+
+    async def find_similar_documents_batch(
+        self,
+        documents: List[Dict[str, Any]],
+        similarity_threshold: float = 0.87,
+        date_range_days: int = 7,
+        limit: int = 1,
+        with_payload: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched `find_similar_documents` over `query_batch_points`.
+
+        Each item needs `dense_vector`, `document_date` and `type`. Results come
+        back in input order; non-news items get an empty list without a query.
+        The default `limit=1` is enough to decide whether a document is a
+        duplicate and keeps the response small.
+        """
+        similar: List[List[Dict[str, Any]]] = [[] for _ in documents]
+        pending = [
+            index
+            for index, doc in enumerate(documents)
+            if doc["type"].lower() == "news"
+        ]
+
+        for start in range(0, len(pending), SIMILARITY_QUERY_BATCH_SIZE):
+            chunk = pending[start : start + SIMILARITY_QUERY_BATCH_SIZE]
+            requests = []
+            for index in chunk:
+                similarity_filter = self._similarity_filter(
+                    documents[index]["document_date"], date_range_days
+                )
+                requests.append(
+                    models.QueryRequest(
+                        query=documents[index]["dense_vector"],
+                        using=DENSE_VECTOR_NAME,
+                        limit=limit,
+                        filter=similarity_filter,
+                        with_payload=with_payload,
+                        score_threshold=similarity_threshold,
+                        params=self._similarity_search_params(date_range_days),
+                        shard_key=self._shard_key_selector(similarity_filter),
+                    )
+                )
+            with span("qdrant_find_similar"):
+                responses = await self.client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=requests,
+                    timeout=60,
+                )
+            for index, response in zip(chunk, responses):
+                similar[index] = self._similar_points(
+                    response.points, similarity_threshold
+                )
+
+        return similar
+
+    def _similarity_filter(
+        self,
+        document_date: str,
+        date_range_days: int,
+    ) -> models.Filter:
         doc_date = self._parse_document_date(document_date)
         start_date = doc_date - timedelta(days=date_range_days)
         end_date = doc_date + timedelta(days=date_range_days)
 
-        date_filter = models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="document_date",
-                    range=models.DatetimeRange(
-                        gte=start_date.isoformat(),
-                        lte=end_date.isoformat(),
+        return self._documents_only(
+            models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="document_date",
+                        range=models.DatetimeRange(
+                            gte=start_date.isoformat(),
+                            lte=end_date.isoformat(),
+                        ),
                     ),
-                ),
-                models.FieldCondition(
-                    key="type",
-                    match=models.MatchValue(value="news"),
-                ),
-            ]
+                    models.FieldCondition(
+                        key="type",
+                        match=models.MatchValue(value="news"),
+                    ),
+                ]
+            )
         )
 
-        results = await self.client.query_points(
-            collection_name=self.collection_name,
-            query=dense_vector,
-            using=DENSE_VECTOR_NAME,
-            limit=100,
-            query_filter=date_filter,
-            with_payload=True,
-            score_threshold=similarity_threshold,
-            timeout=60,
+    def _similarity_search_params(
+        self,
+        date_range_days: int,
+    ) -> Optional[models.SearchParams]:
+        # The window is narrow enough that exact search keeps duplicate
+        # detection complete without scanning much
+        return self.dense_search_params(
+            exact=2 * date_range_days <= settings.EXACT_SEARCH_MAX_DATE_RANGE_DAYS
         )
 
-        similar_docs = []
-        for point in results.points:
-            if point.score >= similarity_threshold:
-                similar_docs.append(
-                    {
-                        "id": str(point.id),
-                        "score": point.score,
-                        "payload": point.payload,
-                    }
-                )
-
-        return similar_docs
-
-    def _parse_document_date(self, document_date: str) -> datetime:
-        date_formats = [
-            "%Y-%m-%dT%H:%M:%S%z",
-            "%Y-%m-%dT%H:%M:%S.%f%z",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S.%f",
-            "%Y-%m-%d",
-            "%d/%m/%Y",
-            "%m/%d/%Y",
-            "%Y/%m/%d",
-            "%d-%m-%Y",
-            "%m-%d-%Y",
-            "%d/%m/%Y %H:%M:%S",
-            "%m/%d/%Y %H:%M:%S",
-            "%Y/%m/%d %H:%M:%S",
-            "%d-%m-%Y %H:%M:%S",
-            "%m-%d-%Y %H:%M:%S",
+    def _similar_points(
+        self,
+        points: List[Any],
+        similarity_threshold: float,
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": str(point.id),
+                "score": point.score,
+                "payload": self._expanded_payload(point.payload),
+            }
+            for point in points
+            if point.score >= similarity_threshold
         ]
 
-        for date_format in date_formats:
-            try:
-                return datetime.strptime(document_date, date_format)
-            except ValueError:
-                continue
-
-        if document_date.endswith("Z"):
-            try:
-                return datetime.fromisoformat(document_date.replace("Z", "+00:00"))
-            except ValueError:
-                pass
-
-        raise ValueError(f"Unable to parse date: {document_date}")
+    def _parse_document_date(self, document_date: str) -> datetime:
+        return parse_document_date(document_date)
 
     async def get_unique_source_names(self) -> List[str]:
         result = await self.client.facet(
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.dates import document_timestamp
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+RECENCY_SCALE_DAYS = 180.0
+
+
+def _tokens(text: str) -> set:
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+class CandidateScorer(ABC):
+    """
+    Scores search candidates for a query; higher is better.
+
+    `score` runs in a worker thread, so it may block. Scorers that set
+    `needs_vectors` receive candidates with their dense vectors attached.
+    """
+
+    name: str = "base"
+    needs_vectors: bool = False
+
+    @abstractmethod
+    def score(
+        self,
+        query: str,
+        query_vector: Optional[List[float]],
+        candidates: Sequence[Dict[str, Any]],
+    ) -> List[float]:
+        """One score per candidate, in candidate order."""
+
+
+class LinearFeatureScorer(CandidateScorer):
+    """
+    Linear model over retrieval features.
+
+    Features per candidate: the fused first-stage score, dense cosine
+    similarity to the query, query-term coverage of the title and of the
+    content, and an exponential recency decay. Weights can be fitted offline
+    and loaded from a JSON file of the form
+    `{"weights": {"fused_score": 1.0, ...}, "bias": 0.0}`.
+    """
+
+    name = "linear"
+    needs_vectors = True
+    FEATURES = (
+        "fused_score",
+        "dense_similarity",
+        "title_coverage",
+        "content_coverage",
+        "recency",
+    )
+    DEFAULT_WEIGHTS = {
+        "fused_score": 1.0,
+        "dense_similarity": 0.5,
+        "title_coverage": 0.3,
+        "content_coverage": 0.15,
+        "recency": 0.1,
+    }
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, bias: float = 0.0):
+        weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        unknown = set(weights) - set(self.FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown reranker features: {sorted(unknown)}")
+        self.weights = np.array([weights[name] for name in self.FEATURES])
+        self.bias = bias
+
+    @classmethod
+    def from_file(cls, path: str) -> "LinearFeatureScorer":
+        with open(path, encoding="utf-8") as handle:
+            model = json.load(handle)
+        return cls(weights=model.get("weights"), bias=model.get("bias", 0.0))
+
+    def features(
+        self,
+        query: str,
+        query_vector: Optional[List[float]],
+        candidates: Sequence[Dict[str, Any]],
+    ) -> np.ndarray:
+        query_terms = _tokens(query)
+        now = time.time()
+        query_unit = None
+        if query_vector is not None:
+            query_unit = np.asarray(query_vector, dtype=np.float32)
+            query_unit /= np.linalg.norm(query_unit) or 1.0
+
+        rows = []
+        for candidate in candidates:
+            payload = candidate.get("payload") or {}
+            dense = 0.0
+            vector = (candidate.get("vector") or {}).get("dense")
+            if query_unit is not None and vector is not None:
+                vector = np.asarray(vector, dtype=np.float32)
+                dense = float(query_unit @ vector / (np.linalg.norm(vector) or 1.0))
+
+            recency = 0.0
+            try:
+                age_days = (now - document_timestamp(payload["document_date"])) / 86400
+                recency = math.exp(-max(age_days, 0.0) / RECENCY_SCALE_DAYS)
+            except (KeyError, ValueError):
+                pass
+
+            rows.append([
+                candidate.get("score") or 0.0,
+                dense,
+                self._coverage(query_terms, payload.get("title") or ""),
+                self._coverage(query_terms, payload.get("content") or ""),
+                recency,
+            ])
+
+        return np.asarray(rows, dtype=np.float64).reshape(-1, len(self.FEATURES))
+
+    @staticmethod
+    def _coverage(query_terms: set, text: str) -> float:
+        if not query_terms:
+            return 0.0
+        return len(query_terms & _tokens(text)) / len(query_terms)
+
+    def score(self, query, query_vector, candidates):
+        return (self.features(query, query_vector, candidates) @ self.weights + self.bias).tolist()
+
+
+class CrossEncoderScorer(CandidateScorer):
+    """
+    Local CPU cross-encoder over (query, title + content) pairs.
+
+    Requires the optional `sentence-transformers` package.
+    """
+
+    name = "cross-encoder"
+    MAX_DOCUMENT_CHARS = 2000
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise RuntimeError(
+                "RERANKER=cross-encoder requires the sentence-transformers package"
+            ) from e
+
+        print(f"Loading cross-encoder {model_name}...")
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+
+    def score(self, query, query_vector, candidates):
+        pairs = []
+        for candidate in candidates:
+            payload = candidate.get("payload") or {}
+            text = f"{payload.get('title') or ''}\n{payload.get('content') or ''}"
+            pairs.append((query, text[: self.MAX_DOCUMENT_CHARS]))
+        return [
+            float(score)
+            for score in self.model.predict(pairs, batch_size=self.batch_size)
+        ]
+
+
+class RerankingService:
+    """
+    Runs a scorer in a thread pool under a per-request latency budget.
+
+    A slot is held per scoring thread until the scorer returns, including
+    scoring that outlived its budget. When every slot is taken, requests skip
+    reranking instead of queueing behind it, so the budget is spent scoring
+    rather than waiting for a worker.
+    """
+
+    def __init__(self, scorer: CandidateScorer, max_workers: int, budget_ms: int):
+        self.scorer = scorer
+        self.budget_ms = budget_ms
+        self.reranked = 0
+        self.fallbacks = 0
+        self.saturated = 0
+        workers = max(1, max_workers)
+        self._slots = asyncio.Semaphore(workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="reranker",
+        )
+
+    async def rerank(
+        self,
+        query: str,
+        query_vector: Optional[List[float]],
+        candidates: List[Dict[str, Any]],
+        limit: int,
+        budget_ms: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Reorder candidates and keep the top `limit`.
+
+        Returns the hits and whether reranking completed. When every scoring
+        thread is busy, or the scorer fails or misses the budget, the
+        first-stage order is kept. Scoring that misses the budget is
+        cancelled; a scorer that has already started finishes in the
+        background and keeps its slot until then.
+        """
+        if len(candidates) <= 1:
+            return candidates[:limit], True
+
+        if self._slots.locked():
+            self.saturated += 1
+            self.fallbacks += 1
+            print("Reranker workers busy, keeping first-stage order")
+            return candidates[:limit], False
+
+        budget = self.budget_ms if budget_ms is None else budget_ms
+        loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+        future = self._executor.submit(self.scorer.score, query, query_vector, candidates)
+        future.add_done_callback(lambda _: self._release_slot(loop))
+        try:
+            scores = await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=budget / 1000,
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.fallbacks += 1
+            print(f"Reranker exceeded {budget}ms budget, keeping first-stage order")
+            return candidates[:limit], False
+        except Exception as e:
+            self.fallbacks += 1
+            print(f"Reranker failed, keeping first-stage order: {e}")
+            return candidates[:limit], False
+
+        self.reranked += 1
+        order = sorted(range(len(candidates)), key=lambda index: -scores[index])
+        return [candidates[index] for index in order[:limit]], True
+
+    def _release_slot(self, loop: asyncio.AbstractEventLoop):
+        # Called from the scoring thread
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:
+            # The request's loop has closed; nothing is waiting on it
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scorer": self.scorer.name,
+            "budget_ms": self.budget_ms,
+            "reranked": self.reranked,
+            "fallbacks": self.fallbacks,
+            "saturated": self.saturated,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_reranking_service() -> Optional[RerankingService]:
+    """Create the reranker selected by `RERANKER`, or None when disabled."""
+    if settings.RERANKER == "none":
+        return None
+
+    if settings.RERANKER == "linear":
+        scorer: CandidateScorer = (
+            LinearFeatureScorer.from_file(settings.RERANKER_LINEAR_WEIGHTS_PATH)
+            if settings.RERANKER_LINEAR_WEIGHTS_PATH
+            else LinearFeatureScorer()
+        )
+    elif settings.RERANKER == "cross-encoder":
+        scorer = CrossEncoderScorer(settings.RERANKER_CROSS_ENCODER_MODEL)
+    else:
+        raise ValueError(
+            f"Unknown RERANKER {settings.RERANKER!r}; "
+            "expected none, linear or cross-encoder"
+        )
+
+    return RerankingService(
+        scorer,
+        max_workers=settings.RERANKER_WORKERS,
+        budget_ms=settings.RERANKER_BUDGET_MS,
+    )
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def search_cache_key(
+    query: str,
+    filters: Dict[str, Any],
+    limit: int,
+    use_dense: bool,
+    generation: int,
+    reference_time: str,
+    rerank: bool = False,
+    search_params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Signature of a search request against one collection state.
+
+    List filters are order-insensitive, and empty filters are dropped, so
+    equivalent requests share an entry. `generation` and `reference_time`
+    make entries unreachable as soon as the collection changes or the
+    recency reference moves on.
+    """
+    normalized_filters = {}
+    for name, value in filters.items():
+        if value is None or value == []:
+            continue
+        if isinstance(value, list):
+            value = sorted(
+                item.value if hasattr(item, "value") else item for item in value
+            )
+        normalized_filters[name] = value
+
+    payload = {
+        "query": normalize_query(query),
+        "filters": normalized_filters,
+        "limit": limit,
+        "use_dense": use_dense,
+        "rerank": rerank,
+        "search_params": {
+            name: value
+            for name, value in (search_params or {}).items()
+            if value is not None
+        },
+        "generation": generation,
+        "reference_time": reference_time,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+# Upserts are sent with wait=False, so a search right after a write may not
+# see it yet; such results are served but not cached.
+WRITE_SETTLE_SECONDS = 5.0
+
+
+class SearchResultCache:
+    """
+    In-process TTL + LRU cache of search results.
+
+    Cached result lists are shared between hits; callers must not mutate them.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(0, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        key: str,
+        results: List[Dict[str, Any]],
+        last_write_at: Optional[float] = None,
+    ):
+        if not self.enabled:
+            return
+        if (
+            last_write_at is not None
+            and time.monotonic() - last_write_at < WRITE_SETTLE_SECONDS
+        ):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,155 @@
+"""Client-side BM25 sparse encoding.
+
+Documents are encoded as BM25 term-frequency weights and queries as
+unit-weight term sets. IDF is left to the collection's `Modifier.IDF`, so
+Qdrant's sparse scoring adds up to Okapi BM25. Term IDs are hashes of the
+tokens, which are not the IDs the server-side `qdrant/bm25` model produces:
+a collection must be indexed and queried with the same encoder.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from qdrant_client import models
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+MAX_TOKEN_LENGTH = 40
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Batches smaller than this are encoded inline; process hand-off costs more
+PROCESS_POOL_MIN_TEXTS = 64
+
+# English and Indonesian function words
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have in is it its of on or that
+    the their this to was were will with
+    ada adalah akan atau dalam dan dari dengan di ini itu juga ke oleh pada
+    para sebagai sudah telah tersebut untuk yang
+    """.split()
+)
+
+SparseEncoding = Tuple[List[int], List[float]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, accent-folded word tokens without stopwords."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(folded)
+        if token not in STOPWORDS and len(token) <= MAX_TOKEN_LENGTH
+    ]
+
+
+@lru_cache(maxsize=200_000)
+def term_id(token: str) -> int:
+    """Stable 32-bit term ID; Python's `hash` differs between processes."""
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little"
+    )
+
+
+def encode_document(text: str, avg_doc_length: float) -> SparseEncoding:
+    """BM25 term weights `tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))`."""
+    tokens = tokenize(text)
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_doc_length)
+    weights: Dict[int, float] = {}
+    for token, frequency in Counter(tokens).items():
+        index = term_id(token)
+        # Hash collisions add up, like repeated terms
+        weights[index] = weights.get(index, 0.0) + frequency
+    return (
+        list(weights),
+        [
+            frequency * (BM25_K1 + 1) / (frequency + length_norm)
+            for frequency in weights.values()
+        ],
+    )
+
+
+def encode_documents(texts: Sequence[str], avg_doc_length: float) -> List[SparseEncoding]:
+    return [encode_document(text, avg_doc_length) for text in texts]
+
+
+def encode_query(text: str) -> SparseEncoding:
+    indices = sorted({term_id(token) for token in tokenize(text)})
+    return indices, [1.0] * len(indices)
+
+
+class BM25Encoder:
+    """
+    Encodes documents in a process pool and caches query vectors.
+
+    With `workers=0`, or for small batches, documents are encoded inline.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        avg_doc_length: float = 256.0,
+        query_cache_size: int = 4096,
+    ):
+        self.avg_doc_length = avg_doc_length
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if workers > 0:
+            # spawn: the service process runs threads, which fork does not copy
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        self._encode_query = lru_cache(maxsize=query_cache_size)(self._build_query_vector)
+
+    async def encode_documents(self, texts: Sequence[str]) -> List[models.SparseVector]:
+        if self._executor is None or len(texts) < PROCESS_POOL_MIN_TEXTS:
+            encoded = encode_documents(texts, self.avg_doc_length)
+        else:
+            loop = asyncio.get_running_loop()
+            size = -(-len(texts) // self.workers)
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(
+                    self._executor,
+                    encode_documents,
+                    list(texts[start : start + size]),
+                    self.avg_doc_length,
+                )
+                for start in range(0, len(texts), size)
+            ))
+            encoded = [item for part in parts for item in part]
+
+        return [
+            models.SparseVector(indices=indices, values=values)
+            for indices, values in encoded
+        ]
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        return self._encode_query(" ".join(text.split()))
+
+    @staticmethod
+    def _build_query_vector(text: str) -> models.SparseVector:
+        indices, values = encode_query(text)
+        return models.SparseVector(indices=indices, values=values)
+
+    def stats(self) -> Dict[str, int]:
+        info = self._encode_query.cache_info()
+        return {
+            "workers": self.workers,
+            "query_cache_hits": info.hits,
+            "query_cache_misses": info.misses,
+            "query_cache_size": info.currsize,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,392 @@
+"""
+Offline retrieval benchmark for the knowledge service.
+
+Runs the real ingest, search and list code against in-memory Qdrant, with a
+deterministic stand-in for the OpenRouter embeddings API and the client-side
+BM25 encoder (local mode cannot run the server-side BM25 model). A synthetic
+investment-document corpus is generated from a seed, and a labeled query set
+is replayed against it.
+
+Reports p50/p95/p99 latency for ingest batches, searches and list pages, and
+recall@k and nDCG@k for hybrid and BM25-only search. Results are written as
+sorted JSON, so runs can be diffed between commits. Latencies are in-process
+local-mode timings: compare them between runs of this script, not with a
+Qdrant server.
+
+Usage:
+    python scripts/benchmark_retrieval.py --documents 2000 --queries 100 \\
+        --output benchmark.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import qdrant as qdrant_module
+from app.services.embeddings import EmbeddingService
+from app.services.ingest import ingest_batch
+from app.services.sparse_encoding import tokenize
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+COMPANIES = [
+    ("BBCA", "Bank Central Asia", "financials", "banks"),
+    ("BBRI", "Bank Rakyat Indonesia", "financials", "banks"),
+    ("BMRI", "Bank Mandiri", "financials", "banks"),
+    ("TLKM", "Telkom Indonesia", "infrastructure", "telecommunication"),
+    ("ISAT", "Indosat Ooredoo Hutchison", "infrastructure", "telecommunication"),
+    ("JSMR", "Jasa Marga", "infrastructure", "toll_roads"),
+    ("ADRO", "Adaro Energy", "energy", "coal_mining"),
+    ("PTBA", "Bukit Asam", "energy", "coal_mining"),
+    ("ANTM", "Aneka Tambang", "basic_materials", "metals"),
+    ("INCO", "Vale Indonesia", "basic_materials", "metals"),
+    ("SMGR", "Semen Indonesia", "basic_materials", "cement"),
+    ("UNVR", "Unilever Indonesia", "consumer_non_cyclicals", "household_products"),
+    ("ICBP", "Indofood CBP", "consumer_non_cyclicals", "food_processing"),
+    ("ASII", "Astra International", "industrials", "automotive"),
+]
+
+TOPICS = {
+    "dividend": ["dividend", "payout ratio", "cash dividend", "dividend yield"],
+    "earnings": ["net profit", "quarterly earnings", "revenue growth", "operating margin"],
+    "capex": ["capital expenditure", "capex budget", "expansion plan", "new capacity"],
+    "debt": ["bond issuance", "loan refinancing", "credit facility", "leverage ratio"],
+    "acquisition": ["acquisition", "takeover bid", "merger talks", "stake purchase"],
+    "buyback": ["share buyback", "repurchase program", "treasury shares", "buyback budget"],
+    "guidance": ["full year guidance", "outlook revision", "target raised", "management forecast"],
+    "regulation": ["new regulation", "ministry policy", "export ban", "tariff change"],
+}
+
+FILLER = [
+    "Analysts expect the market to react in the coming weeks.",
+    "The company disclosed the details in a statement to the exchange.",
+    "Foreign investors were net buyers during the session.",
+    "The broader index closed slightly higher on the day.",
+    "Management declined to comment on further plans.",
+    "Trading volume was above the monthly average.",
+    "The rupiah weakened against the dollar this week.",
+    "Several brokers maintained their buy recommendations.",
+]
+
+DOCUMENT_TYPES = [("news", 0.6), ("analysis", 0.2), ("filing", 0.15), ("rumour", 0.05)]
+DATE_SPAN_DAYS = 365
+PERCENTILES = (50, 95, 99)
+
+
+class TopicalFakeOpenRouter(FakeOpenRouter):
+    """
+    Deterministic embeddings with lexical semantics: the normalized sum of
+    fixed random vectors for the text's tokens. Texts sharing terms end up
+    close, so dense retrieval quality is measurable.
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _token_vector(token: str, dimensions: int) -> np.ndarray:
+        return np.asarray(FakeOpenRouter.vector(token, dimensions))
+
+    def vector(self, text: str, dimensions: int) -> List[float]:
+        tokens = tokenize(text)
+        if not tokens:
+            return FakeOpenRouter.vector(text, dimensions)
+        total = sum(self._token_vector(token, dimensions) for token in tokens)
+        return (total / np.linalg.norm(total)).tolist()
+
+
+def _document_id(index: int) -> str:
+    return f"00000000-0000-4000-8000-{index:012d}"
+
+
+def build_corpus(size: int, seed: int, now: datetime) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    types, weights = zip(*DOCUMENT_TYPES)
+    documents = []
+    for index in range(size):
+        symbol, name, subsector, subindustry = rng.choice(COMPANIES)
+        topic = rng.choice(list(TOPICS))
+        phrases = TOPICS[topic]
+        doc_type = rng.choices(types, weights)[0]
+        sentences = [
+            f"{name} ({symbol}) announced {rng.choice(phrases)} details.",
+            f"The {rng.choice(phrases)} was discussed by management.",
+            *rng.sample(FILLER, rng.randint(1, 4)),
+            f"Investors focused on the {rng.choice(phrases)} of {name}.",
+        ]
+        rng.shuffle(sentences)
+        document_date = now - timedelta(days=rng.randrange(DATE_SPAN_DAYS))
+        source = {"name": rng.choice(["kontan", "bisnis", "idx", "stockbit"])}
+        if doc_type == "rumour":
+            source["platform"] = "stockbit"
+        documents.append({
+            "id": _document_id(index),
+            "type": doc_type,
+            "title": f"{symbol} {rng.choice(phrases)} update",
+            "content": " ".join(sentences),
+            "document_date": document_date.strftime("%Y-%m-%d"),
+            "source": source,
+            "symbols": [symbol],
+            "subsectors": [subsector],
+            "subindustries": [subindustry],
+            # Benchmark labels, ignored by the service
+            "_topic": topic,
+        })
+    return documents
+
+
+def build_queries(
+    documents: Sequence[Dict[str, Any]],
+    count: int,
+    seed: int,
+    now: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Labeled queries for (company, topic) pairs present in the corpus.
+
+    Grade 2: same company and topic. Grade 1: same topic, another company in
+    the same subsector. Every third query also filters to the last 90 days.
+    """
+    rng = random.Random(seed + 1)
+    pairs = sorted({(doc["symbols"][0], doc["_topic"]) for doc in documents})
+    names = {symbol: (name, subsector) for symbol, name, subsector, _ in COMPANIES}
+    queries = []
+    for index in range(count):
+        symbol, topic = rng.choice(pairs)
+        name, subsector = names[symbol]
+        phrase = rng.choice(TOPICS[topic])
+        text = f"{symbol} {phrase}" if index % 2 else f"{name} {phrase}"
+
+        filters: Dict[str, Any] = {}
+        date_from: Optional[str] = None
+        if index % 3 == 2:
+            date_from = (now - timedelta(days=90)).strftime("%Y-%m-%d")
+            filters["date_from"] = date_from
+
+        relevance = {}
+        for doc in documents:
+            if date_from and doc["document_date"] < date_from:
+                continue
+            if doc["_topic"] != topic:
+                continue
+            if doc["symbols"][0] == symbol:
+                relevance[doc["id"]] = 2
+            elif doc["subsectors"][0] == subsector:
+                relevance[doc["id"]] = 1
+        queries.append({"text": text, "filters": filters, "relevance": relevance})
+    return queries
+
+
+def recall_at_k(ranked: Sequence[str], relevance: Dict[str, int], k: int) -> float:
+    """Fully relevant (grade 2) hits in the top k over min(k, number relevant)."""
+    relevant = {doc_id for doc_id, grade in relevance.items() if grade == 2}
+    if not relevant:
+        return 1.0
+    return len(relevant & set(ranked[:k])) / min(k, len(relevant))
+
+
+def ndcg_at_k(ranked: Sequence[str], relevance: Dict[str, int], k: int) -> float:
+    def dcg(grades: Sequence[int]) -> float:
+        return sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(grades))
+
+    ideal = dcg(sorted(relevance.values(), reverse=True)[:k])
+    if ideal == 0:
+        return 1.0
+    return dcg([relevance.get(doc_id, 0) for doc_id in ranked[:k]]) / ideal
+
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {}
+    summary = {
+        f"p{percentile}": round(float(np.percentile(samples_ms, percentile)), 3)
+        for percentile in PERCENTILES
+    }
+    summary["mean"] = round(float(np.mean(samples_ms)), 3)
+    summary["count"] = len(samples_ms)
+    return summary
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _configure_settings(bm25_workers: int):
+    settings.OPENROUTER_API_KEY = settings.OPENROUTER_API_KEY or "benchmark"
+    settings.BM25_ENCODER = "client"
+    settings.BM25_ENCODER_WORKERS = bm25_workers
+    # Measure the uncached paths
+    settings.EMBEDDING_CACHE_PATH = ""
+    settings.QUERY_EMBEDDING_LRU_SIZE = 0
+
+
+async def run_benchmark(
+    documents: int = 2000,
+    queries: int = 100,
+    batch_size: int = 50,
+    k: int = 10,
+    seed: int = 42,
+    list_pages: int = 20,
+    bm25_workers: int = 0,
+) -> Dict[str, Any]:
+    _configure_settings(bm25_workers)
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    corpus = build_corpus(documents, seed, now)
+
+    fake = TopicalFakeOpenRouter()
+    emb_svc = EmbeddingService()
+    emb_svc.openrouter_client = fake.client()
+    qdrant_svc = LocalQdrantService(dimension=EmbeddingService.DENSE_DIMENSION, sparse=True)
+
+    try:
+        await qdrant_svc.create_collection()
+
+        ingest_ms = []
+        ingested = 0
+        skipped_ids = set()
+        ingest_started = time.perf_counter()
+        for start in range(0, len(corpus), batch_size):
+            batch = [
+                {key: value for key, value in doc.items() if not key.startswith("_")}
+                for doc in corpus[start : start + batch_size]
+            ]
+            started = time.perf_counter()
+            result = await ingest_batch(emb_svc, qdrant_svc, batch, wait=True)
+            ingest_ms.append((time.perf_counter() - started) * 1000)
+            ingested += result["count"]
+            skipped_ids.update(skipped["id"] for skipped in result["skipped_documents"])
+        ingest_seconds = time.perf_counter() - ingest_started
+
+        # Label against what was actually indexed: near-duplicates get skipped
+        indexed = [doc for doc in corpus if doc["id"] not in skipped_ids]
+        query_set = build_queries(indexed, queries, seed, now)
+
+        search_results = {}
+        for mode, use_dense in (("hybrid", True), ("bm25", False)):
+            latencies, recalls, ndcgs = [], [], []
+            for query in query_set:
+                started = time.perf_counter()
+                query_vector = await emb_svc.embed_query(query["text"]) if use_dense else None
+                query_filter = (
+                    qdrant_svc.build_filter(query["filters"]) if query["filters"] else None
+                )
+                hits = await qdrant_svc.search(
+                    query_text=query["text"],
+                    query_vector=query_vector,
+                    limit=k,
+                    query_filter=query_filter,
+                    use_dense=use_dense,
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                ranked = [str(hit["id"]) for hit in hits]
+                recalls.append(recall_at_k(ranked, query["relevance"], k))
+                ndcgs.append(ndcg_at_k(ranked, query["relevance"], k))
+            search_results[mode] = {
+                "latency_ms": latency_summary(latencies),
+                f"recall@{k}": round(float(np.mean(recalls)), 4),
+                f"ndcg@{k}": round(float(np.mean(ndcgs)), 4),
+            }
+
+        list_ms = []
+        for list_filter in (None, qdrant_svc.build_filter({"symbols": ["BBCA", "TLKM"]})):
+            cursor = None
+            for _ in range(list_pages):
+                started = time.perf_counter()
+                page = await qdrant_svc.scroll_page(
+                    limit=20, cursor=cursor, scroll_filter=list_filter, include_total=False
+                )
+                list_ms.append((time.perf_counter() - started) * 1000)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+    finally:
+        qdrant_svc.close()
+
+    return {
+        "commit": _commit(),
+        "config": {
+            "documents": documents,
+            "queries": queries,
+            "batch_size": batch_size,
+            "k": k,
+            "seed": seed,
+            "list_pages": list_pages,
+        },
+        "parameters": {
+            "PREFETCH_CANDIDATE_MULTIPLIER": qdrant_module.PREFETCH_CANDIDATE_MULTIPLIER,
+            "PREFETCH_MAX_LIMIT": qdrant_module.PREFETCH_MAX_LIMIT,
+            "FUSION_METHOD": str(qdrant_module.FUSION_METHOD.value),
+            "TITLE_BOOST": qdrant_module.TITLE_BOOST,
+            "CONTENT_BOOST": qdrant_module.CONTENT_BOOST,
+            "RECENCY_BOOST": qdrant_module.RECENCY_BOOST,
+            "RECENCY_SCALE_SECONDS": qdrant_module.RECENCY_SCALE_SECONDS,
+        },
+        "ingest": {
+            "batch_latency_ms": latency_summary(ingest_ms),
+            "documents_per_second": round(ingested / ingest_seconds, 2) if ingest_seconds else None,
+            "ingested": ingested,
+            "skipped_duplicates": len(skipped_ids),
+        },
+        "search": search_results,
+        "list": {"page_latency_ms": latency_summary(list_ms)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10, help="Cutoff for recall@k and nDCG@k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--list-pages", type=int, default=20)
+    parser.add_argument(
+        "--bm25-workers",
+        type=int,
+        default=0,
+        help="BM25 encoding processes; 0 encodes inline",
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(
+        documents=args.documents,
+        queries=args.queries,
+        batch_size=args.batch_size,
+        k=args.k,
+        seed=args.seed,
+        list_pages=args.list_pages,
+        bm25_workers=args.bm25_workers,
+    ))
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+        print(f"Results written to {args.output}")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
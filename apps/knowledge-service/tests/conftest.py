@@ -0,0 +1,54 @@
+"""Shared fixtures for the knowledge-service tests."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.core.config import settings
+from app.services.embeddings import EmbeddingService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def document_uuid(number: int) -> str:
+    """A fixed, valid Qdrant point ID per number."""
+    return f"00000000-0000-0000-0000-{number:012d}"
+
+
+def make_document(doc_id: str, content: str, **overrides) -> dict:
+    """An ingestable document; keyword arguments replace its fields."""
+    doc = {
+        "id": doc_id,
+        "type": "news",
+        "title": "BBCA earnings",
+        "content": content,
+        "document_date": "2025-01-10",
+        "source": {"name": "test"},
+        "symbols": ["BBCA"],
+    }
+    doc.update(overrides)
+    return doc
+
+
+@pytest.fixture
+def make_embedding_service(monkeypatch):
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "test-key")
+
+    def make(
+        fake: FakeOpenRouter,
+        max_concurrency: int = 4,
+        cache_path: str = "",
+        cache_max_entries: int = 1000,
+        query_lru_size: int = 0,
+    ) -> EmbeddingService:
+        monkeypatch.setattr(settings, "EMBEDDING_MAX_CONCURRENCY", max_concurrency)
+        monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", cache_path)
+        monkeypatch.setattr(settings, "EMBEDDING_CACHE_MAX_ENTRIES", cache_max_entries)
+        monkeypatch.setattr(settings, "QUERY_EMBEDDING_LRU_SIZE", query_lru_size)
+        service = EmbeddingService()
+        service.openrouter_client = fake.client()
+        return service
+
+    return make
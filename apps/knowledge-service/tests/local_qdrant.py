@@ -0,0 +1,53 @@
+"""QdrantService backed by qdrant-client's in-memory local mode.
+
+Local mode cannot run server-side BM25 inference, so by default this variant
+stores the dense vector only. With `sparse=True` it also stores the BM25
+sparse vector, which needs the client-side encoder (`BM25_ENCODER=client`).
+Everything else goes through the real service code.
+"""
+
+from typing import Any, Dict, List
+
+from qdrant_client import AsyncQdrantClient, models
+
+from app.services.qdrant import BM25_VECTOR_NAME, DENSE_VECTOR_NAME, QdrantService
+
+
+class LocalQdrantService(QdrantService):
+    def __init__(self, dimension: int, sparse: bool = False):
+        super().__init__()
+        self.client = AsyncQdrantClient(location=":memory:")
+        self.dimension = dimension
+        self.sparse = sparse
+        if sparse and self.sparse_encoder is None:
+            raise ValueError("sparse=True needs BM25_ENCODER=client")
+
+    async def create_collection(self):
+        await self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config={
+                DENSE_VECTOR_NAME: models.VectorParams(
+                    size=self.dimension, distance=models.Distance.COSINE
+                ),
+            },
+            sparse_vectors_config=(
+                {BM25_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+                if self.sparse
+                else None
+            ),
+        )
+
+    def _point_vector(self, dense_vector, bm25_text, bm25_vector=None) -> Dict[str, Any]:
+        if self.sparse:
+            return super()._point_vector(dense_vector, bm25_text, bm25_vector)
+        return {DENSE_VECTOR_NAME: dense_vector}
+
+    async def upsert_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        wait: bool = False,
+    ):
+        # Fixtures may omit bm25_text, which dense-only points never use
+        await super().upsert_documents(
+            [{"bm25_text": "", **doc} for doc in documents], wait=wait
+        )
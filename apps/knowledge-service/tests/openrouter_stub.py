@@ -0,0 +1,83 @@
+"""In-process stand-in for the OpenRouter embeddings API.
+
+Plugs into the real `OpenRouter` SDK through an `httpx.MockTransport`, so the
+service's request building, response parsing and error mapping all run
+unchanged without network access.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import List
+
+import httpx
+import numpy as np
+from openrouter import OpenRouter
+
+
+class FakeOpenRouter:
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        rate_limited_calls: int = 0,
+        retry_after: float = 0.0,
+    ):
+        self.latency = latency
+        self.rate_limited_calls = rate_limited_calls
+        self.retry_after = retry_after
+        self.calls = 0
+        self.inputs: List[List[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def client(self) -> OpenRouter:
+        return OpenRouter(
+            api_key="test-key",
+            async_client=httpx.AsyncClient(
+                transport=httpx.MockTransport(self._handle)
+            ),
+        )
+
+    @staticmethod
+    def vector(text: str, dimensions: int) -> List[float]:
+        """Deterministic unit vector for `text`."""
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+        values = np.random.default_rng(seed).standard_normal(dimensions)
+        return (values / np.linalg.norm(values)).tolist()
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.rate_limited_calls > 0:
+                self.rate_limited_calls -= 1
+                return httpx.Response(
+                    429,
+                    headers={"retry-after": str(self.retry_after)},
+                    json={"error": {"code": 429, "message": "Rate limit exceeded"}},
+                )
+
+            self.inputs.append(inputs)
+            dimensions = body.get("dimensions", 8)
+            return httpx.Response(
+                200,
+                json={
+                    "object": "list",
+                    "model": body["model"],
+                    "data": [
+                        {
+                            "object": "embedding",
+                            "index": index,
+                            "embedding": self.vector(text, dimensions),
+                        }
+                        for index, text in enumerate(inputs)
+                    ],
+                },
+            )
+        finally:
+            self.in_flight -= 1
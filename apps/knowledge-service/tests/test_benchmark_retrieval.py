@@ -0,0 +1,58 @@
+"""Smoke test for the offline retrieval benchmark script."""
+
+import asyncio
+import importlib.util
+import os
+
+from app.core.config import settings
+
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "scripts",
+    "benchmark_retrieval.py",
+)
+
+
+def load_benchmark():
+    spec = importlib.util.spec_from_file_location("benchmark_retrieval", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_ranking_metrics():
+    benchmark = load_benchmark()
+    relevance = {"a": 2, "b": 2, "c": 1}
+
+    assert benchmark.recall_at_k(["a", "x", "b"], relevance, 3) == 1.0
+    assert benchmark.recall_at_k(["a", "x", "b"], relevance, 1) == 1.0
+    assert benchmark.recall_at_k(["x", "c", "a"], relevance, 3) == 0.5
+    assert benchmark.ndcg_at_k(["a", "b", "c"], relevance, 3) == 1.0
+    assert 0 < benchmark.ndcg_at_k(["c", "b", "a"], relevance, 3) < 1.0
+    assert benchmark.ndcg_at_k(["x", "y"], relevance, 2) == 0.0
+
+
+def test_benchmark_reports_latency_and_quality(monkeypatch):
+    benchmark = load_benchmark()
+    # The script configures the global settings; restore them afterwards
+    for name in (
+        "OPENROUTER_API_KEY",
+        "BM25_ENCODER",
+        "BM25_ENCODER_WORKERS",
+        "EMBEDDING_CACHE_PATH",
+        "QUERY_EMBEDDING_LRU_SIZE",
+    ):
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+
+    results = asyncio.run(benchmark.run_benchmark(
+        documents=60, queries=6, batch_size=20, k=5, list_pages=2
+    ))
+
+    assert results["ingest"]["ingested"] + results["ingest"]["skipped_duplicates"] == 60
+    assert set(results["ingest"]["batch_latency_ms"]) >= {"p50", "p95", "p99"}
+    assert results["list"]["page_latency_ms"]["count"] >= 2
+    for mode in ("hybrid", "bm25"):
+        assert results["search"][mode]["latency_ms"]["count"] == 6
+        assert results["search"][mode]["recall@5"] > 0
+        assert 0 < results["search"][mode]["ndcg@5"] <= 1
@@ -0,0 +1,143 @@
+"""Chunked indexing: chunk splitting, chunk points and grouped search."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.document_processing import split_content_chunks
+from app.services.embeddings import EmbeddingService
+from app.services.ingest import ingest_batch
+from app.services.qdrant import DENSE_VECTOR_NAME, DOCUMENT_CONTENT_FIELD, chunk_point_id
+from tests.conftest import document_uuid, make_document
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+LONG_CONTENT = " ".join(f"Sentence {index} about capex plans." for index in range(60))
+
+
+class ChunkedQdrantService(LocalQdrantService):
+    """Chunked local service; search runs the dense query alone (no BM25 locally)."""
+
+    def __init__(self):
+        super().__init__(dimension=EmbeddingService.DENSE_DIMENSION)
+        self.chunked = True
+
+    def _search_query(
+        self, query_text, query_vector, limit, query_filter, use_dense, search_params=None
+    ):
+        return {
+            "query": query_vector,
+            "using": DENSE_VECTOR_NAME,
+            "query_filter": query_filter,
+            "search_params": search_params,
+            "limit": limit,
+        }
+
+
+def test_split_content_chunks_overlap_and_bounds():
+    chunks = split_content_chunks(LONG_CONTENT, chunk_size=300, overlap=60)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    # Chunks break after a sentence and the next one repeats its tail
+    assert all(chunk.endswith(".") for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split(" ", 1)[0] in previous[-80:]
+    assert split_content_chunks("short text", 300, 60) == ["short text"]
+
+
+def test_chunked_documents_list_update_search_and_delete(make_embedding_service, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_SIZE_CHARS", 300)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP_CHARS", 60)
+    long_id, short_id = document_uuid(1), document_uuid(2)
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = ChunkedQdrantService()
+        await qdrant_svc.create_collection()
+        client = qdrant_svc.client
+        name = qdrant_svc.collection_name
+
+        result = await ingest_batch(
+            emb_svc,
+            qdrant_svc,
+            [make_document(long_id, LONG_CONTENT), make_document(short_id, "Dividend raised", type="news")],
+            wait=True,
+        )
+        chunk_count = len(split_content_chunks(LONG_CONTENT, 300, 60))
+        assert result["count"] == 2
+        assert (await client.count(name)).count == chunk_count + 1
+
+        # Listings, counts and retrieval see documents, not chunks
+        page = await qdrant_svc.scroll_page(limit=10)
+        assert sorted(item["id"] for item in page["items"]) == [long_id, short_id]
+        assert page["total_count"] == 2
+        stored = await qdrant_svc.retrieve(long_id)
+        assert stored["payload"]["content"] == LONG_CONTENT
+        assert stored["payload"]["chunk_count"] == chunk_count
+        assert DOCUMENT_CONTENT_FIELD not in stored["payload"]
+        # The indexed content of the first chunk is its own text only
+        first_chunk = (await client.retrieve(name, [long_id], with_payload=True))[0]
+        assert first_chunk.payload["content"] == split_content_chunks(LONG_CONTENT, 300, 60)[0]
+        assert first_chunk.payload[DOCUMENT_CONTENT_FIELD] == LONG_CONTENT
+
+        # A chunk's own text finds its whole document, once
+        last_chunk = await qdrant_svc.retrieve(chunk_point_id(long_id, chunk_count - 1))
+        query_vector = (await client.retrieve(
+            name, [last_chunk["id"]], with_vectors=True
+        ))[0].vector[DENSE_VECTOR_NAME]
+        hits = await qdrant_svc.search("capex", query_vector, limit=5)
+        assert [hit["id"] for hit in hits] == [long_id, short_id]
+        assert hits[0]["payload"]["content"] == LONG_CONTENT
+
+        # A shorter update drops the old trailing chunks
+        await ingest_batch(
+            emb_svc, qdrant_svc, [make_document(long_id, "Now a short filing")], wait=True
+        )
+        assert (await client.count(name)).count == 2
+
+        assert await qdrant_svc.delete_document(long_id)
+        assert (await client.count(name)).count == 1
+
+    asyncio.run(run())
+
+
+def test_id_filters_cover_every_chunk_of_a_document(make_embedding_service, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_SIZE_CHARS", 300)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP_CHARS", 60)
+    long_id, short_id = document_uuid(1), document_uuid(2)
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = ChunkedQdrantService()
+        await qdrant_svc.create_collection()
+        await ingest_batch(
+            emb_svc,
+            qdrant_svc,
+            [make_document(long_id, LONG_CONTENT), make_document(short_id, "Dividend raised")],
+            wait=True,
+        )
+        # Query with a later chunk's own vector, so that chunk is the best match
+        chunk_count = len(split_content_chunks(LONG_CONTENT, 300, 60))
+        last_chunk_id = chunk_point_id(long_id, chunk_count - 1)
+        query_vector = (await qdrant_svc.client.retrieve(
+            qdrant_svc.collection_name, [last_chunk_id], with_vectors=True
+        ))[0].vector[DENSE_VECTOR_NAME]
+
+        async def search(filters):
+            return await qdrant_svc.search(
+                "capex", query_vector, limit=5,
+                query_filter=qdrant_svc.build_filter(filters),
+            )
+
+        return await search({"exclude_ids": [long_id]}), await search({"include_ids": [long_id]})
+
+    excluded, included = asyncio.run(run())
+
+    assert [hit["id"] for hit in excluded] == [short_id]
+    assert [hit["id"] for hit in included] == [long_id]
+    assert included[0]["score"] > 0.99
@@ -0,0 +1,77 @@
+"""document_date parsing and normalization at ingest."""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.dates import normalize_document_date, parse_document_date
+from app.models.investment import InvestmentDocument
+from app.services.document_processing import prepare_retrieval_text
+from app.services.ingest import parse_ndjson_document
+
+
+@pytest.mark.parametrize(
+    ("raw", "normalized"),
+    [
+        ("2025-01-15", "2025-01-15T00:00:00Z"),
+        ("2025-01-15T14:30:00", "2025-01-15T14:30:00Z"),
+        ("2025-01-15T14:30:00.250", "2025-01-15T14:30:00.250000Z"),
+        ("2025-01-15T14:30:00Z", "2025-01-15T14:30:00Z"),
+        ("2025-01-15T14:30:00+07:00", "2025-01-15T14:30:00+07:00"),
+        ("2025/01/15", "2025-01-15T00:00:00Z"),
+        ("2025/01/15 14:30:00", "2025-01-15T14:30:00Z"),
+        ("15/01/2025", "2025-01-15T00:00:00Z"),
+        ("01/15/2025", "2025-01-15T00:00:00Z"),
+        ("15-01-2025 14:30:00", "2025-01-15T14:30:00Z"),
+        # Ambiguous numeric dates are day-first
+        ("01/02/2025", "2025-02-01T00:00:00Z"),
+    ],
+)
+def test_accepted_formats_normalize_to_rfc3339(raw, normalized):
+    assert normalize_document_date(raw) == normalized
+    assert normalize_document_date(normalized) == normalized
+
+
+@pytest.mark.parametrize("raw", ["", "yesterday", "2025/13/01", "32/13/2025", "15.01.2025"])
+def test_unparseable_dates_are_rejected(raw):
+    with pytest.raises(ValueError, match="Unable to parse date"):
+        parse_document_date(raw)
+
+
+def test_parsing_is_memoized():
+    parse_document_date.cache_clear()
+    first = parse_document_date("20/03/2025 08:00:00")
+    assert parse_document_date("20/03/2025 08:00:00") is first
+    assert first == datetime(2025, 3, 20, 8, 0, 0)
+    assert parse_document_date.cache_info().hits == 1
+
+
+def _document(document_date):
+    return {
+        "id": "doc-1",
+        "type": "news",
+        "content": "BBCA posts record profit",
+        "document_date": document_date,
+        "source": {"name": "kontan"},
+    }
+
+
+def test_documents_are_stored_with_the_normalized_date():
+    doc = InvestmentDocument(**_document("15/01/2025 14:30:00")).model_dump()
+
+    assert doc["document_date"] == "2025-01-15T14:30:00Z"
+    # Retrieval text keeps the plain date, as before normalization
+    assert "Date: 2025-01-15\n" in prepare_retrieval_text(doc)
+
+
+def test_invalid_dates_fail_document_validation():
+    with pytest.raises(ValidationError):
+        InvestmentDocument(**_document("next tuesday"))
+    with pytest.raises(ValueError, match="document_date"):
+        parse_ndjson_document(json.dumps(_document("next tuesday")).encode())
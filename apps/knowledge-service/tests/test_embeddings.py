@@ -0,0 +1,167 @@
+"""EmbeddingService behaviour against the in-process OpenRouter stand-in."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embeddings import AdaptiveConcurrencyLimiter, EmbeddingService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def test_embed_documents_runs_batches_concurrently_in_order(make_embedding_service):
+    fake = FakeOpenRouter(latency=0.05)
+    service = make_embedding_service(fake, max_concurrency=3)
+    texts = [f"document {index}" for index in range(23)]
+
+    embeddings = asyncio.run(service.embed_documents(texts, batch_size=2))
+
+    assert fake.calls == 12
+    assert fake.max_in_flight == 3
+    assert embeddings == [
+        FakeOpenRouter.vector(text, EmbeddingService.DENSE_DIMENSION) for text in texts
+    ]
+
+
+def test_rate_limits_shrink_concurrency_and_retry(make_embedding_service):
+    fake = FakeOpenRouter(latency=0.01, rate_limited_calls=2)
+    service = make_embedding_service(fake, max_concurrency=4)
+    texts = [f"document {index}" for index in range(8)]
+
+    embeddings = asyncio.run(service.embed_documents(texts, batch_size=1))
+
+    assert len(embeddings) == 8
+    assert fake.calls == 10
+    assert sorted(text for batch in fake.inputs for text in batch) == sorted(texts)
+
+
+def test_limiter_halves_on_throttle_and_recovers():
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(4)
+        await limiter.acquire()
+        await limiter.release(throttled=True)
+        await limiter.acquire()
+        await limiter.release(throttled=True)
+        shrunk = limiter.limit
+        for _ in range(10):
+            await limiter.acquire()
+            await limiter.release()
+        return shrunk, limiter.limit
+
+    assert asyncio.run(run()) == (1, 4)
+
+
+def test_rate_limit_retries_exhausted_raise_runtime_error(make_embedding_service):
+    fake = FakeOpenRouter(rate_limited_calls=10)
+    service = make_embedding_service(fake)
+    service.max_rate_limit_retries = 1
+
+    with pytest.raises(RuntimeError, match="rate limited"):
+        asyncio.run(service.embed_query("bank earnings"))
+
+    assert fake.calls == 2
+    assert service.limiter.in_flight == 0
+
+
+def test_cache_serves_repeats_and_persists(make_embedding_service, tmp_path):
+    cache_path = str(tmp_path / "embeddings.sqlite3")
+    fake = FakeOpenRouter()
+    service = make_embedding_service(fake, cache_path=cache_path)
+    texts = ["alpha", "beta", "alpha"]
+
+    first = asyncio.run(service.embed_documents(texts, batch_size=2))
+    second = asyncio.run(service.embed_documents(["beta", "gamma"], batch_size=2))
+
+    # "alpha" is embedded once despite repeating within the request
+    assert fake.inputs == [["alpha", "beta"], ["gamma"]]
+    assert first[0] == first[2]
+    assert second[0] == first[1]
+    # Vectors round-trip through float16
+    expected = FakeOpenRouter.vector("beta", EmbeddingService.DENSE_DIMENSION)
+    assert max(abs(a - b) for a, b in zip(second[0], expected)) < 1e-3
+
+    stats = service.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 4, 3)
+
+    # A fresh service on the same file starts warm
+    restarted = make_embedding_service(FakeOpenRouter(), cache_path=cache_path)
+    asyncio.run(restarted.embed_documents(["alpha", "beta", "gamma"]))
+    assert restarted.cache_stats()["hit_rate"] == 1.0
+
+
+def test_cache_keys_separate_queries_from_documents(make_embedding_service, tmp_path):
+    fake = FakeOpenRouter()
+    service = make_embedding_service(fake, cache_path=str(tmp_path / "embeddings.sqlite3"))
+
+    asyncio.run(service.embed_documents(["bank earnings"]))
+    asyncio.run(service.embed_query("bank earnings"))
+    asyncio.run(service.embed_query("bank earnings"))
+
+    assert fake.calls == 2
+    assert service.cache_stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_entries=2)
+    cache.put_many({"a": [1.0], "b": [2.0]})
+    cache.get("a")
+    cache.put_many({"c": [3.0]})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_identical_queries_share_one_call(make_embedding_service):
+    fake = FakeOpenRouter(latency=0.05)
+    service = make_embedding_service(fake, query_lru_size=8)
+
+    async def run():
+        return await asyncio.gather(
+            *(service.embed_query("BBCA outlook") for _ in range(5)),
+            service.embed_query("TLKM outlook"),
+        )
+
+    results = asyncio.run(run())
+
+    assert fake.calls == 2
+    assert all(result == results[0] for result in results[:5])
+    stats = service.cache_stats()["query_lru"]
+    assert (stats["misses"], stats["coalesced"], stats["in_flight"]) == (2, 4, 0)
+
+    asyncio.run(service.embed_query("BBCA outlook"))
+    assert fake.calls == 2
+    assert service.cache_stats()["query_lru"]["hits"] == 1
+
+
+def test_query_lru_does_not_cache_failures(make_embedding_service):
+    fake = FakeOpenRouter(rate_limited_calls=2)
+    service = make_embedding_service(fake, query_lru_size=8)
+    service.max_rate_limit_retries = 0
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.embed_query("BBCA outlook"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.embed_query("BBCA outlook"))
+    asyncio.run(service.embed_query("BBCA outlook"))
+
+    assert fake.calls == 3
+    assert service.cache_stats()["query_lru"]["entries"] == 1
+
+
+def test_query_lru_survives_cancelled_caller(make_embedding_service):
+    fake = FakeOpenRouter(latency=0.05)
+    service = make_embedding_service(fake, query_lru_size=8)
+
+    async def run():
+        leader = asyncio.ensure_future(service.embed_query("BBCA outlook"))
+        follower = asyncio.ensure_future(service.embed_query("BBCA outlook"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert len(asyncio.run(run())) == EmbeddingService.DENSE_DIMENSION
+    assert fake.calls == 1
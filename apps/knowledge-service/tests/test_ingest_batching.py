@@ -0,0 +1,113 @@
+"""Batched and in-batch deduplication checks used by the ingest path."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import models
+
+from app.services.document_processing import find_batch_duplicates
+from app.services.qdrant import DENSE_VECTOR_NAME
+from tests.local_qdrant import LocalQdrantService
+
+
+def _vector(*head):
+    return list(head) + [0.0] * (4 - len(head))
+
+
+async def _service():
+    service = LocalQdrantService(dimension=4)
+    await service.create_collection()
+    await service.client.upsert(
+        collection_name=service.collection_name,
+        points=[
+            models.PointStruct(
+                id="85171938-a778-49eb-83f4-57f1743120a0",
+                vector={DENSE_VECTOR_NAME: _vector(1.0, 0.0)},
+                payload={"type": "news", "document_date": "2025-01-10"},
+            ),
+            models.PointStruct(
+                id="4343a407-c3a1-4ff6-8bff-54377fb3577e",
+                vector={DENSE_VECTOR_NAME: _vector(0.0, 1.0)},
+                payload={"type": "filing", "document_date": "2025-01-10"},
+            ),
+        ],
+    )
+    return service
+
+
+def test_retrieve_existing_ids_single_lookup():
+    async def run():
+        service = await _service()
+        return await service.retrieve_existing_ids([
+            "85171938-a778-49eb-83f4-57f1743120a0",
+            "00000000-0000-0000-0000-000000000001",
+        ])
+
+    assert asyncio.run(run()) == {"85171938-a778-49eb-83f4-57f1743120a0"}
+
+
+def test_find_similar_documents_batch_applies_per_document_filters():
+    async def run():
+        service = await _service()
+        return await service.find_similar_documents_batch(
+            [
+                # Near the stored news vector and inside the date window
+                {"dense_vector": _vector(0.99, 0.05), "document_date": "2025-01-12", "type": "news"},
+                # Same vector, outside the date window
+                {"dense_vector": _vector(0.99, 0.05), "document_date": "2025-03-01", "type": "news"},
+                # Only similar to a filing, which is never a dedup candidate
+                {"dense_vector": _vector(0.0, 1.0), "document_date": "2025-01-10", "type": "news"},
+                # Non-news documents are not checked
+                {"dense_vector": _vector(1.0, 0.0), "document_date": "2025-01-10", "type": "analysis"},
+            ],
+            similarity_threshold=0.87,
+            date_range_days=7,
+        )
+
+    similar = asyncio.run(run())
+    assert [len(hits) for hits in similar] == [1, 0, 0, 0]
+    assert similar[0][0]["id"] == "85171938-a778-49eb-83f4-57f1743120a0"
+    assert similar[0][0]["score"] >= 0.87
+
+
+def test_find_batch_duplicates_keeps_first_in_window():
+    documents = [
+        {"id": "a", "type": "news", "document_date": "2025-01-10"},
+        {"id": "b", "type": "news", "document_date": "2025-01-12T09:00:00+07:00"},
+        {"id": "c", "type": "news", "document_date": "2025-03-01"},
+        {"id": "d", "type": "filing", "document_date": "2025-01-10"},
+        {"id": "e", "type": "news", "document_date": "2025-01-11"},
+    ]
+    vectors = [
+        _vector(1.0, 0.0),
+        _vector(2.0, 0.1),  # same direction as "a", unnormalized
+        _vector(1.0, 0.0),  # outside the date window
+        _vector(1.0, 0.0),  # not news
+        _vector(0.0, 1.0),  # dissimilar
+    ]
+
+    duplicates = find_batch_duplicates(
+        documents, vectors, similarity_threshold=0.87, date_range_days=7
+    )
+
+    assert list(duplicates) == [1]
+    assert duplicates[1]["index"] == 0
+    assert duplicates[1]["score"] >= 0.87
+
+
+def test_find_batch_duplicates_never_drops_exempt_documents():
+    documents = [
+        {"id": "a", "type": "news", "document_date": "2025-01-10"},
+        {"id": "b", "type": "news", "document_date": "2025-01-10"},
+        {"id": "c", "type": "news", "document_date": "2025-01-10"},
+    ]
+    vectors = [_vector(1.0, 0.0)] * 3
+
+    duplicates = find_batch_duplicates(
+        documents, vectors, similarity_threshold=0.87, date_range_days=7, exempt={1}
+    )
+
+    assert duplicates == {2: {"index": 0, "score": duplicates[2]["score"]}}
@@ -0,0 +1,207 @@
+"""Background ingest jobs against local Qdrant and the OpenRouter stand-in."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embeddings import EmbeddingService
+from app.services.ingest import ingest_batch
+from app.services.ingest_jobs import IngestJobRunner, IngestJobStore
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def _documents(count: int, duplicate_of: int = None) -> list:
+    documents = [
+        {
+            "id": f"00000000-0000-0000-0000-{number:012d}",
+            "type": "news",
+            "title": f"Story {number}",
+            "content": f"Story body {number}",
+            "document_date": "2025-01-10",
+            "source": {"name": "test"},
+        }
+        for number in range(count)
+    ]
+    if duplicate_of is not None:
+        documents.append({
+            **documents[duplicate_of],
+            "id": f"00000000-0000-0000-0000-{count:012d}",
+        })
+    return documents
+
+
+async def _qdrant() -> LocalQdrantService:
+    service = LocalQdrantService(dimension=EmbeddingService.DENSE_DIMENSION)
+    await service.create_collection()
+    return service
+
+
+async def _wait_for(store: IngestJobStore, job_id: str) -> dict:
+    for _ in range(200):
+        job = store.get_job(job_id)
+        if job["status"] in {"completed", "failed"}:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_reports_progress_and_duplicates(make_embedding_service, tmp_path):
+    async def run():
+        store = IngestJobStore(str(tmp_path / "jobs.sqlite3"))
+        runner = IngestJobRunner(
+            store, make_embedding_service(FakeOpenRouter()), await _qdrant()
+        )
+        await runner.start()
+        job_id = await runner.submit(_documents(5, duplicate_of=1), batch_size=2)
+        job = await _wait_for(store, job_id)
+        await runner.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "completed"
+    assert job["progress"] == {
+        "total_documents": 6,
+        "processed_documents": 6,
+        "total_batches": 3,
+        "completed_batches": 3,
+        "percent": 100.0,
+    }
+    assert (job["count"], job["skipped_count"]) == (5, 1)
+    assert job["skipped_documents"][0]["similar_to"] == _documents(2)[1]["id"]
+    assert job["throughput_docs_per_second"] > 0
+
+
+def test_interrupted_job_resumes_from_last_committed_batch(
+    make_embedding_service, tmp_path
+):
+    path = str(tmp_path / "jobs.sqlite3")
+    documents = _documents(6)
+
+    async def crash_after_first_batch(qdrant_svc):
+        store = IngestJobStore(path)
+        job_id = store.create_job(documents, batch_size=2)
+        assert store.claim_next_job() == job_id
+        batch_index, batch = store.next_batch(job_id)
+        result = await ingest_batch(
+            make_embedding_service(FakeOpenRouter()), qdrant_svc, batch, wait=True
+        )
+        store.commit_batch(job_id, batch_index, len(batch), result, 0.1)
+        store.close()
+        return job_id
+
+    async def restart(qdrant_svc, job_id, fake):
+        store = IngestJobStore(path)
+        assert store.get_job(job_id)["status"] == "running"
+        runner = IngestJobRunner(store, make_embedding_service(fake), qdrant_svc)
+        await runner.start()
+        job = await _wait_for(store, job_id)
+        await runner.stop()
+        return job
+
+    async def run():
+        qdrant_svc = await _qdrant()
+        job_id = await crash_after_first_batch(qdrant_svc)
+        fake = FakeOpenRouter()
+        return await restart(qdrant_svc, job_id, fake), fake
+
+    job, fake = asyncio.run(run())
+
+    assert job["status"] == "completed"
+    assert job["count"] == 6
+    # Only the two uncommitted batches were embedded after the restart
+    assert [len(texts) for texts in fake.inputs] == [2, 2]
+    assert all("Story 0" not in text and "Story 1" not in text
+               for texts in fake.inputs for text in texts)
+
+
+def test_failed_job_records_error(make_embedding_service, tmp_path):
+    async def run():
+        store = IngestJobStore(str(tmp_path / "jobs.sqlite3"))
+        emb_svc = make_embedding_service(FakeOpenRouter(rate_limited_calls=10))
+        emb_svc.max_rate_limit_retries = 0
+        runner = IngestJobRunner(store, emb_svc, await _qdrant())
+        runner.RETRY_BACKOFF_SECONDS = 0.0
+        await runner.start()
+        job_id = await runner.submit(_documents(3), batch_size=2)
+        job = await _wait_for(store, job_id)
+        await runner.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "failed"
+    assert "rate limited" in job["error"]
+    assert job["progress"]["completed_batches"] == 0
+
+
+def test_failing_batch_is_retried(make_embedding_service, tmp_path):
+    async def run():
+        store = IngestJobStore(str(tmp_path / "jobs.sqlite3"))
+        fake = FakeOpenRouter(rate_limited_calls=2)
+        emb_svc = make_embedding_service(fake)
+        emb_svc.max_rate_limit_retries = 0
+        runner = IngestJobRunner(store, emb_svc, await _qdrant())
+        runner.RETRY_BACKOFF_SECONDS = 0.0
+        await runner.start()
+        job_id = await runner.submit(_documents(3), batch_size=2)
+        job = await _wait_for(store, job_id)
+        await runner.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "completed"
+    assert job["count"] == 3
+
+
+def test_failed_job_resumes_from_the_failed_batch(make_embedding_service, tmp_path):
+    class FlakyQdrantService(LocalQdrantService):
+        failing = False
+
+        async def upsert_documents(self, documents, wait=False):
+            if self.failing:
+                raise RuntimeError("Qdrant timed out")
+            await super().upsert_documents(documents, wait=wait)
+
+    async def run():
+        store = IngestJobStore(str(tmp_path / "jobs.sqlite3"))
+        qdrant_svc = FlakyQdrantService(dimension=EmbeddingService.DENSE_DIMENSION)
+        await qdrant_svc.create_collection()
+        fake = FakeOpenRouter()
+        runner = IngestJobRunner(store, make_embedding_service(fake), qdrant_svc)
+        runner.BATCH_RETRIES = 0
+        await runner.start()
+
+        # Commit the first batch, then fail the second
+        job_id = store.create_job(_documents(4), batch_size=2)
+        assert store.claim_next_job() == job_id
+        batch_index, batch = store.next_batch(job_id)
+        result = await ingest_batch(runner.emb_svc, qdrant_svc, batch, wait=True)
+        store.commit_batch(job_id, batch_index, len(batch), result, 0.1)
+        qdrant_svc.failing = True
+        try:
+            await runner.run_job(job_id)
+        except RuntimeError as e:
+            store.finish_job(job_id, str(e))
+        failed = store.get_job(job_id)
+
+        assert not await runner.resume("missing")
+        qdrant_svc.failing = False
+        fake.inputs.clear()
+        assert await runner.resume(job_id)
+        job = await _wait_for(store, job_id)
+        await runner.stop()
+        return failed, job, fake
+
+    failed, job, fake = asyncio.run(run())
+
+    assert (failed["status"], failed["error"]) == ("failed", "Qdrant timed out")
+    assert failed["progress"]["completed_batches"] == 1
+    assert job["status"] == "completed"
+    assert (job["count"], job["error"]) == (4, None)
+    # Only the failed batch was embedded again
+    assert [len(texts) for texts in fake.inputs] == [2]
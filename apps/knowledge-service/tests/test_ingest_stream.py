@@ -0,0 +1,220 @@
+"""NDJSON streaming ingest against local Qdrant and the OpenRouter stand-in."""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core.config import settings
+from app.services.embeddings import EmbeddingService
+from app.services.ingest import iter_ndjson_lines, stream_ingest
+from tests.conftest import document_uuid, make_document
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+async def _qdrant() -> LocalQdrantService:
+    service = LocalQdrantService(dimension=EmbeddingService.DENSE_DIMENSION)
+    await service.create_collection()
+    return service
+
+
+async def _chunks(lines, chunk_size: int = 7):
+    body = "".join(line + "\n" for line in lines).encode("utf-8")
+    for start in range(0, len(body), chunk_size):
+        yield body[start : start + chunk_size]
+
+
+def test_stream_ingest_reports_batches_errors_and_duplicates(make_embedding_service):
+    lines = [
+        json.dumps(make_document(document_uuid(1), "Bank Central Asia profit rose 15%")),
+        "{not json",
+        json.dumps(make_document(document_uuid(2), "Telkom expands data centers", type="analysis")),
+        json.dumps({k: v for k, v in make_document(document_uuid(3), "x").items() if k != "content"}),
+        # Same retrieval text as the first document, caught against Qdrant
+        json.dumps(make_document(document_uuid(4), "Bank Central Asia profit rose 15%")),
+    ]
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = await _qdrant()
+        results = [
+            result
+            async for result in stream_ingest(
+                emb_svc, qdrant_svc, _chunks(lines), batch_size=2
+            )
+        ]
+        stored = await qdrant_svc.retrieve_existing_ids([document_uuid(n) for n in range(1, 5)])
+        return results, stored
+
+    results, stored = asyncio.run(run())
+
+    # Invalid lines count towards the batch size
+    assert [r.get("count") for r in results] == [1, 1, 0, 2]
+    assert [e["line"] for e in results[0]["errors"]] == [2]
+    assert results[1]["errors"][0]["line"] == 4
+    assert "content" in results[1]["errors"][0]["error"]
+    assert results[2]["skipped_documents"][0]["similar_to"] == document_uuid(1)
+    assert results[-1] == {
+        "status": "success",
+        "batches": 3,
+        "count": 2,
+        "skipped_count": 1,
+        "error_count": 2,
+    }
+    assert stored == {document_uuid(1), document_uuid(2)}
+
+
+def test_stream_ingest_applies_backpressure(make_embedding_service):
+    consumed = []
+
+    async def chunks():
+        for number in range(200):
+            consumed.append(number)
+            yield (json.dumps(make_document(document_uuid(number), f"story {number}")) + "\n").encode()
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = await _qdrant()
+        stream = stream_ingest(
+            emb_svc, qdrant_svc, chunks(), batch_size=5, queue_batches=1
+        )
+        first = await stream.__anext__()
+        await asyncio.sleep(0.05)
+        read_while_paused = len(consumed)
+        await stream.aclose()
+        return first, read_while_paused
+
+    first, read_while_paused = asyncio.run(run())
+
+    assert first["count"] == 5
+    # One batch in flight, one queued and one being assembled by the reader
+    assert read_while_paused <= 5 * 3 + 1
+
+
+def test_stream_endpoint_streams_ndjson(make_embedding_service, monkeypatch):
+    async def setup():
+        return await _qdrant()
+
+    monkeypatch.setattr(routes, "embedding_service", make_embedding_service(FakeOpenRouter()))
+    monkeypatch.setattr(routes, "qdrant_service", asyncio.run(setup()))
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    body = "".join(
+        json.dumps(make_document(document_uuid(number), f"story {number}")) + "\n"
+        for number in range(3)
+    )
+    with TestClient(app) as client:
+        response = client.post(
+            "/documents/stream?batch_size=2",
+            content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r.get("count") for r in records] == [2, 1, 3]
+    assert records[-1]["status"] == "success"
+
+
+def test_stream_ingest_reports_a_failed_batch_and_stops(make_embedding_service):
+    class FailingQdrantService(LocalQdrantService):
+        upserts = 0
+
+        async def upsert_documents(self, documents, wait=False):
+            self.upserts += 1
+            if self.upserts == 2:
+                raise RuntimeError("Qdrant timed out")
+            await super().upsert_documents(documents, wait=wait)
+
+    lines = [json.dumps(make_document(document_uuid(n), f"story {n}")) for n in range(6)]
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = FailingQdrantService(dimension=EmbeddingService.DENSE_DIMENSION)
+        await qdrant_svc.create_collection()
+        results = [
+            result
+            async for result in stream_ingest(
+                emb_svc, qdrant_svc, _chunks(lines), batch_size=2
+            )
+        ]
+        stored = await qdrant_svc.retrieve_existing_ids([document_uuid(n) for n in range(6)])
+        return results, stored
+
+    results, stored = asyncio.run(run())
+
+    assert results[1] == {"batch": 1, "status": "error", "error": "Qdrant timed out"}
+    assert results[-1] == {
+        "status": "failed",
+        "batches": 1,
+        "count": 2,
+        "skipped_count": 0,
+        "error_count": 0,
+    }
+    assert len(results) == 3
+    assert stored == {document_uuid(0), document_uuid(1)}
+
+
+def test_iter_ndjson_lines_skips_overlong_lines_without_buffering():
+    async def chunks():
+        yield b"short\n" + b"x" * 10
+        for _ in range(1000):
+            yield b"y" * 1000
+        yield b"\nok"
+
+    async def run():
+        return [line async for line in iter_ndjson_lines(chunks(), max_line_bytes=64)]
+
+    assert asyncio.run(run()) == [b"short", None, b"ok"]
+
+
+def test_stream_ingest_reports_overlong_lines(make_embedding_service, monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_INGEST_MAX_LINE_BYTES", 512)
+    lines = [
+        json.dumps(make_document(document_uuid(1), "x" * 1000)),
+        json.dumps(make_document(document_uuid(2), "short story")),
+    ]
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = await _qdrant()
+        return [
+            result
+            async for result in stream_ingest(emb_svc, qdrant_svc, _chunks(lines, 100))
+        ]
+
+    results = asyncio.run(run())
+
+    assert results[0]["count"] == 1
+    assert results[0]["errors"] == [{"line": 1, "error": "line exceeds 512 bytes"}]
+
+
+def test_stream_ingest_flushes_runs_of_invalid_lines(make_embedding_service):
+    lines = ["not json"] * 25 + [json.dumps(make_document(document_uuid(1), "story"))]
+
+    async def run():
+        emb_svc = make_embedding_service(FakeOpenRouter())
+        qdrant_svc = await _qdrant()
+        return [
+            result
+            async for result in stream_ingest(
+                emb_svc, qdrant_svc, _chunks(lines, 64), batch_size=10
+            )
+        ]
+
+    results = asyncio.run(run())
+
+    # Errors are batched like documents, not held until the next valid line
+    assert [len(result.get("errors", [])) for result in results[:-1]] == [10, 10, 5]
+    assert [result["count"] for result in results[:-1]] == [0, 0, 1]
+    assert results[-1]["status"] == "success"
+    assert results[-1]["error_count"] == 25
@@ -0,0 +1,106 @@
+"""Cursor pagination over local Qdrant."""
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.core.dates import document_timestamp
+from tests.local_qdrant import LocalQdrantService
+
+
+DATES = [
+    "2025-01-10",
+    "2025-01-10T00:00:00Z",  # same instant as the plain date
+    "2025-01-09T15:30:00+07:00",
+    "2025-01-08",
+    "2025-01-07",
+]
+
+
+async def _seeded_service(count: int = 37) -> LocalQdrantService:
+    rng = random.Random(7)
+    service = LocalQdrantService(dimension=2)
+    await service.create_collection()
+    await service.upsert_documents([
+        {
+            "id": f"00000000-0000-0000-0000-{number:012d}",
+            "dense_vector": [1.0, float(number)],
+            "payload": {
+                "type": "news" if number % 3 else "filing",
+                "document_date": rng.choice(DATES),
+            },
+        }
+        for number in range(count)
+    ])
+    return service
+
+
+async def _all_pages(service, limit, scroll_filter=None):
+    pages, cursor = [], None
+    while True:
+        page = await service.scroll_page(
+            limit=limit, cursor=cursor, scroll_filter=scroll_filter
+        )
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def _expected_order(points):
+    return [
+        point["id"]
+        for point in sorted(
+            points,
+            key=lambda point: (
+                -document_timestamp(point["payload"]["document_date"]),
+                point["id"],
+            ),
+        )
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 10, 100])
+def test_cursor_pages_cover_collection_in_order(limit):
+    async def run():
+        service = await _seeded_service()
+        everything, _ = await service.client.scroll(
+            collection_name=service.collection_name, limit=1000
+        )
+        pages = await _all_pages(service, limit)
+        return [point.model_dump() for point in everything], pages
+
+    everything, pages = asyncio.run(run())
+
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert ids == _expected_order(everything)
+    assert all(len(page["items"]) <= limit for page in pages)
+    assert all(page["total_count"] == 37 for page in pages)
+
+
+def test_cursor_pages_respect_filters():
+    async def run():
+        service = await _seeded_service()
+        news_filter = service.build_filter({"types": ["news"]})
+        pages = await _all_pages(service, 4, news_filter)
+        return pages
+
+    pages = asyncio.run(run())
+
+    items = [item for page in pages for item in page["items"]]
+    assert len(items) == len({item["id"] for item in items}) == pages[0]["total_count"]
+    assert all(item["payload"]["type"] == "news" for item in items)
+
+
+def test_invalid_cursor_is_rejected():
+    async def run():
+        service = await _seeded_service(3)
+        await service.scroll_page(cursor="not-a-cursor")
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(run())
@@ -0,0 +1,95 @@
+"""Request and stage latency histograms."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app import main
+from app.api import routes
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, span
+from app.services.embeddings import EmbeddingService
+from app.services.search_cache import SearchResultCache
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def _count(metric: str, **labels) -> float:
+    return REGISTRY.get_sample_value(f"{metric}_count", labels) or 0.0
+
+
+def _request_count(route: str, status_code: str, method: str = "GET") -> float:
+    return _count(
+        "knowledge_service_request_duration_seconds",
+        method=method,
+        route=route,
+        status_code=status_code,
+    )
+
+
+def _stage_count(route: str, stage: str) -> float:
+    return _count("knowledge_service_stage_duration_seconds", route=route, stage=stage)
+
+
+def test_stages_are_recorded_under_the_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        with span("lookup"):
+            await asyncio.sleep(0)
+        return {"id": item_id}
+
+    before = (
+        _request_count("/items/{item_id}", "200"),
+        _stage_count("/items/{item_id}", "lookup"),
+        _request_count("unmatched", "404"),
+        _stage_count("background", "lookup"),
+    )
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+    with span("lookup"):
+        pass
+
+    after = (
+        _request_count("/items/{item_id}", "200"),
+        _stage_count("/items/{item_id}", "lookup"),
+        _request_count("unmatched", "404"),
+        _stage_count("background", "lookup"),
+    )
+    assert [b - a for a, b in zip(before, after)] == [2, 2, 1, 1]
+
+
+def test_search_latency_is_broken_down_by_stage(make_embedding_service, monkeypatch):
+    monkeypatch.setattr(settings, "BM25_ENCODER", "client")
+    monkeypatch.setattr(settings, "BM25_ENCODER_WORKERS", 0)
+    qdrant_svc = LocalQdrantService(dimension=EmbeddingService.DENSE_DIMENSION, sparse=True)
+    asyncio.run(qdrant_svc.create_collection())
+    monkeypatch.setattr(routes, "embedding_service", make_embedding_service(FakeOpenRouter()))
+    monkeypatch.setattr(routes, "qdrant_service", qdrant_svc)
+    monkeypatch.setattr(routes, "search_cache", SearchResultCache(60, 16))
+
+    route = "/documents/search"
+    stages = ("embed_query", "qdrant_query_points")
+    before = [_stage_count(route, stage) for stage in stages]
+    # Without the lifespan, so the test's services stay in place
+    client = TestClient(main.app)
+    response = client.post(route, json={"query": "BBCA dividend"})
+    exposition = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert [_stage_count(route, stage) - count for stage, count in zip(stages, before)] == [1, 1]
+    assert exposition.headers["content-type"].startswith("text/plain")
+    assert (
+        'knowledge_service_stage_duration_seconds_count{route="/documents/search",'
+        'stage="qdrant_query_points"}'
+    ) in exposition.text
@@ -0,0 +1,127 @@
+"""Collection partitioning: month shard routing and type tenant indexing."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import models
+
+from app.core.dates import document_timestamp
+from app.services.qdrant import month_shard_keys
+from tests.local_qdrant import LocalQdrantService
+
+
+class RecordingClient:
+    """Records the write calls a month-sharded upsert makes."""
+
+    def __init__(self, stored_dates=None):
+        self.calls = []
+        self.stored_dates = stored_dates or {}
+
+    async def retrieve(self, collection_name, ids, with_payload=True, with_vectors=False):
+        return [
+            models.Record(id=point_id, payload={"document_date": self.stored_dates[point_id]})
+            for point_id in ids
+            if point_id in self.stored_dates
+        ]
+
+    async def delete(self, collection_name, points_selector, shard_key_selector=None, wait=False):
+        self.calls.append(("delete", shard_key_selector, points_selector))
+
+    async def create_shard_key(self, collection_name, shard_key):
+        self.calls.append(("create_shard_key", shard_key))
+
+    async def upsert(self, collection_name, points, shard_key_selector=None, wait=False):
+        self.calls.append(("upsert", shard_key_selector, sorted(str(p.id) for p in points)))
+
+
+def _sharded_service(shard_keys=()):
+    service = LocalQdrantService(dimension=2)
+    service.partitioning = "month_shards"
+    service._shard_keys = set(shard_keys)
+    return service
+
+
+def test_month_shard_keys_span_year_boundary():
+    assert month_shard_keys(
+        document_timestamp("2024-11-15"), document_timestamp("2025-02-01")
+    ) == ["2024-11", "2024-12", "2025-01", "2025-02"]
+
+
+def test_queries_route_to_months_in_their_date_range():
+    service = _sharded_service({"2024-12", "2025-01", "2025-02", "2025-03"})
+    route = service._shard_key_selector
+
+    assert route(service.build_filter({"date_from": "2025-01-20", "date_to": "2025-02-02"})) == [
+        "2025-01",
+        "2025-02",
+    ]
+    # Open-ended ranges read every known month from their start
+    assert route(service.build_filter({"date_from": "2025-02-10"})) == ["2025-02", "2025-03"]
+    # Deduplication's +/-7 day window, nested under the chunk filter
+    service.chunked = True
+    assert route(service._similarity_filter("2025-01-03", 7)) == ["2024-12", "2025-01"]
+
+    # No lower bound, a month without a shard, or no filter: every shard
+    assert route(service.build_filter({"date_to": "2025-02-02"})) is None
+    assert route(service.build_filter({"date_from": "2023-01-01", "date_to": "2025-01-01"})) is None
+    assert route(None) is None
+    service.partitioning = "none"
+    assert route(service.build_filter({"date_from": "2025-01-20", "date_to": "2025-02-02"})) is None
+
+
+def _id(index: int) -> str:
+    return f"00000000-0000-0000-0000-{index:012d}"
+
+
+def test_month_sharded_upsert_groups_points_by_month():
+    service = _sharded_service({"2025-01"})
+    service.client = RecordingClient()
+    documents = [
+        {"id": _id(index), "dense_vector": [1.0, 0.0], "payload": {"document_date": date}}
+        for index, date in enumerate(["2025-01-31T20:00:00-05:00", "2025-01-05", "2025-02-03"])
+    ]
+
+    asyncio.run(service.upsert_documents(documents))
+
+    # New documents: no deletes. The first one falls in February in UTC.
+    assert service.client.calls == [
+        ("upsert", "2025-01", [_id(1)]),
+        ("create_shard_key", "2025-02"),
+        ("upsert", "2025-02", [_id(0), _id(2)]),
+    ]
+    assert service._shard_keys == {"2025-01", "2025-02"}
+
+
+def test_month_sharded_update_deletes_only_documents_that_changed_month():
+    service = _sharded_service({"2025-01", "2025-02"})
+    service.client = RecordingClient({
+        _id(0): "2025-01-10T00:00:00Z",
+        _id(1): "2025-01-20T00:00:00Z",
+    })
+    documents = [
+        {"id": _id(0), "dense_vector": [1.0, 0.0], "payload": {"document_date": "2025-01-11"}},
+        {"id": _id(1), "dense_vector": [1.0, 0.0], "payload": {"document_date": "2025-02-01"}},
+    ]
+
+    asyncio.run(service.upsert_documents(documents))
+
+    calls = service.client.calls
+    # Written first, so the moved document is never missing
+    assert calls[:2] == [
+        ("upsert", "2025-01", [_id(0)]),
+        ("upsert", "2025-02", [_id(1)]),
+    ]
+    assert len(calls) == 3
+    operation, shard_key, selector = calls[2]
+    assert (operation, shard_key) == ("delete", "2025-01")
+    assert selector.filter.should[0].has_id == [_id(1)]
+
+
+def test_type_tenant_indexes_type_as_tenant():
+    service = LocalQdrantService(dimension=2)
+    assert not hasattr(service._type_index_schema(), "is_tenant")
+    service.partitioning = "type_tenant"
+    assert service._type_index_schema().is_tenant
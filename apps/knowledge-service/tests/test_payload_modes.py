@@ -0,0 +1,111 @@
+"""Compact payload storage and single-pass retrieval text on ingest."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services import ingest as ingest_module
+from app.services.embeddings import EmbeddingService
+from app.services.ingest import ingest_batch
+from app.services.qdrant import COMPRESSED_CONTENT_FIELD
+from tests.conftest import document_uuid, make_document
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+CONTENT = " ".join(
+    f"Telkom Indonesia reported capex of {index} trillion rupiah for fiber rollout."
+    for index in range(40)
+)
+
+
+def _service(monkeypatch, payload_mode: str) -> LocalQdrantService:
+    monkeypatch.setattr(settings, "PAYLOAD_MODE", payload_mode)
+    monkeypatch.setattr(settings, "BM25_ENCODER", "client")
+    monkeypatch.setattr(settings, "BM25_ENCODER_WORKERS", 0)
+    service = LocalQdrantService(dimension=EmbeddingService.DENSE_DIMENSION, sparse=True)
+    asyncio.run(service.create_collection())
+    return service
+
+
+def test_compact_payload_stores_content_compressed(make_embedding_service, monkeypatch):
+    emb_svc = make_embedding_service(FakeOpenRouter())
+    qdrant_svc = _service(monkeypatch, "compact")
+
+    async def scenario():
+        await ingest_batch(emb_svc, qdrant_svc, [make_document(document_uuid(1), CONTENT)], wait=True)
+        stored = await qdrant_svc.client.retrieve(
+            qdrant_svc.collection_name, ids=[document_uuid(1)], with_payload=True
+        )
+        hits = await qdrant_svc.search(
+            "TLKM capex", await emb_svc.embed_query("TLKM capex"), limit=5
+        )
+        return (
+            stored[0].payload,
+            await qdrant_svc.retrieve(document_uuid(1)),
+            hits,
+            await qdrant_svc.scroll_page(limit=5),
+        )
+
+    stored, retrieved, hits, page = asyncio.run(scenario())
+
+    assert "content" not in stored
+    assert len(stored[COMPRESSED_CONTENT_FIELD]) < len(CONTENT) / 4
+    assert stored["symbols"] == ["BBCA"]
+    # Readers get the document back as ingested
+    assert retrieved["payload"]["content"] == CONTENT
+    assert COMPRESSED_CONTENT_FIELD not in retrieved["payload"]
+    assert [hit["payload"]["content"] for hit in hits] == [CONTENT]
+    assert [item["payload"]["content"] for item in page["items"]] == [CONTENT]
+
+
+def test_compact_mode_drops_the_content_boost(monkeypatch):
+    full = _service(monkeypatch, "full")._build_formula_query("capex")
+    compact = _service(monkeypatch, "compact")._build_formula_query("capex")
+
+    def matched_keys(formula):
+        return {
+            part.mult[1].key
+            for part in formula.formula.sum[1:]
+            if hasattr(part.mult[1], "key")
+        }
+
+    assert matched_keys(full) == {"title", "content"}
+    assert matched_keys(compact) == {"title"}
+
+
+def test_full_mode_reads_compact_points(make_embedding_service, monkeypatch):
+    emb_svc = make_embedding_service(FakeOpenRouter())
+    compact_svc = _service(monkeypatch, "compact")
+    asyncio.run(ingest_batch(emb_svc, compact_svc, [make_document(document_uuid(1), CONTENT)], wait=True))
+
+    monkeypatch.setattr(settings, "PAYLOAD_MODE", "full")
+    full_svc = LocalQdrantService(dimension=EmbeddingService.DENSE_DIMENSION, sparse=True)
+    full_svc.client = compact_svc.client
+
+    assert asyncio.run(full_svc.retrieve(document_uuid(1)))["payload"]["content"] == CONTENT
+
+
+def test_retrieval_text_is_prepared_once_per_document(make_embedding_service, monkeypatch):
+    calls = []
+    prepare = ingest_module.prepare_retrieval_text
+
+    def counting_prepare(doc):
+        calls.append(doc["id"])
+        return prepare(doc)
+
+    monkeypatch.setattr(ingest_module, "prepare_retrieval_text", counting_prepare)
+    emb_svc = make_embedding_service(FakeOpenRouter())
+    qdrant_svc = _service(monkeypatch, "full")
+    documents = [
+        make_document(document_uuid(1), CONTENT),
+        make_document(document_uuid(2), "BBCA dividend payout"),
+    ]
+
+    result = asyncio.run(ingest_batch(emb_svc, qdrant_svc, documents, wait=True))
+
+    assert result["count"] == 2
+    assert sorted(calls) == [document_uuid(1), document_uuid(2)]
@@ -0,0 +1,76 @@
+"""Quantization profiles: search params wiring, switching and the report."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from qdrant_client import models
+
+from app.api import routes
+from app.services.embeddings import EmbeddingService
+from app.services.qdrant import quantization_config, quantization_profile_of
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+DIMENSION = EmbeddingService.DENSE_DIMENSION
+
+
+def test_profiles_round_trip_and_wire_dense_prefetch_params():
+    for profile in ("none", "scalar", "binary"):
+        assert quantization_profile_of(quantization_config(profile)) == profile
+
+    service = LocalQdrantService(dimension=DIMENSION)
+    service.quantization_profile = "none"
+    query = service._search_query("q", [1.0] * DIMENSION, 5, None, True)
+    assert query["prefetch"].prefetch[0].params is None
+
+    service.quantization_profile = "binary"
+    query = service._search_query("q", [1.0] * DIMENSION, 5, None, True)
+    dense, bm25 = query["prefetch"].prefetch
+    assert dense.params.quantization == models.QuantizationSearchParams(
+        rescore=True, oversampling=3.0
+    )
+    assert bm25.params is None
+
+
+def test_switch_profile_and_report(monkeypatch):
+    qdrant_svc = LocalQdrantService(dimension=DIMENSION)
+
+    async def seed():
+        await qdrant_svc.create_collection()
+        await qdrant_svc.upsert_documents(
+            [
+                {
+                    "id": f"00000000-0000-0000-0000-{index:012d}",
+                    "payload": {},
+                    "dense_vector": FakeOpenRouter.vector(f"doc {index}", DIMENSION),
+                }
+                for index in range(4)
+            ],
+            wait=True,
+        )
+
+    asyncio.run(seed())
+    monkeypatch.setattr(routes, "qdrant_service", qdrant_svc)
+    monkeypatch.setattr(routes, "embedding_service", object())
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    with TestClient(app) as client:
+        generation = qdrant_svc.generation
+        switched = client.post("/admin/quantization", json={"profile": "scalar"}).json()
+        report = client.get("/admin/quantization", params={"probe_queries": 2}).json()
+        rejected = client.post("/admin/quantization", json={"profile": "pq"})
+
+    assert switched["profile"] == "scalar" and qdrant_svc.generation == generation + 1
+    assert report["points"] == 4
+    assert report["profiles"]["scalar"]["quantized_ram_bytes"] == 4 * DIMENSION
+    assert report["profiles"]["binary"]["quantized_ram_bytes"] == 4 * DIMENSION // 8
+    assert report["original_vectors_disk_bytes"] == 4 * DIMENSION * 2
+    assert report["probe"]["queries"] == 2
+    assert rejected.status_code == 422
@@ -0,0 +1,137 @@
+"""Second-stage reranking: scorer ordering, latency budget fallback, routing."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.reranking import (
+    CandidateScorer,
+    LinearFeatureScorer,
+    RerankingService,
+)
+from app.services.search_cache import SearchResultCache
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def _candidate(point_id, score, title, vector=None):
+    candidate = {"id": point_id, "score": score, "payload": {"title": title}}
+    if vector is not None:
+        candidate["vector"] = {"dense": vector}
+    return candidate
+
+
+class SlowScorer(CandidateScorer):
+    name = "slow"
+
+    def score(self, query, query_vector, candidates):
+        time.sleep(0.5)
+        return list(range(len(candidates)))
+
+
+def test_linear_scorer_promotes_matching_candidates():
+    scorer = LinearFeatureScorer(weights={"fused_score": 0.0, "dense_similarity": 1.0})
+    service = RerankingService(scorer, max_workers=1, budget_ms=1000)
+    candidates = [
+        _candidate("far", 0.9, "unrelated", vector=[0.0, 1.0]),
+        _candidate("near", 0.5, "bbca npl", vector=[1.0, 0.0]),
+    ]
+
+    hits, reranked = asyncio.run(service.rerank("bbca npl", [1.0, 0.0], candidates, limit=1))
+
+    assert reranked
+    assert [hit["id"] for hit in hits] == ["near"]
+    service.shutdown()
+
+
+def test_over_budget_keeps_first_stage_order():
+    service = RerankingService(SlowScorer(), max_workers=1, budget_ms=20)
+    candidates = [_candidate(str(index), 1.0 - index / 10, "t") for index in range(4)]
+
+    hits, reranked = asyncio.run(service.rerank("q", None, candidates, limit=2))
+
+    assert not reranked
+    assert [hit["id"] for hit in hits] == ["0", "1"]
+    assert service.stats()["fallbacks"] == 1
+    service.shutdown()
+
+
+def test_busy_workers_skip_reranking_until_the_scorer_returns():
+    service = RerankingService(SlowScorer(), max_workers=1, budget_ms=20)
+    candidates = [_candidate(str(index), 1.0 - index / 10, "t") for index in range(4)]
+
+    async def scenario():
+        await service.rerank("q", None, candidates, limit=2)
+        # The timed-out scorer still holds the only worker
+        busy = await service.rerank("q", None, candidates, limit=2, budget_ms=1000)
+        await asyncio.sleep(0.6)
+        free = await service.rerank("q", None, candidates, limit=2, budget_ms=1000)
+        return busy, free
+
+    busy, free = asyncio.run(scenario())
+
+    assert busy == (candidates[:2], False)
+    assert free[1]
+    assert service.stats()["saturated"] == 1
+    assert service.stats()["fallbacks"] == 2
+    service.shutdown()
+
+
+class CandidateQdrantService(LocalQdrantService):
+    """Returns `limit` candidates, all equally similar to the query vector."""
+
+    def __init__(self):
+        super().__init__(dimension=2)
+        self.calls = []
+
+    async def search(
+        self, query_text, query_vector, limit=10, query_filter=None, use_dense=True,
+        with_vectors=False, search_params=None,
+    ):
+        self.calls.append({"limit": limit, "with_vectors": with_vectors})
+        return [
+            _candidate(
+                f"doc-{rank}",
+                1.0 / (rank + 1),
+                "",
+                vector=list(query_vector) if with_vectors else None,
+            )
+            for rank in range(limit)
+        ]
+
+
+def test_search_route_reranks_prefetch_candidates(make_embedding_service, monkeypatch):
+    fake = FakeOpenRouter()
+    qdrant_svc = CandidateQdrantService()
+    scorer = LinearFeatureScorer(weights={"fused_score": -1.0})
+    reranker = RerankingService(scorer, max_workers=1, budget_ms=1000)
+    monkeypatch.setattr(routes, "embedding_service", make_embedding_service(fake))
+    monkeypatch.setattr(routes, "qdrant_service", qdrant_svc)
+    monkeypatch.setattr(routes, "search_cache", SearchResultCache(60, 16))
+    monkeypatch.setattr(routes, "reranking_service", reranker)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    with TestClient(app) as client:
+        reranked = client.post("/documents/search", json={"query": "q", "limit": 2}).json()
+        plain = client.post(
+            "/documents/search", json={"query": "q", "limit": 2, "rerank": False}
+        ).json()
+
+    assert qdrant_svc.calls == [
+        {"limit": qdrant_svc.prefetch_limit(2), "with_vectors": True},
+        {"limit": 2, "with_vectors": False},
+    ]
+    # Lowest fused score first, and vectors are not returned to the client
+    last = qdrant_svc.prefetch_limit(2) - 1
+    assert [hit["id"] for hit in reranked] == [f"doc-{last}", f"doc-{last - 1}"]
+    assert all("vector" not in hit for hit in reranked)
+    assert [hit["id"] for hit in plain] == ["doc-0", "doc-1"]
+    reranker.shutdown()
@@ -0,0 +1,106 @@
+"""Batch search routing: shared embedding call, per-query results, dedupe."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.search_cache import SearchResultCache
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+class BatchRecordingQdrantService(LocalQdrantService):
+    """Answers each search with documents named after the query's words."""
+
+    def __init__(self):
+        super().__init__(dimension=2)
+        self.batches = []
+        self.single_vectors = []
+
+    async def search(
+        self, query_text, query_vector, limit=10, query_filter=None, use_dense=True,
+        with_vectors=False, search_params=None,
+    ):
+        self.single_vectors.append(query_vector)
+        return (await self.search_batch([{"query_text": query_text, "limit": limit}]))[0]
+
+    async def search_batch(self, searches):
+        self.batches.append(searches)
+        return [
+            [
+                {"id": word, "score": 1.0 / (rank + 1), "payload": {"title": word}}
+                for rank, word in enumerate(search["query_text"].split())
+            ][: search["limit"]]
+            for search in searches
+        ]
+
+
+def _client(make_embedding_service, monkeypatch, fake, qdrant_svc):
+    monkeypatch.setattr(
+        routes, "embedding_service", make_embedding_service(fake, query_lru_size=16)
+    )
+    monkeypatch.setattr(routes, "qdrant_service", qdrant_svc)
+    monkeypatch.setattr(routes, "search_cache", SearchResultCache(60, 16))
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+def test_batch_search_embeds_once_and_queries_once(make_embedding_service, monkeypatch):
+    fake = FakeOpenRouter()
+    qdrant_svc = BatchRecordingQdrantService()
+    body = {
+        "queries": [
+            {"query": "bbca npl"},
+            {"query": "bbca loans", "limit": 1},
+            {"query": "tlkm capex", "use_dense": False, "symbols": ["TLKM"]},
+        ]
+    }
+
+    with _client(make_embedding_service, monkeypatch, fake, qdrant_svc) as client:
+        response = client.post("/documents/search/batch", json=body).json()
+
+    assert fake.inputs and len(fake.inputs) == 1 and len(fake.inputs[0]) == 2
+    assert len(qdrant_svc.batches) == 1
+    searches = qdrant_svc.batches[0]
+    assert [search["query_vector"] is not None for search in searches] == [True, True, False]
+    assert searches[2]["query_filter"] is not None
+    assert [[hit["id"] for hit in item["results"]] for item in response] == [
+        ["bbca", "npl"],
+        ["bbca"],
+        ["tlkm", "capex"],
+    ]
+
+
+def test_batch_search_dedupes_and_reuses_caches(make_embedding_service, monkeypatch):
+    fake = FakeOpenRouter()
+    qdrant_svc = BatchRecordingQdrantService()
+    body = {
+        "queries": [{"query": "bbca npl"}, {"query": "npl bbca loans"}],
+        "dedupe": True,
+    }
+
+    with _client(make_embedding_service, monkeypatch, fake, qdrant_svc) as client:
+        first = client.post("/documents/search/batch", json=body).json()
+        # One cached query and one new one
+        second = client.post(
+            "/documents/search/batch",
+            json={"queries": [{"query": "bbca npl"}, {"query": "tlkm"}]},
+        ).json()
+        # The single search endpoint reuses the query vector from the batch
+        client.post("/documents/search", json={"query": "npl bbca loans", "limit": 5})
+
+    assert [[hit["id"] for hit in item["results"]] for item in first] == [
+        ["bbca", "npl"],
+        ["loans"],
+    ]
+    assert [search["query_text"] for search in qdrant_svc.batches[1]] == ["tlkm"]
+    assert [hit["id"] for hit in second[0]["results"]] == ["bbca", "npl"]
+    assert fake.calls == 2
+    assert qdrant_svc.single_vectors[0] is not None
@@ -0,0 +1,122 @@
+"""Search result cache keys, expiry and invalidation."""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.models.investment import DocumentType
+from app.services import search_cache as search_cache_module
+from app.services.search_cache import SearchResultCache, search_cache_key
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def _key(query="bbca earnings", filters=None, generation=0, **overrides):
+    params = dict(
+        limit=10,
+        use_dense=True,
+        generation=generation,
+        reference_time="2025-01-10T10:00:00Z",
+    )
+    params.update(overrides)
+    return search_cache_key(query, filters or {}, **params)
+
+
+def test_key_normalizes_equivalent_requests():
+    assert _key("bbca  earnings ") == _key("bbca earnings")
+    assert _key(filters={"symbols": ["TLKM", "BBCA"]}) == _key(
+        filters={"symbols": ["BBCA", "TLKM"]}
+    )
+    assert _key(filters={"types": [DocumentType.NEWS]}) == _key(
+        filters={"types": ["news"]}
+    )
+    assert _key(filters={"symbols": []}) == _key()
+    assert _key(limit=5) != _key()
+    assert _key(use_dense=False) != _key()
+    assert _key(generation=1) != _key()
+    assert _key(reference_time="2025-01-10T11:00:00Z") != _key()
+
+
+def test_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(search_cache_module.time, "monotonic", lambda: now[0])
+    cache = SearchResultCache(ttl_seconds=10, max_entries=2)
+
+    cache.put("a", [{"id": "1"}])
+    cache.put("b", [{"id": "2"}])
+    cache.get("a")
+    cache.put("c", [{"id": "3"}])
+    assert cache.get("b") is None  # least recently used
+    assert cache.get("a") == [{"id": "1"}]
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 2)
+
+
+def test_cache_skips_results_right_after_a_write():
+    cache = SearchResultCache(ttl_seconds=10, max_entries=2)
+
+    cache.put("a", [], last_write_at=time.monotonic())
+    cache.put("b", [], last_write_at=time.monotonic() - 60)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == []
+
+
+def test_reference_time_is_quantized_to_the_hour():
+    service = LocalQdrantService(dimension=2)
+    assert service.reference_time().endswith(":00:00Z")
+
+
+class CountingQdrantService(LocalQdrantService):
+    """Local service whose search is served from a fixed result list."""
+
+    def __init__(self):
+        super().__init__(dimension=2)
+        self.searches = 0
+
+    async def search(
+        self, query_text, query_vector, limit=10, query_filter=None, use_dense=True,
+        with_vectors=False, search_params=None,
+    ):
+        self.searches += 1
+        return [{"id": "doc-1", "score": 1.0, "payload": {"title": query_text}}]
+
+
+def test_search_route_serves_repeats_until_a_write(make_embedding_service, monkeypatch):
+    fake = FakeOpenRouter()
+    qdrant_svc = CountingQdrantService()
+    asyncio.run(qdrant_svc.create_collection())
+    monkeypatch.setattr(routes, "embedding_service", make_embedding_service(fake))
+    monkeypatch.setattr(routes, "qdrant_service", qdrant_svc)
+    monkeypatch.setattr(routes, "search_cache", SearchResultCache(60, 16))
+    monkeypatch.setattr(search_cache_module, "WRITE_SETTLE_SECONDS", 0.0)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    body = {"query": "BBCA earnings", "symbols": ["BBCA", "TLKM"]}
+    with TestClient(app) as client:
+        first = client.post("/documents/search", json=body).json()
+        again = client.post(
+            "/documents/search",
+            json={"query": " BBCA  earnings", "symbols": ["TLKM", "BBCA"]},
+        ).json()
+        assert (qdrant_svc.searches, fake.calls) == (1, 1)
+
+        asyncio.run(qdrant_svc.upsert_documents([
+            {"id": 1, "dense_vector": [1.0, 0.0], "payload": {"document_date": "2025-01-10"}}
+        ]))
+        client.post("/documents/search", json=body)
+        stats = client.get("/admin/search-cache").json()
+
+    assert first == again
+    assert qdrant_svc.searches == 2
+    assert (stats["hits"], stats["misses"], stats["generation"]) == (1, 2, 1)
@@ -0,0 +1,73 @@
+"""Per-request HNSW knobs and adaptive exact search."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.services.qdrant import QdrantService
+from app.services.search_cache import SearchResultCache
+from tests.local_qdrant import LocalQdrantService
+from tests.openrouter_stub import FakeOpenRouter
+
+
+def test_selective_filters_prefer_exact_search():
+    prefers_exact = QdrantService.prefers_exact_search
+
+    assert prefers_exact({"include_ids": ["a", "b"]})
+    assert prefers_exact({"date_from": "2025-01-01", "date_to": "2025-01-08"})
+    assert not prefers_exact({"date_from": "2024-01-01", "date_to": "2025-01-01"})
+    assert not prefers_exact({"date_from": "2025-01-01"})
+    assert not prefers_exact({"symbols": ["BBCA"]})
+
+    # The default deduplication window (+/- 7 days) is searched exactly
+    service = LocalQdrantService(dimension=2)
+    service.quantization_profile = "none"
+    assert service._similarity_search_params(7).exact
+    assert service._similarity_search_params(30) is None
+
+
+class ParamsRecordingQdrantService(LocalQdrantService):
+    def __init__(self):
+        super().__init__(dimension=2)
+        self.search_params = []
+
+    async def search(
+        self, query_text, query_vector, limit=10, query_filter=None, use_dense=True,
+        with_vectors=False, search_params=None,
+    ):
+        self.search_params.append(search_params)
+        return []
+
+
+def test_search_route_threads_params_and_keys_cache_on_them(make_embedding_service, monkeypatch):
+    qdrant_svc = ParamsRecordingQdrantService()
+    qdrant_svc.quantization_profile = "none"
+    monkeypatch.setattr(
+        routes, "embedding_service", make_embedding_service(FakeOpenRouter(), query_lru_size=8)
+    )
+    monkeypatch.setattr(routes, "qdrant_service", qdrant_svc)
+    monkeypatch.setattr(routes, "search_cache", SearchResultCache(60, 16))
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    with TestClient(app) as client:
+        for body in (
+            {"query": "q"},
+            {"query": "q", "include_ids": ["00000000-0000-0000-0000-000000000001"]},
+            {"query": "q", "include_ids": ["00000000-0000-0000-0000-000000000001"], "exact": False},
+            {"query": "q", "hnsw_ef": 256, "indexed_only": True},
+            {"query": "q", "hnsw_ef": 256, "indexed_only": True},
+        ):
+            assert client.post("/documents/search", json=body).status_code == 200
+
+    # The repeated request is a cache hit
+    plain, adaptive, forced_hnsw, tuned = qdrant_svc.search_params
+    assert plain is None
+    assert adaptive.exact is True
+    assert forced_hnsw is None
+    assert (tuned.hnsw_ef, tuned.exact, tuned.indexed_only) == (256, False, True)
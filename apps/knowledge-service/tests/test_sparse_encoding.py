@@ -0,0 +1,183 @@
+"""Client-side BM25: parity with reference Okapi BM25 and the search path."""
+
+import asyncio
+import math
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from app.core.config import settings
+from app.services.qdrant import BM25_VECTOR_NAME, QdrantService
+from app.services.sparse_encoding import (
+    BM25_B,
+    BM25_K1,
+    PROCESS_POOL_MIN_TEXTS,
+    BM25Encoder,
+    tokenize,
+)
+from tests.local_qdrant import LocalQdrantService
+
+
+VOCABULARY = (
+    "bank profit loans deposits coal nickel exports dividend capex tower "
+    "telco toll road cement retail margin rupiah rate cut bond yield"
+).split()
+
+
+def _corpus(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(5, 40)))
+        for _ in range(size)
+    ]
+
+
+def _okapi_bm25(corpus, query, avg_doc_length):
+    """Reference BM25 with Qdrant's IDF and a fixed average document length."""
+    documents = [Counter(tokenize(text)) for text in corpus]
+    scores = []
+    for terms in documents:
+        length = sum(terms.values())
+        score = 0.0
+        for term in set(tokenize(query)):
+            frequency = terms.get(term, 0)
+            if not frequency:
+                continue
+            containing = sum(1 for other in documents if term in other)
+            idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+            score += idf * frequency * (BM25_K1 + 1) / (
+                frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_doc_length)
+            )
+        scores.append(score)
+    return scores
+
+
+@pytest.fixture
+def sparse_service(monkeypatch):
+    monkeypatch.setattr(settings, "BM25_ENCODER", "client")
+    monkeypatch.setattr(settings, "BM25_ENCODER_WORKERS", 0)
+    service = LocalQdrantService(dimension=2, sparse=True)
+    yield service
+    service.close()
+
+
+def test_tokenize_folds_case_accents_and_stopwords():
+    assert tokenize("Laba BBCA naik, dan ekspor Café turun") == [
+        "laba", "bbca", "naik", "ekspor", "cafe", "turun"
+    ]
+
+
+def test_client_bm25_matches_reference_ranking(sparse_service):
+    corpus = _corpus(60)
+    queries = ["bank loans", "coal exports dividend", "rate cut bond yield", "nickel"]
+
+    async def run():
+        await sparse_service.create_collection()
+        await sparse_service.upsert_documents(
+            [
+                {"id": index, "payload": {}, "dense_vector": [1.0, 0.0], "bm25_text": text}
+                for index, text in enumerate(corpus)
+            ],
+            wait=True,
+        )
+        rankings = []
+        for query in queries:
+            response = await sparse_service.client.query_points(
+                collection_name=sparse_service.collection_name,
+                query=sparse_service.sparse_encoder.encode_query(query),
+                using=BM25_VECTOR_NAME,
+                limit=10,
+            )
+            rankings.append(response.points)
+        return rankings
+
+    for query, points in zip(queries, asyncio.run(run())):
+        expected = _okapi_bm25(corpus, query, settings.BM25_AVG_DOC_LENGTH)
+        # Same top-10 scores (ties may come back in either order), and each
+        # hit scores what reference BM25 gives that document
+        assert [point.score for point in points] == pytest.approx(
+            sorted(expected, reverse=True)[:10], rel=1e-4
+        )
+        for point in points:
+            assert point.score == pytest.approx(expected[point.id], rel=1e-4)
+
+
+def test_process_pool_encoding_matches_inline():
+    texts = _corpus(PROCESS_POOL_MIN_TEXTS + 10)
+    inline = BM25Encoder(workers=0)
+    pooled = BM25Encoder(workers=2)
+    try:
+        assert asyncio.run(pooled.encode_documents(texts)) == asyncio.run(
+            inline.encode_documents(texts)
+        )
+    finally:
+        pooled.close()
+
+
+def test_search_uses_client_vectors_and_caches_queries(sparse_service):
+    texts = ["bank profit rose", "coal exports fell", "bank loans grew bank"]
+
+    async def run():
+        await sparse_service.create_collection()
+        await sparse_service.upsert_documents(
+            [
+                {
+                    "id": index,
+                    "payload": {"title": text, "content": text, "document_date": "2025-01-01"},
+                    "dense_vector": [1.0, 0.0],
+                    "bm25_text": text,
+                }
+                for index, text in enumerate(texts)
+            ],
+            wait=True,
+        )
+        first = await sparse_service.search("bank", None, limit=3, use_dense=False)
+        second = await sparse_service.search("bank ", None, limit=3, use_dense=False)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert sorted(hit["id"] for hit in first) == [0, 2]
+    assert [hit["id"] for hit in second] == [hit["id"] for hit in first]
+    stats = sparse_service.sparse_encoder.stats()
+    assert (stats["query_cache_hits"], stats["query_cache_misses"]) == (1, 1)
+
+
+def test_collection_refuses_a_different_bm25_encoder(monkeypatch):
+    client = AsyncQdrantClient(location=":memory:")
+
+    def service(encoder: str) -> QdrantService:
+        monkeypatch.setattr(settings, "BM25_ENCODER", encoder)
+        monkeypatch.setattr(settings, "BM25_ENCODER_WORKERS", 0)
+        qdrant_svc = QdrantService()
+        qdrant_svc.client = client
+        return qdrant_svc
+
+    asyncio.run(service("client")._ensure_collection())
+    asyncio.run(service("client")._ensure_collection())
+    with pytest.raises(ValueError, match="indexed with the client encoder"):
+        asyncio.run(service("server")._ensure_collection())
+
+
+def test_unmarked_collections_are_treated_as_server_encoded(monkeypatch):
+    monkeypatch.setattr(settings, "BM25_ENCODER", "server")
+    qdrant_svc = QdrantService()
+    qdrant_svc.client = AsyncQdrantClient(location=":memory:")
+
+    async def scenario():
+        await qdrant_svc.client.create_collection(
+            qdrant_svc.collection_name,
+            vectors_config={},
+            sparse_vectors_config={BM25_VECTOR_NAME: qdrant_svc._build_bm25_sparse_vector_params()},
+        )
+        await qdrant_svc._validate_collection_schema()
+        return await qdrant_svc.client.get_collection(qdrant_svc.collection_name)
+
+    info = asyncio.run(scenario())
+
+    assert info.config.metadata == {"bm25_encoder": "server"}
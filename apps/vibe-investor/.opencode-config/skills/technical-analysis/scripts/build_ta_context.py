@@ -195,13 +195,25 @@ def build_ta_context_result(
     swing_n: int = 2,
     timeframe_mode: str = "full",
     ihsg_regime: float | None = None,
+    features_ready: bool = False,
+    structure_events: list[dict[str, Any]] | None = None,
+    wyckoff: dict[str, Any] | None = None,
+    volume_profile: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    daily = add_ma_stack(daily)
-    daily = add_atr14(daily)
-    daily = add_swings(daily, n=swing_n)
-    daily = add_volume_features(daily)
-
-    events = detect_structure_events(daily)
+    # Walk-forward replays pass features/events and the trailing 260-bar volume
+    # profile streamed by ta_incremental, and the Wyckoff state from a resumed
+    # wyckoff_state.WyckoffTracker.
+    if not features_ready:
+        daily = add_ma_stack(daily)
+        daily = add_atr14(daily)
+        daily = add_swings(daily, n=swing_n)
+        daily = add_volume_features(daily)
+
+    events = (
+        structure_events
+        if structure_events is not None
+        else detect_structure_events(daily)
+    )
     last_labels = [event["label"] for event in events[-4:]]
     choch_triggered = "CHOCH" in last_labels
     bos_confirmed = choch_triggered and ("BOS" in last_labels)
@@ -258,7 +270,9 @@ def build_ta_context_result(
         if prev_close is not None
         else None
     )
-    vp_base = vpvr_core(daily.tail(260))
+    vp_base = (
+        volume_profile if volume_profile is not None else vpvr_core(daily.tail(260))
+    )
     value_area = build_value_area(vp_base, last_close, prev_close)
 
     state, _state_reason = infer_state(
@@ -268,7 +282,7 @@ def build_ta_context_result(
         follow_close=prev_close,
     )
 
-    wyckoff_state = build_wyckoff_state(daily)
+    wyckoff_state = wyckoff if wyckoff is not None else build_wyckoff_state(daily)
     dist_days = count_distribution_days(daily, window=20)
 
     nearest_mid = levels[-1]["zone_mid"] if levels else last_close
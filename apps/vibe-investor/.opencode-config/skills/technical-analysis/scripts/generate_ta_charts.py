@@ -32,7 +32,9 @@ from ta_common import (
     liquidity_path_after_event,
     load_ohlcv,
     pick_draw_targets,
+    price_bin_spans,
     select_nearest_levels,
+    span_histogram,
 )
 from ta_context_location import (
     classify_liquidity_sweep,
@@ -358,19 +360,14 @@ def vpvr_stats(df_daily: pd.DataFrame, bins: int = 40) -> dict[str, Any]:
     lo = float(x["low"].min())
     hi = float(x["high"].max())
     edges = np.linspace(lo, hi, bins + 1)
-    up_hist = np.zeros(bins)
-    down_hist = np.zeros(bins)
     mids = (edges[:-1] + edges[1:]) / 2.0
-    for _, row in x.iterrows():
-        li = max(np.searchsorted(edges, row["low"], side="right") - 1, 0)
-        hi_i = min(np.searchsorted(edges, row["high"], side="right") - 1, bins - 1)
-        if hi_i >= li:
-            span = int(hi_i - li + 1)
-            alloc = float(row["volume"]) / max(span, 1)
-            if float(row["close"]) >= float(row["open"]):
-                up_hist[li : hi_i + 1] += alloc
-            else:
-                down_hist[li : hi_i + 1] += alloc
+    lo_idx, hi_idx = price_bin_spans(
+        edges, x["low"].to_numpy(dtype=float), x["high"].to_numpy(dtype=float)
+    )
+    alloc = x["volume"].to_numpy(dtype=float) / np.maximum(hi_idx - lo_idx + 1, 1)
+    up = x["close"].to_numpy(dtype=float) >= x["open"].to_numpy(dtype=float)
+    up_hist = span_histogram(lo_idx[up], hi_idx[up], alloc[up], bins)
+    down_hist = span_histogram(lo_idx[~up], hi_idx[~up], alloc[~up], bins)
     hist = up_hist + down_hist
     poc_idx = int(hist.argmax())
     order = np.argsort(hist)[::-1]
@@ -679,16 +679,35 @@ def value_area_from_hist(
     }
 
 
-def profile_from_range(df: pd.DataFrame, bins: int = 40) -> dict[str, Any]:
-    lo, hi = float(df["low"].min()), float(df["high"].max())
-    edges = np.linspace(lo, hi, bins + 1)
-    hist = np.zeros(bins)
-    mids = (edges[:-1] + edges[1:]) / 2.0
-    for _, row in df.iterrows():
-        li = max(np.searchsorted(edges, row["low"], side="right") - 1, 0)
-        hi_i = min(np.searchsorted(edges, row["high"], side="right") - 1, bins - 1)
-        if hi_i >= li:
-            hist[li : hi_i + 1] += float(row["volume"])
+def price_bin_spans(
+    edges: np.ndarray, low: np.ndarray, high: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """First/last histogram bin touched by each bar's low-high range."""
+    bins = len(edges) - 1
+    lo_idx = np.maximum(np.searchsorted(edges, low, side="right") - 1, 0)
+    hi_idx = np.minimum(np.searchsorted(edges, high, side="right") - 1, bins - 1)
+    return lo_idx, hi_idx
+
+
+def span_histogram(
+    lo_idx: np.ndarray, hi_idx: np.ndarray, weights: np.ndarray, bins: int
+) -> np.ndarray:
+    """Add each weight to every bin in [lo_idx, hi_idx].
+
+    Spans are expanded and summed with `np.bincount`, which accumulates in bar
+    order, so the result matches adding bar by bar exactly.
+    """
+    valid = hi_idx >= lo_idx
+    lo_idx = lo_idx[valid]
+    counts = hi_idx[valid] - lo_idx + 1
+    if len(counts) == 0:
+        return np.zeros(bins)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    idx = np.repeat(lo_idx, counts) + (np.arange(int(counts.sum())) - starts)
+    return np.bincount(idx, weights=np.repeat(weights[valid], counts), minlength=bins)
+
+
+def profile_from_hist(mids: np.ndarray, hist: np.ndarray) -> dict[str, Any]:
     va = value_area_from_hist(mids, hist, pct=0.70)
     return {
         "poc": va["poc"],
@@ -699,6 +718,17 @@ def profile_from_range(df: pd.DataFrame, bins: int = 40) -> dict[str, Any]:
     }
 
 
+def profile_from_range(df: pd.DataFrame, bins: int = 40) -> dict[str, Any]:
+    lo, hi = float(df["low"].min()), float(df["high"].max())
+    edges = np.linspace(lo, hi, bins + 1)
+    mids = (edges[:-1] + edges[1:]) / 2.0
+    lo_idx, hi_idx = price_bin_spans(
+        edges, df["low"].to_numpy(dtype=float), df["high"].to_numpy(dtype=float)
+    )
+    hist = span_histogram(lo_idx, hi_idx, df["volume"].to_numpy(dtype=float), bins)
+    return profile_from_hist(mids, hist)
+
+
 # ---------------------------------------------------------------------------
 # Classify helpers
 # ---------------------------------------------------------------------------
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""Bar-by-bar daily feature state for walk-forward replays.
+
+`IncrementalIndicators` appends one daily bar at a time and keeps the same
+columns as `add_ma_stack`, `add_atr14`, `add_swings` and `add_volume_features`
+plus the `detect_structure_events` output for the visible prefix, so a replay
+over N bars costs O(N) instead of recomputing every prefix from bar zero.
+`RollingVolumeProfile` does the same for `profile_from_range` over a trailing
+window.
+
+The rolling means follow pandas' compensated running sum and the EMA follows
+pandas' `adjust=False` recurrence, so values are bit-identical to the batch
+helpers in `ta_common.py`.
+"""
+# pyright: reportGeneralTypeIssues=false, reportArgumentType=false
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from ta_common import price_bin_spans, profile_from_hist, span_histogram
+
+
+FEATURE_COLS = (
+    "EMA21",
+    "SMA50",
+    "SMA200",
+    "ATR14",
+    "swing_high",
+    "swing_low",
+    "vol_ma20",
+    "vol_ratio",
+    "ret",
+)
+# Integer volumes below this keep a 260-bar histogram sum exact in float64.
+EXACT_VOLUME_LIMIT = 2.0**53 / 1024
+
+
+class RollingMean:
+    """Fixed-window mean matching `Series.rolling(window).mean()`."""
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._values: list[float] = []
+        self._nobs = 0
+        self._sum = 0.0
+        self._neg_ct = 0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_ct = 0
+        self._prev_value = math.nan
+
+    def _add(self, val: float) -> None:
+        if val != val:
+            return
+        self._nobs += 1
+        y = val - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, val) < 0:
+            self._neg_ct += 1
+        if val == self._prev_value:
+            self._same_ct += 1
+        else:
+            self._same_ct = 1
+        self._prev_value = val
+
+    def _remove(self, val: float) -> None:
+        if val != val:
+            return
+        self._nobs -= 1
+        y = -val - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, val) < 0:
+            self._neg_ct -= 1
+
+    def update(self, val: float) -> float:
+        i = len(self._values)
+        self._values.append(val)
+        if i == 0 or self.window == 1:
+            # pandas re-seeds the running sum when consecutive windows share no bars.
+            self._prev_value = val
+            self._same_ct = 0
+            self._sum = self._comp_add = self._comp_remove = 0.0
+            self._nobs = 0
+            self._neg_ct = 0
+        elif i >= self.window:
+            self._remove(self._values[i - self.window])
+        self._add(val)
+        return self._mean()
+
+    def _mean(self) -> float:
+        if self._nobs < self.window or self._nobs <= 0:
+            return math.nan
+        result = self._sum / self._nobs
+        if self._same_ct >= self._nobs:
+            return self._prev_value
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == self._nobs and result > 0:
+            return 0.0
+        return result
+
+
+class EwmMean:
+    """Matches `Series.ewm(span=span, adjust=False).mean()`."""
+
+    def __init__(self, span: int) -> None:
+        com = (span - 1) / 2.0
+        self._alpha = 1.0 / (1.0 + com)
+        self._old_wt_factor = 1.0 - self._alpha
+        self._weighted = math.nan
+        self._old_wt = 1.0
+        self._started = False
+
+    def update(self, val: float) -> float:
+        if not self._started:
+            self._started = True
+            self._weighted = val
+            return self._weighted
+        if self._weighted == self._weighted:
+            self._old_wt *= self._old_wt_factor
+            if val == val:
+                if self._weighted != val:
+                    self._weighted = (
+                        self._old_wt * self._weighted + self._alpha * val
+                    ) / (self._old_wt + self._alpha)
+                self._old_wt = 1.0
+        elif val == val:
+            self._weighted = val
+        return self._weighted
+
+
+class IncrementalIndicators:
+    """Append-only daily feature state with confirmed swings and structure events.
+
+    A swing at bar i needs `swing_n` bars on both sides, so it is confirmed
+    once bar i + swing_n arrives. Structure events up to the newest confirmed
+    bar are committed; the last `swing_n` bars (which cannot be swings in the
+    visible prefix) are replayed on a copy whenever events are read.
+    """
+
+    def __init__(self, swing_n: int = 2) -> None:
+        self.swing_n = swing_n
+        self._columns: dict[str, list[Any]] = {}
+        self._features: dict[str, list[float]] = {col: [] for col in FEATURE_COLS}
+        self._ema21 = EwmMean(21)
+        self._sma50 = RollingMean(50)
+        self._sma200 = RollingMean(200)
+        self._atr14 = RollingMean(14)
+        self._vol_ma20 = RollingMean(20)
+        self._high: list[float] = []
+        self._low: list[float] = []
+        self._close: list[float] = []
+        self._datetime: list[pd.Timestamp] = []
+        # Committed structure-event state (bars [0, _committed)).
+        self._committed = 0
+        self._last_high: float | None = None
+        self._last_low: float | None = None
+        self._last_side: str | None = None
+        self._seen: set[tuple[Any, ...]] = set()
+        self._compact: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._close)
+
+    def extend(self, df: pd.DataFrame) -> None:
+        for bar in df.to_dict("records"):
+            self.append(bar)
+
+    def append(self, bar: Mapping[str, Any]) -> None:
+        if not self._columns:
+            self._columns = {key: [] for key in bar}
+        elif set(bar) != set(self._columns):
+            raise ValueError("bar columns differ from previously appended bars")
+        for key, value in bar.items():
+            self._columns[key].append(value)
+
+        high = float(bar["high"])
+        low = float(bar["low"])
+        close = float(bar["close"])
+        volume = float(bar["volume"])
+        prev_close = self._close[-1] if self._close else math.nan
+        self._high.append(high)
+        self._low.append(low)
+        self._close.append(close)
+        self._datetime.append(pd.Timestamp(bar["datetime"]))
+
+        f = self._features
+        f["EMA21"].append(self._ema21.update(close))
+        f["SMA50"].append(self._sma50.update(close))
+        f["SMA200"].append(self._sma200.update(close))
+        # pandas max(axis=1) skips NaN, so the first bar's true range is high - low.
+        ranges = [high - low, abs(high - prev_close), abs(low - prev_close)]
+        ranges = [r for r in ranges if r == r]
+        f["ATR14"].append(self._atr14.update(max(ranges) if ranges else math.nan))
+        f["swing_high"].append(math.nan)
+        f["swing_low"].append(math.nan)
+        vol_ma = self._vol_ma20.update(volume)
+        f["vol_ma20"].append(vol_ma)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f["vol_ratio"].append(float(np.float64(volume) / np.float64(vol_ma)))
+            f["ret"].append(float(np.float64(close) / np.float64(prev_close) - 1.0))
+
+        self._confirm_swing(len(self._close) - 1 - self.swing_n)
+        while self._committed <= len(self._close) - 1 - self.swing_n:
+            self._commit_bar(self._committed)
+            self._committed += 1
+
+    def _confirm_swing(self, i: int) -> None:
+        n = self.swing_n
+        if i - n < 0:
+            return
+        hi = self._high[i]
+        lo = self._low[i]
+        is_high = True
+        is_low = True
+        for k in range(1, n + 1):
+            is_high = is_high and hi > self._high[i - k] and hi > self._high[i + k]
+            is_low = is_low and lo < self._low[i - k] and lo < self._low[i + k]
+        if is_high:
+            self._features["swing_high"][i] = hi
+        if is_low:
+            self._features["swing_low"][i] = lo
+
+    def _commit_bar(self, i: int) -> None:
+        swing_high = self._features["swing_high"][i]
+        swing_low = self._features["swing_low"][i]
+        if swing_high == swing_high:
+            self._last_high = float(swing_high)
+        if swing_low == swing_low:
+            self._last_low = float(swing_low)
+        event, self._last_side = _structure_event(
+            self._datetime[i], self._close[i], self._last_high, self._last_low, self._last_side
+        )
+        if event is not None:
+            _fold_event(event, self._seen, self._compact)
+
+    def structure_events(self) -> list[dict[str, Any]]:
+        """Same output as `detect_structure_events` on the current prefix."""
+        compact = [dict(e) for e in self._compact[-16:]]
+        seen = self._seen
+        last_side = self._last_side
+        for i in range(self._committed, len(self._close)):
+            # Unconfirmed tail bars carry no swing in the visible prefix.
+            event, last_side = _structure_event(
+                self._datetime[i], self._close[i], self._last_high, self._last_low, last_side
+            )
+            if event is not None:
+                if seen is self._seen:
+                    seen = set(self._seen)
+                _fold_event(event, seen, compact)
+        return compact[-16:]
+
+    def frame(self) -> pd.DataFrame:
+        """Visible prefix with the batch feature columns appended."""
+        x = pd.DataFrame({key: values for key, values in self._columns.items()})
+        for col in FEATURE_COLS:
+            x[col] = np.asarray(self._features[col], dtype=float)
+        return x
+
+
+def _structure_event(
+    dt: pd.Timestamp,
+    close: float,
+    last_high: float | None,
+    last_low: float | None,
+    last_side: str | None,
+) -> tuple[dict[str, Any] | None, str | None]:
+    if last_high is not None and close > last_high:
+        label = "BOS" if last_side == "up" else "CHOCH"
+        return {
+            "datetime": dt,
+            "side": "up",
+            "label": label,
+            "broken_level": last_high,
+            "close": close,
+        }, "up"
+    if last_low is not None and close < last_low:
+        label = "BOS" if last_side == "down" else "CHOCH"
+        return {
+            "datetime": dt,
+            "side": "down",
+            "label": label,
+            "broken_level": last_low,
+            "close": close,
+        }, "down"
+    return None, last_side
+
+
+def _fold_event(
+    e: dict[str, Any], seen: set[tuple[Any, ...]], compact: list[dict[str, Any]]
+) -> None:
+    key = (str(e["datetime"]), e["side"], round(float(e["broken_level"]), 4))
+    if key in seen:
+        return
+    seen.add(key)
+    cur = {
+        "datetime": e["datetime"],
+        "side": e["side"],
+        "label": e["label"],
+        "broken_level": float(e["broken_level"]),
+        "close": float(e["close"]),
+        "count": 1,
+    }
+    if not compact:
+        compact.append(cur)
+        return
+    prev = compact[-1]
+    gap_days = int((pd.Timestamp(cur["datetime"]) - pd.Timestamp(prev["datetime"])).days)
+    same_side = prev["side"] == cur["side"]
+    same_label = prev["label"] == cur["label"]
+    prev_lvl = float(prev["broken_level"])
+    cur_lvl = float(cur["broken_level"])
+    lvl_close = abs(cur_lvl - prev_lvl) / max(abs(prev_lvl), 1e-9) <= 0.0035
+    if same_side and same_label and lvl_close and gap_days <= 4:
+        prev["datetime"] = cur["datetime"]
+        prev["close"] = cur["close"]
+        prev["broken_level"] = cur_lvl
+        prev["count"] = int(prev.get("count", 1)) + 1
+    else:
+        compact.append(cur)
+
+
+class RollingVolumeProfile:
+    """`profile_from_range(df.tail(window), bins)` maintained bar by bar.
+
+    Bin edges follow the window's low/high. While they stay put, the entering
+    bar's volume is added to its bins and the leaving bar's removed. When the
+    edges move, or the window holds a volume that add/remove would not
+    round-trip exactly, the histogram is rebuilt from the window.
+    """
+
+    def __init__(self, window: int = 260, bins: int = 40) -> None:
+        self.window = window
+        self.bins = bins
+        self._low: list[float] = []
+        self._high: list[float] = []
+        self._volume: list[float] = []
+        self._max_q: deque[int] = deque()
+        self._min_q: deque[int] = deque()
+        self._inexact = 0
+        self._bounds: tuple[float, float] | None = None
+        self._edges = np.zeros(0)
+        self._hist = np.zeros(bins)
+
+    @staticmethod
+    def _is_inexact(volume: float) -> bool:
+        return not (float(volume).is_integer() and abs(volume) < EXACT_VOLUME_LIMIT)
+
+    def append(self, low: float, high: float, volume: float) -> None:
+        i = len(self._low)
+        self._low.append(float(low))
+        self._high.append(float(high))
+        self._volume.append(float(volume))
+        while self._max_q and self._high[self._max_q[-1]] <= high:
+            self._max_q.pop()
+        self._max_q.append(i)
+        while self._min_q and self._low[self._min_q[-1]] >= low:
+            self._min_q.pop()
+        self._min_q.append(i)
+
+        start = i + 1 - self.window
+        while self._max_q[0] < start:
+            self._max_q.popleft()
+        while self._min_q[0] < start:
+            self._min_q.popleft()
+        self._inexact += self._is_inexact(volume)
+        leaving = start - 1
+        if leaving >= 0:
+            self._inexact -= self._is_inexact(self._volume[leaving])
+
+        bounds = (self._low[self._min_q[0]], self._high[self._max_q[0]])
+        if bounds != self._bounds or self._inexact:
+            self._rebuild(bounds, max(start, 0))
+            return
+        self._add_span(i, 1.0)
+        if leaving >= 0:
+            self._add_span(leaving, -1.0)
+
+    def _add_span(self, i: int, sign: float) -> None:
+        edges = self._edges
+        lo_idx = max(int(np.searchsorted(edges, self._low[i], side="right")) - 1, 0)
+        hi_idx = min(int(np.searchsorted(edges, self._high[i], side="right")) - 1, self.bins - 1)
+        if hi_idx >= lo_idx:
+            self._hist[lo_idx : hi_idx + 1] += sign * self._volume[i]
+
+    def _rebuild(self, bounds: tuple[float, float], start: int) -> None:
+        self._bounds = bounds
+        self._edges = np.linspace(bounds[0], bounds[1], self.bins + 1)
+        low = np.asarray(self._low[start:], dtype=float)
+        high = np.asarray(self._high[start:], dtype=float)
+        lo_idx, hi_idx = price_bin_spans(self._edges, low, high)
+        self._hist = span_histogram(
+            lo_idx, hi_idx, np.asarray(self._volume[start:], dtype=float), self.bins
+        )
+
+    def profile(self) -> dict[str, Any]:
+        mids = (self._edges[:-1] + self._edges[1:]) / 2.0
+        return profile_from_hist(mids, self._hist.copy())
+
+
+def replay_prefixes(
+    df: pd.DataFrame, ends: Iterable[int], swing_n: int = 2, profile_window: int = 260
+) -> dict[int, dict[str, Any]]:
+    """Stream `df` once and snapshot the state at each prefix length.
+
+    Each snapshot holds `features` (the prefix with batch feature columns),
+    `structure_events` and `volume_profile` (`vpvr_core` of the last
+    `profile_window` bars).
+    """
+    wanted = sorted(set(int(end) for end in ends))
+    state = IncrementalIndicators(swing_n=swing_n)
+    profile = RollingVolumeProfile(window=profile_window)
+    out: dict[int, dict[str, Any]] = {}
+    records = df.to_dict("records")
+    for end in wanted:
+        if end <= 0 or end > len(records):
+            raise ValueError(f"prefix length out of range: {end}")
+        while len(state) < end:
+            bar = records[len(state)]
+            state.append(bar)
+            profile.append(bar["low"], bar["high"], bar["volume"])
+        out[end] = {
+            "features": state.frame(),
+            "structure_events": state.structure_events(),
+            "volume_profile": profile.profile(),
+        }
+    return out
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from typing import Any
 
 import numpy as np
@@ -20,6 +21,8 @@ PRIOR_WINDOW = 20
 RECENT_WINDOW = 12
 STATE_CONFIRM_BARS = 4
 MIN_SEGMENT_BARS = 4
+# Furthest look-back of any per-bar helper (adaptive range + prior trend).
+LOOKBACK_BARS = RANGE_WINDOW_HIGH_VOL + PRIOR_WINDOW
 
 # Event detection thresholds (ATR/RVOL-normalized, IDX-calibrated)
 CLIMAX_RVOL = 2.5
@@ -72,32 +75,42 @@ def _prepare_daily(df: pd.DataFrame) -> pd.DataFrame:
     return x.reset_index(drop=True)
 
 
-def _bar_close_position(row: pd.Series) -> float:
-    hi = float(row["high"])
-    lo = float(row["low"])
-    if hi <= lo:
-        return 0.5
-    return float((float(row["close"]) - lo) / (hi - lo))
-
-
-def _effort_result_counts(window: pd.DataFrame) -> dict[str, int]:
-    recent = window.tail(RECENT_WINDOW)
-    strong_up = int(((recent["ret"] > 0.025) & (recent["vol_ratio"] > 1.25)).sum())
-    strong_down = int(((recent["ret"] < -0.025) & (recent["vol_ratio"] > 1.25)).sum())
-    climactic_down = int(
-        (
-            (recent["ret"] < -0.05)
-            & (recent["vol_ratio"] > 1.7)
-            & (recent.apply(_bar_close_position, axis=1) < 0.35)
-        ).sum()
-    )
-    climactic_up = int(
-        (
-            (recent["ret"] > 0.05)
-            & (recent["vol_ratio"] > 1.7)
-            & (recent.apply(_bar_close_position, axis=1) > 0.65)
-        ).sum()
-    )
+def _bar_close_positions(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cp = (close - low) / (high - low)
+    return np.where(high <= low, 0.5, cp)
+
+
+def _bar_arrays(x: pd.DataFrame, offset: int) -> dict[str, Any]:
+    """NumPy views of the prepared columns from `offset` on.
+
+    Every per-bar helper below looks back at most `LOOKBACK_BARS`, so callers
+    only need the bars from `first_new_bar - LOOKBACK_BARS` onwards.
+    """
+    tail = x.iloc[offset:]
+    a: dict[str, Any] = {
+        col: tail[col].to_numpy(dtype=float)
+        for col in ("open", "high", "low", "close", "EMA21", "SMA50", "ATR14", "vol_ratio", "ret")
+    }
+    a["cp"] = _bar_close_positions(a["high"], a["low"], a["close"])
+    a["datetime"] = tail["datetime"].tolist()
+    return a
+
+
+def _tail(j: int, size: int) -> slice:
+    """Slice of the last `size` bars ending at local index `j`."""
+    return slice(max(0, j + 1 - size), j + 1)
+
+
+def _effort_result_counts(a: dict[str, Any], j: int) -> dict[str, int]:
+    s = _tail(j, RECENT_WINDOW)
+    ret = a["ret"][s]
+    vol_ratio = a["vol_ratio"][s]
+    cp = a["cp"][s]
+    strong_up = int(((ret > 0.025) & (vol_ratio > 1.25)).sum())
+    strong_down = int(((ret < -0.025) & (vol_ratio > 1.25)).sum())
+    climactic_down = int(((ret < -0.05) & (vol_ratio > 1.7) & (cp < 0.35)).sum())
+    climactic_up = int(((ret > 0.05) & (vol_ratio > 1.7) & (cp > 0.65)).sum())
     return {
         "strong_up": strong_up,
         "strong_down": strong_down,
@@ -106,19 +119,15 @@ def _effort_result_counts(window: pd.DataFrame) -> dict[str, int]:
     }
 
 
-def _adaptive_range_window(window: pd.DataFrame) -> int:
+def _adaptive_range_window(a: dict[str, Any], j: int, n_bars: int) -> int:
     """Choose range window based on ATR regime. High-volatility names get a
     wider context window so parabolic moves don't compress into a meaningless
     35-bar range."""
-    if len(window) < 20:
+    if n_bars < 20:
         return RANGE_WINDOW
-    last = window.iloc[-1]
-    close_price = float(last["close"])
-    atr14 = (
-        float(last["ATR14"])
-        if pd.notna(last.get("ATR14")) and float(last["ATR14"]) > 0
-        else 0.0
-    )
+    close_price = float(a["close"][j])
+    atr = a["ATR14"][j]
+    atr14 = float(atr) if not np.isnan(atr) and float(atr) > 0 else 0.0
     if close_price <= 0 or atr14 <= 0:
         return RANGE_WINDOW
     atr_pct = atr14 / close_price
@@ -127,12 +136,12 @@ def _adaptive_range_window(window: pd.DataFrame) -> int:
     return RANGE_WINDOW
 
 
-def _range_stats(window: pd.DataFrame, range_window: int | None = None) -> dict[str, float]:
+def _range_stats(a: dict[str, Any], j: int, range_window: int | None = None) -> dict[str, float]:
     rw = range_window if range_window is not None else RANGE_WINDOW
-    rng = window.tail(rw)
-    range_high = float(rng["high"].max())
-    range_low = float(rng["low"].min())
-    close_price = float(rng["close"].iloc[-1])
+    s = _tail(j, rw)
+    range_high = float(np.nanmax(a["high"][s]))
+    range_low = float(np.nanmin(a["low"][s]))
+    close_price = float(a["close"][j])
     range_span = max(range_high - range_low, 1e-9)
     pos_in_range = float((close_price - range_low) / range_span)
     span_pct = float(range_span / max(abs(close_price), 1e-9))
@@ -146,19 +155,22 @@ def _range_stats(window: pd.DataFrame, range_window: int | None = None) -> dict[
     }
 
 
-def _trend_snapshot(window: pd.DataFrame) -> dict[str, Any]:
-    last = window.iloc[-1]
-    close_price = float(last["close"])
-    ema21 = float(last["EMA21"]) if pd.notna(last["EMA21"]) else close_price
-    sma50 = float(last["SMA50"]) if pd.notna(last["SMA50"]) else close_price
-    atr14 = float(last["ATR14"]) if pd.notna(last["ATR14"]) and float(last["ATR14"]) > 0 else max(close_price * 0.02, 1e-9)
+def _trend_snapshot(a: dict[str, Any], j: int) -> dict[str, Any]:
+    close_price = float(a["close"][j])
+    ema = a["EMA21"][j]
+    sma = a["SMA50"][j]
+    atr = a["ATR14"][j]
+    ema21 = float(ema) if not np.isnan(ema) else close_price
+    sma50 = float(sma) if not np.isnan(sma) else close_price
+    atr14 = float(atr) if not np.isnan(atr) and float(atr) > 0 else max(close_price * 0.02, 1e-9)
 
-    lookback_close = float(window["close"].iloc[max(0, len(window) - PRIOR_WINDOW)])
+    lookback_close = float(a["close"][max(0, j + 1 - PRIOR_WINDOW)])
     slope_pct = float((close_price - lookback_close) / max(abs(lookback_close), 1e-9))
     bullish_stack = bool(close_price > ema21 > sma50)
     bearish_stack = bool(close_price < ema21 < sma50)
-    above_ema_ratio = float((window.tail(10)["close"] > window.tail(10)["EMA21"]).mean())
-    below_ema_ratio = float((window.tail(10)["close"] < window.tail(10)["EMA21"]).mean())
+    s = _tail(j, 10)
+    above_ema_ratio = float((a["close"][s] > a["EMA21"][s]).mean())
+    below_ema_ratio = float((a["close"][s] < a["EMA21"][s]).mean())
 
     return {
         "close": close_price,
@@ -173,19 +185,21 @@ def _trend_snapshot(window: pd.DataFrame) -> dict[str, Any]:
     }
 
 
-def _prior_trend_bias(window: pd.DataFrame, range_window: int | None = None) -> str:
+def _prior_trend_bias(
+    a: dict[str, Any], j: int, n_bars: int, range_window: int | None = None
+) -> str:
     rw = range_window if range_window is not None else RANGE_WINDOW
-    if len(window) < rw + PRIOR_WINDOW:
+    if n_bars < rw + PRIOR_WINDOW:
         return "unclear"
-    prior = window.iloc[-(rw + PRIOR_WINDOW) : -rw]
-    if prior.empty:
-        return "unclear"
-    last = prior.iloc[-1]
-    first_close = float(prior["close"].iloc[0])
-    last_close = float(prior["close"].iloc[-1])
+    first = j + 1 - (rw + PRIOR_WINDOW)
+    last = j - rw
+    first_close = float(a["close"][first])
+    last_close = float(a["close"][last])
     slope_pct = (last_close - first_close) / max(abs(first_close), 1e-9)
-    ema21 = float(last["EMA21"]) if pd.notna(last["EMA21"]) else last_close
-    sma50 = float(last["SMA50"]) if pd.notna(last["SMA50"]) else last_close
+    ema = a["EMA21"][last]
+    sma = a["SMA50"][last]
+    ema21 = float(ema) if not np.isnan(ema) else last_close
+    sma50 = float(sma) if not np.isnan(sma) else last_close
     if slope_pct > 0.08 or (last_close > ema21 > sma50):
         return "up"
     if slope_pct < -0.08 or (last_close < ema21 < sma50):
@@ -193,22 +207,16 @@ def _prior_trend_bias(window: pd.DataFrame, range_window: int | None = None) ->
     return "unclear"
 
 
-def _spring_or_upthrust(window: pd.DataFrame, range_low: float, range_high: float) -> dict[str, bool]:
-    recent = window.tail(10)
-    spring = bool(
-        (
-            (recent["low"] < (range_low * 0.99))
-            & (recent["close"] > range_low)
-            & (recent.apply(_bar_close_position, axis=1) > 0.45)
-        ).any()
-    )
-    upthrust = bool(
-        (
-            (recent["high"] > (range_high * 1.01))
-            & (recent["close"] < range_high)
-            & (recent.apply(_bar_close_position, axis=1) < 0.55)
-        ).any()
-    )
+def _spring_or_upthrust(
+    a: dict[str, Any], j: int, range_low: float, range_high: float
+) -> dict[str, bool]:
+    s = _tail(j, 10)
+    low = a["low"][s]
+    high = a["high"][s]
+    close = a["close"][s]
+    cp = a["cp"][s]
+    spring = bool(((low < (range_low * 0.99)) & (close > range_low) & (cp > 0.45)).any())
+    upthrust = bool(((high > (range_high * 1.01)) & (close < range_high) & (cp < 0.55)).any())
     return {"spring": spring, "upthrust": upthrust}
 
 
@@ -260,35 +268,37 @@ def _has_preliminary_spacing(
     )
 
 
-def _recent_move_pct(window: pd.DataFrame, lookback: int = PRIOR_WINDOW) -> float:
-    if len(window) < 2:
+def _recent_move_pct(a: dict[str, Any], j: int, n_bars: int, lookback: int = PRIOR_WINDOW) -> float:
+    if n_bars < 2:
         return 0.0
-    anchor_idx = max(0, len(window) - lookback - 1)
-    ref_close = float(window["close"].iloc[anchor_idx])
-    close = float(window["close"].iloc[-1])
+    ref_close = float(a["close"][max(0, j - lookback)])
+    close = float(a["close"][j])
     return (close - ref_close) / max(abs(ref_close), 1e-9)
 
 
 def _detect_events(
-    window: pd.DataFrame,
+    a: dict[str, Any],
+    j: int,
     bar_idx: int,
     ctx: dict[str, Any],
     cycle_phase: str,
     schematic_phase: str,
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    """Detect Wyckoff schematic events for the current bar. Returns (events, updated_ctx)."""
+    """Detect Wyckoff schematic events for bar `bar_idx` (local index `j` in `a`).
+    Returns (events, updated_ctx)."""
     events: list[dict[str, Any]] = []
-    row = window.iloc[-1]
-    ts = str(row["datetime"])
-    close = float(row["close"])
-    low = float(row["low"])
-    high = float(row["high"])
-    open_price = float(row["open"])
-    vol_ratio = float(row["vol_ratio"]) if pd.notna(row["vol_ratio"]) else 1.0
-    atr14 = float(row["ATR14"]) if pd.notna(row["ATR14"]) and float(row["ATR14"]) > 0 else max(close * 0.02, 1e-9)
+    n_bars = bar_idx + 1
+    ts = str(a["datetime"][j])
+    close = float(a["close"][j])
+    low = float(a["low"][j])
+    high = float(a["high"][j])
+    open_price = float(a["open"][j])
+    vol_ratio = float(a["vol_ratio"][j]) if not np.isnan(a["vol_ratio"][j]) else 1.0
+    atr = a["ATR14"][j]
+    atr14 = float(atr) if not np.isnan(atr) and float(atr) > 0 else max(close * 0.02, 1e-9)
     spread = high - low
-    cp = _bar_close_position(row)
-    ret = float(row["ret"]) if pd.notna(row["ret"]) else 0.0
+    cp = float(a["cp"][j])
+    ret = float(a["ret"][j]) if not np.isnan(a["ret"][j]) else 0.0
     lower_tail_ratio = (
         float((min(open_price, close) - low) / spread)
         if spread > 0
@@ -301,7 +311,7 @@ def _detect_events(
     )
 
     # Range references: prefer anchored, fall back to rolling
-    stats = _range_stats(window)
+    stats = _range_stats(a, j)
     range_low = ctx["anchored_low"] if ctx["anchored_low"] is not None else stats["range_low"]
     range_high = ctx["anchored_high"] if ctx["anchored_high"] is not None else stats["range_high"]
     range_mid = (range_low + range_high) / 2.0
@@ -342,9 +352,9 @@ def _detect_events(
         if phase == "A" and ctx["sc_bar"] is None and _has_preliminary_spacing(
             ctx.get("ps_bar"), bar_idx
         ):
-            lookback = window.tail(min(CLIMAX_LOOKBACK, len(window)))
-            is_near_low = low <= float(lookback["low"].min()) * (1.0 + RANGE_PROXIMITY_PCT)
-            decline_pct = _recent_move_pct(window)
+            lookback = _tail(j, min(CLIMAX_LOOKBACK, n_bars))
+            is_near_low = low <= float(np.nanmin(a["low"][lookback])) * (1.0 + RANGE_PROXIMITY_PCT)
+            decline_pct = _recent_move_pct(a, j, n_bars)
             has_absorption = cp >= 0.55 or lower_tail_ratio >= 0.35
             non_climactic_volume = HIGH_RVOL <= vol_ratio < CLIMAX_RVOL
             wide_enough = spread >= TEST_SPREAD_ATR * atr14
@@ -385,8 +395,8 @@ def _detect_events(
 
         # --- SC: Selling Climax ---
         if phase == "A" and ctx["sc_bar"] is None and not ps_emitted:
-            lookback = window.tail(min(CLIMAX_LOOKBACK, len(window)))
-            is_new_low = low <= float(lookback["low"].min())
+            lookback = _tail(j, min(CLIMAX_LOOKBACK, n_bars))
+            is_new_low = low <= float(np.nanmin(a["low"][lookback]))
             if is_new_low and vol_ratio >= CLIMAX_RVOL and spread >= WIDE_SPREAD_ATR * atr14 and cp >= 0.45:
                 score = min(1.0, 0.4 + (vol_ratio - CLIMAX_RVOL) * 0.15 + (spread / atr14 - WIDE_SPREAD_ATR) * 0.1 + (cp - 0.45) * 0.5)
                 events.append(_event("SC", bar_idx, ts, low, score, "climactic"))
@@ -461,9 +471,9 @@ def _detect_events(
         if phase == "A" and ctx["bc_bar"] is None and _has_preliminary_spacing(
             ctx.get("psy_bar"), bar_idx
         ):
-            lookback = window.tail(min(CLIMAX_LOOKBACK, len(window)))
-            is_near_high = high >= float(lookback["high"].max()) * (1.0 - RANGE_PROXIMITY_PCT)
-            rally_pct = _recent_move_pct(window)
+            lookback = _tail(j, min(CLIMAX_LOOKBACK, n_bars))
+            is_near_high = high >= float(np.nanmax(a["high"][lookback])) * (1.0 - RANGE_PROXIMITY_PCT)
+            rally_pct = _recent_move_pct(a, j, n_bars)
             has_rejection = cp <= 0.45 or upper_tail_ratio >= 0.35
             non_climactic_volume = HIGH_RVOL <= vol_ratio < CLIMAX_RVOL
             wide_enough = spread >= TEST_SPREAD_ATR * atr14
@@ -504,8 +514,8 @@ def _detect_events(
 
         # --- BC: Buying Climax ---
         if phase == "A" and ctx["bc_bar"] is None and not psy_emitted:
-            lookback = window.tail(min(CLIMAX_LOOKBACK, len(window)))
-            is_new_high = high >= float(lookback["high"].max())
+            lookback = _tail(j, min(CLIMAX_LOOKBACK, n_bars))
+            is_new_high = high >= float(np.nanmax(a["high"][lookback]))
             if is_new_high and vol_ratio >= CLIMAX_RVOL and spread >= WIDE_SPREAD_ATR * atr14 and cp <= 0.40:
                 score = min(1.0, 0.4 + (vol_ratio - CLIMAX_RVOL) * 0.15 + (spread / atr14 - WIDE_SPREAD_ATR) * 0.1 + (0.40 - cp) * 0.5)
                 events.append(_event("BC", bar_idx, ts, high, score, "climactic"))
@@ -596,24 +606,25 @@ def _dedupe_events(raw_events: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return sorted(trimmed, key=lambda e: e["bar_index"])
 
 
-def _classify_state(window: pd.DataFrame) -> dict[str, Any]:
-    rw = _adaptive_range_window(window)
-    stats = _range_stats(window, range_window=rw)
-    trend = _trend_snapshot(window)
-    effort = _effort_result_counts(window)
-    prior_bias = _prior_trend_bias(window, range_window=rw)
-    event_flags = _spring_or_upthrust(window, stats["range_low"], stats["range_high"])
+def _classify_state(a: dict[str, Any], j: int, n_bars: int) -> dict[str, Any]:
+    """Classify the bar at local index `j`, with `n_bars` bars visible so far."""
+    rw = _adaptive_range_window(a, j, n_bars)
+    stats = _range_stats(a, j, range_window=rw)
+    trend = _trend_snapshot(a, j)
+    effort = _effort_result_counts(a, j)
+    prior_bias = _prior_trend_bias(a, j, n_bars, range_window=rw)
+    event_flags = _spring_or_upthrust(a, j, stats["range_low"], stats["range_high"])
 
     range_like = bool(stats["range_span_pct"] <= 0.28 and abs(trend["slope_pct"]) <= 0.12)
     sos_recent = bool(
-        len(window) >= 2
-        and float(window["close"].iloc[-1]) > (stats["range_high"] * 1.005)
-        and float(window["close"].iloc[-2]) >= stats["range_mid"]
+        n_bars >= 2
+        and float(a["close"][j]) > (stats["range_high"] * 1.005)
+        and float(a["close"][j - 1]) >= stats["range_mid"]
     )
     sow_recent = bool(
-        len(window) >= 2
-        and float(window["close"].iloc[-1]) < (stats["range_low"] * 0.995)
-        and float(window["close"].iloc[-2]) <= stats["range_mid"]
+        n_bars >= 2
+        and float(a["close"][j]) < (stats["range_low"] * 0.995)
+        and float(a["close"][j - 1]) <= stats["range_mid"]
     )
 
     trend_up_score = 0.0
@@ -673,8 +684,7 @@ def _classify_state(window: pd.DataFrame) -> dict[str, Any]:
     elif max(acc_score, dist_score) >= 18.0:
         cycle_phase = "accumulation" if acc_score >= dist_score else "distribution"
         confidence_base = min(88.0, 38.0 + max(acc_score, dist_score))
-        recent_range = window.tail(rw)
-        bars_near_range = int(len(recent_range))
+        bars_near_range = int(min(n_bars, rw))
         if cycle_phase == "accumulation":
             if event_flags["spring"]:
                 schematic_phase = "C"
@@ -778,118 +788,219 @@ def _build_segment(
     return segment
 
 
-def build_wyckoff_state(
-    df_daily: pd.DataFrame,
-    *,
-    keep_segments: int = 8,
-    return_full_history: bool = False,
-) -> dict[str, Any]:
-    x = _prepare_daily(df_daily)
-    if len(x) < MIN_HISTORY_BARS:
-        result: dict[str, Any] = {
-            "as_of_date": str(x["datetime"].iloc[-1].date()),
-            "timeframe": "1d",
-            "current_cycle_phase": "unclear",
-            "current_wyckoff_phase": "unclear",
-            "wyckoff_current_confidence": 25,
-            "wyckoff_current_maturity": "fresh",
-            "wyckoff_history": [],
-        }
-        if return_full_history:
-            result["_full_history"] = []
-        return result
+def _empty_result(x: pd.DataFrame, return_full_history: bool) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "as_of_date": str(x["datetime"].iloc[-1].date()),
+        "timeframe": "1d",
+        "current_cycle_phase": "unclear",
+        "current_wyckoff_phase": "unclear",
+        "wyckoff_current_confidence": 25,
+        "wyckoff_current_maturity": "fresh",
+        "wyckoff_history": [],
+    }
+    if return_full_history:
+        result["_full_history"] = []
+    return result
 
-    raw_states: list[dict[str, Any]] = []
-    all_events: list[dict[str, Any]] = []
-    schematic_ctx = _new_schematic_ctx()
-    for idx in range(MIN_HISTORY_BARS - 1, len(x)):
-        state = _classify_state(x.iloc[: idx + 1])
-        state["index"] = idx
-        state["datetime"] = str(x.iloc[idx]["datetime"])
-        state["close"] = float(x.iloc[idx]["close"])
-        raw_states.append(state)
-        # Event detection pass
-        bar_events, schematic_ctx = _detect_events(
-            x.iloc[: idx + 1], idx, schematic_ctx,
-            state["cycle_phase"], state["schematic_phase"],
-        )
-        all_events.extend(bar_events)
-
-    confirmed: list[dict[str, Any]] = []
-    current = raw_states[0].copy()
-    pending_key: tuple[str, str] | None = None
-    pending_count = 0
-    pending_state: dict[str, Any] | None = None
-
-    for state in raw_states:
+
+class WyckoffTracker:
+    """Resumable Wyckoff state builder.
+
+    Per-bar states and schematic events only look back `LOOKBACK_BARS`, so a
+    tracker that is handed a longer copy of the same history classifies just
+    the new bars. It keeps the confirmed states, their segment boundaries and
+    the schematic context between calls; `to_dict`/`from_dict` persist them
+    for daily updates.
+    """
+
+    def __init__(self) -> None:
+        self.bars_seen = 0
+        self.last_ts: str | None = None
+        self.confirmed: list[dict[str, Any]] = []
+        self.group_starts: list[int] = []
+        self.events: list[dict[str, Any]] = []
+        self.schematic_ctx = _new_schematic_ctx()
+        self._current: dict[str, Any] | None = None
+        self._pending_key: tuple[str, str] | None = None
+        self._pending_count = 0
+        self._pending_state: dict[str, Any] | None = None
+
+    def update(
+        self,
+        df_daily: pd.DataFrame,
+        *,
+        keep_segments: int = 8,
+        return_full_history: bool = False,
+    ) -> dict[str, Any]:
+        """Append bars past `bars_seen` and return the `build_wyckoff_state` payload."""
+        x = _prepare_daily(df_daily)
+        if self.bars_seen and (
+            len(x) < self.bars_seen
+            or str(x["datetime"].iloc[self.bars_seen - 1]) != self.last_ts
+        ):
+            raise ValueError("daily dataframe does not extend the bars already tracked")
+
+        start = max(self.bars_seen, MIN_HISTORY_BARS - 1)
+        if start < len(x):
+            offset = max(0, start - LOOKBACK_BARS)
+            a = _bar_arrays(x, offset)
+            for idx in range(start, len(x)):
+                j = idx - offset
+                state = _classify_state(a, j, idx + 1)
+                state["index"] = idx
+                state["datetime"] = str(a["datetime"][j])
+                state["close"] = float(a["close"][j])
+                self._confirm(state)
+                # Event detection pass
+                bar_events, self.schematic_ctx = _detect_events(
+                    a, j, idx, self.schematic_ctx,
+                    state["cycle_phase"], state["schematic_phase"],
+                )
+                self.events.extend(bar_events)
+        self.bars_seen = len(x)
+        self.last_ts = str(x["datetime"].iloc[-1])
+
+        if len(x) < MIN_HISTORY_BARS:
+            return _empty_result(x, return_full_history)
+        return self._result(x, keep_segments, return_full_history)
+
+    def _confirm(self, state: dict[str, Any]) -> None:
+        """Require STATE_CONFIRM_BARS consecutive readings before switching state."""
+        if self._current is None:
+            self._current = state.copy()
+        current = self._current
         key = (str(state["cycle_phase"]), str(state["schematic_phase"]))
         current_key = (str(current["cycle_phase"]), str(current["schematic_phase"]))
         if key == current_key:
-            pending_key = None
-            pending_count = 0
+            self._pending_key = None
+            self._pending_count = 0
             current = {**current, "confidence": int(state["confidence"])}
         else:
-            if key == pending_key:
-                pending_count += 1
+            if key == self._pending_key:
+                self._pending_count += 1
             else:
-                pending_key = key
-                pending_count = 1
-                pending_state = state.copy()
-            if pending_count >= STATE_CONFIRM_BARS and pending_state is not None:
-                current = pending_state.copy()
-                pending_key = None
-                pending_count = 0
+                self._pending_key = key
+                self._pending_count = 1
+                self._pending_state = state.copy()
+            if self._pending_count >= STATE_CONFIRM_BARS and self._pending_state is not None:
+                current = self._pending_state.copy()
+                self._pending_key = None
+                self._pending_count = 0
         current = {
             **current,
             "index": int(state["index"]),
             "datetime": str(state["datetime"]),
             "close": float(state["close"]),
         }
-        confirmed.append(current.copy())
-
-    grouped_states: list[list[dict[str, Any]]] = []
-    seg_start = 0
-    for i in range(1, len(confirmed) + 1):
-        is_break = i == len(confirmed) or (
-            confirmed[i]["cycle_phase"] != confirmed[seg_start]["cycle_phase"]
-            or confirmed[i]["schematic_phase"] != confirmed[seg_start]["schematic_phase"]
-        )
-        if not is_break:
-            continue
-        grouped_states.append(confirmed[seg_start:i])
-        seg_start = i
-
-    smoothed_groups: list[list[dict[str, Any]]] = []
-    i = 0
-    while i < len(grouped_states):
-        group = grouped_states[i]
-        duration = int(group[-1]["index"]) - int(group[0]["index"]) + 1
-        if (
-            0 < i < len(grouped_states) - 1
-            and duration < MIN_SEGMENT_BARS
-            and grouped_states[i - 1][-1]["cycle_phase"] == grouped_states[i + 1][-1]["cycle_phase"]
-            and grouped_states[i - 1][-1]["schematic_phase"] == grouped_states[i + 1][-1]["schematic_phase"]
-        ):
-            merged_prev = smoothed_groups.pop()
-            merged = merged_prev + group + grouped_states[i + 1]
-            smoothed_groups.append(merged)
-            i += 2
-            continue
-        smoothed_groups.append(group)
-        i += 1
-
-    segments = [_build_segment(x, group, all_events) for group in smoothed_groups]
-
-    current_segment = segments[-1]
-    result = {
-        "as_of_date": str(x["datetime"].iloc[-1].date()),
-        "timeframe": "1d",
-        "current_cycle_phase": str(current_segment["cycle_phase"]),
-        "current_wyckoff_phase": str(current_segment["schematic_phase"]),
-        "wyckoff_current_confidence": int(current_segment["confidence"]),
-        "wyckoff_current_maturity": str(current_segment["maturity"]),
-        "wyckoff_history": segments[-keep_segments:],
-    }
-    if return_full_history:
-        result["_full_history"] = segments
-    return result
+        self._current = current
+
+        if self.confirmed:
+            group_head = self.confirmed[self.group_starts[-1]]
+            is_break = (
+                current["cycle_phase"] != group_head["cycle_phase"]
+                or current["schematic_phase"] != group_head["schematic_phase"]
+            )
+        else:
+            is_break = True
+        if is_break:
+            self.group_starts.append(len(self.confirmed))
+        self.confirmed.append(current.copy())
+
+    def _smoothed_groups(self) -> list[tuple[int, int]]:
+        """Merge short groups wedged between identical states; (start, stop) into `confirmed`."""
+        bounds = self.group_starts + [len(self.confirmed)]
+        groups = list(zip(bounds[:-1], bounds[1:]))
+        confirmed = self.confirmed
+
+        def _key(group: tuple[int, int]) -> tuple[Any, Any]:
+            last = confirmed[group[1] - 1]
+            return last["cycle_phase"], last["schematic_phase"]
+
+        smoothed: list[tuple[int, int]] = []
+        i = 0
+        while i < len(groups):
+            start, stop = groups[i]
+            duration = int(confirmed[stop - 1]["index"]) - int(confirmed[start]["index"]) + 1
+            if (
+                0 < i < len(groups) - 1
+                and duration < MIN_SEGMENT_BARS
+                and _key(groups[i - 1]) == _key(groups[i + 1])
+            ):
+                merged_start, _ = smoothed.pop()
+                smoothed.append((merged_start, groups[i + 1][1]))
+                i += 2
+                continue
+            smoothed.append((start, stop))
+            i += 1
+        return smoothed
+
+    def _result(
+        self, x: pd.DataFrame, keep_segments: int, return_full_history: bool
+    ) -> dict[str, Any]:
+        smoothed = self._smoothed_groups()
+        # Only the segments that are returned need building.
+        wanted = smoothed if return_full_history else smoothed[-keep_segments:]
+        event_bars = [int(e["bar_index"]) for e in self.events]
+        segments = []
+        for start, stop in wanted:
+            states = self.confirmed[start:stop]
+            lo = bisect_left(event_bars, int(states[0]["index"]))
+            hi = bisect_right(event_bars, int(states[-1]["index"]))
+            segments.append(_build_segment(x, states, self.events[lo:hi]))
+
+        current_segment = segments[-1]
+        result = {
+            "as_of_date": str(x["datetime"].iloc[-1].date()),
+            "timeframe": "1d",
+            "current_cycle_phase": str(current_segment["cycle_phase"]),
+            "current_wyckoff_phase": str(current_segment["schematic_phase"]),
+            "wyckoff_current_confidence": int(current_segment["confidence"]),
+            "wyckoff_current_maturity": str(current_segment["maturity"]),
+            "wyckoff_history": segments[-keep_segments:],
+        }
+        if return_full_history:
+            result["_full_history"] = segments
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "bars_seen": self.bars_seen,
+            "last_ts": self.last_ts,
+            "confirmed": self.confirmed,
+            "group_starts": self.group_starts,
+            "events": self.events,
+            "schematic_ctx": self.schematic_ctx,
+            "current": self._current,
+            "pending_key": list(self._pending_key) if self._pending_key else None,
+            "pending_count": self._pending_count,
+            "pending_state": self._pending_state,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "WyckoffTracker":
+        tracker = cls()
+        tracker.bars_seen = int(payload["bars_seen"])
+        tracker.last_ts = payload.get("last_ts")
+        tracker.confirmed = list(payload.get("confirmed", []))
+        tracker.group_starts = [int(v) for v in payload.get("group_starts", [])]
+        tracker.events = list(payload.get("events", []))
+        tracker.schematic_ctx = {**_new_schematic_ctx(), **payload.get("schematic_ctx", {})}
+        tracker._current = payload.get("current")
+        pending_key = payload.get("pending_key")
+        tracker._pending_key = tuple(pending_key) if pending_key else None
+        tracker._pending_count = int(payload.get("pending_count", 0))
+        tracker._pending_state = payload.get("pending_state")
+        return tracker
+
+
+def build_wyckoff_state(
+    df_daily: pd.DataFrame,
+    *,
+    keep_segments: int = 8,
+    return_full_history: bool = False,
+) -> dict[str, Any]:
+    return WyckoffTracker().update(
+        df_daily,
+        keep_segments=keep_segments,
+        return_full_history=return_full_history,
+    )
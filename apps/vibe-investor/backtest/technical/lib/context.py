@@ -1,16 +1,44 @@
 """Backtest-only daily TA context builder.
 
-Can be run standalone via `python -m lib.context` or invoked as subprocess.
+Contexts are built in-process by default. The subprocess engine runs
+`python -m lib.context` once per bar and is kept as an isolation mode for
+debugging skill-script changes.
+
+The in-process engine streams each scenario history once through
+`ta_incremental` and `wyckoff_state.WyckoffTracker` and hands the per-date
+feature frame, structure events, volume profile and Wyckoff state to the
+skill, instead of recomputing them per prefix.
 """
 
 from __future__ import annotations
 
 import argparse
+import copy
+import hashlib
 import json
 import subprocess
 import sys
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+import pandas as pd
+
+
+CONTEXT_ENGINES = ("inprocess", "subprocess")
+
+
+@dataclass(frozen=True)
+class VisibleHistory:
+    """Daily bars visible on one trade date, plus streamed TA features if any."""
+
+    bars: pd.DataFrame
+    features: pd.DataFrame | None = None
+    structure_events: list[dict[str, Any]] | None = None
+    wyckoff: dict[str, Any] | None = None
+    volume_profile: dict[str, Any] | None = None
+    digest: str | None = None
 
 
 def _skill_script_dir() -> Path:
@@ -23,12 +51,98 @@ def _skill_script_dir() -> Path:
     )
 
 
+@lru_cache(maxsize=1)
+def context_sources_fingerprint() -> str:
+    """Hash of every source file that shapes a context result.
+
+    Covers the technical-analysis skill scripts and this module, which holds
+    the slicing, feature streaming and skill wiring. Context-shaping code
+    must live in one of them, or come with a `CONTEXT_CACHE_VERSION` bump.
+    """
+    digest = hashlib.sha256()
+    paths = [*sorted(_skill_script_dir().glob("*.py")), Path(__file__).resolve()]
+    for path in paths:
+        digest.update(path.name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
 def ensure_skill_path() -> None:
     d = str(_skill_script_dir())
     if d not in sys.path:
         sys.path.insert(0, d)
 
 
+@lru_cache(maxsize=1)
+def _load_engine() -> tuple[Callable[..., dict[str, Any]], Callable[[str], set[str]]]:
+    """Import the skill scripts once per worker process and keep them warm."""
+    ensure_skill_path()
+    from build_ta_context import build_ta_context_result, parse_modules  # type: ignore[import-not-found]
+
+    return build_ta_context_result, parse_modules
+
+
+def daily_slice_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """In-memory equivalent of a payload reloaded through `load_ohlcv`."""
+    fields = ["timestamp", "datetime", "open", "high", "low", "close", "volume", "value"]
+    x = df[[field for field in fields if field in df.columns]].copy()
+    for field in ("open", "high", "low", "close", "volume", "value"):
+        if field in x.columns:
+            x[field] = x[field].astype(float)
+    return x.reset_index(drop=True)
+
+
+def stream_daily_features(daily: pd.DataFrame, ends: list[int]) -> dict[int, dict[str, Any]]:
+    """Replay `daily` bar by bar once, snapshotting `VisibleHistory` fields per prefix length."""
+    ensure_skill_path()
+    from ta_incremental import replay_prefixes  # type: ignore[import-not-found]
+    from wyckoff_state import WyckoffTracker  # type: ignore[import-not-found]
+
+    tracker = WyckoffTracker()
+    streamed = replay_prefixes(daily, ends)
+    for end in sorted(streamed):
+        streamed[end]["wyckoff"] = tracker.update(streamed[end]["features"])
+    return streamed
+
+
+def build_daily_context_inprocess(
+    *,
+    daily: pd.DataFrame,
+    context_path: Path,
+    symbol: str,
+    modules: str,
+    position_state: str,
+    min_rr_required: float,
+    structure_events: list[dict[str, Any]] | None = None,
+    wyckoff: dict[str, Any] | None = None,
+    volume_profile: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Build daily TA context directly from an in-memory daily slice.
+
+    Passing `structure_events` marks `daily` as already carrying the streamed
+    feature columns, so the skill skips its batch feature pass. `wyckoff` and
+    `volume_profile` likewise replace the per-prefix Wyckoff and VPVR rebuilds.
+    """
+    build_ta_context_result, parse_modules = _load_engine()
+    # The same streamed state serves both the flat and long build of a date.
+    result = build_ta_context_result(
+        symbol=symbol.strip().upper(), daily=daily,
+        intraday_1m=pd.DataFrame(), intraday=pd.DataFrame(),
+        modules=parse_modules(modules), purpose_mode="INITIAL", position_state=position_state,
+        min_rr_required=min_rr_required, prior_thesis=None,
+        timeframe_mode="daily_only",
+        features_ready=structure_events is not None,
+        structure_events=structure_events,
+        wyckoff=copy.deepcopy(wyckoff),
+        volume_profile=volume_profile,
+    )
+    with context_path.open("w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
 def build_daily_context(
     *,
     snapshot_path: Path,
@@ -0,0 +1,117 @@
+"""Content-addressed on-disk cache for daily TA context results.
+
+Entries are keyed by the visible daily history, the context parameters and a
+fingerprint of the context sources (the technical-analysis scripts and
+`lib/context.py`), so replays that only change policy code reuse every
+context, and any edit to those sources invalidates them. Bump
+`CONTEXT_CACHE_VERSION` when anything else that shapes a context result
+changes, such as this module's entry format.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from lib.context import context_sources_fingerprint
+
+
+CONTEXT_CACHE_MODES = ("use", "refresh", "off")
+CONTEXT_CACHE_VERSION = 2
+
+
+def prefix_digests(rows: list[dict[str, Any]]) -> list[str]:
+    """Chained hashes so `digests[i]` identifies the slice `rows[: i + 1]`."""
+    digests: list[str] = []
+    prev = ""
+    for row in rows:
+        material = prev + json.dumps(row, sort_keys=True, separators=(",", ":"))
+        prev = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        digests.append(prev)
+    return digests
+
+
+class ContextCache:
+    """Context results stored as `<cache_dir>/<key>.json`.
+
+    `mode="refresh"` recomputes every context and overwrites its entry;
+    `mode="off"` bypasses the cache entirely.
+    """
+
+    def __init__(self, cache_dir: Path, *, mode: str = "use") -> None:
+        if mode not in CONTEXT_CACHE_MODES:
+            raise ValueError(f"unsupported context cache mode: {mode}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def readable(self) -> bool:
+        return self.mode == "use"
+
+    @property
+    def writable(self) -> bool:
+        return self.mode in {"use", "refresh"}
+
+    def key(
+        self,
+        *,
+        history_digest: str,
+        symbol: str,
+        modules: str,
+        position_state: str,
+        min_rr_required: float,
+    ) -> str:
+        payload = {
+            "version": CONTEXT_CACHE_VERSION,
+            "history": history_digest,
+            "symbol": symbol.strip().upper(),
+            "modules": modules,
+            "position_state": position_state,
+            "min_rr_required": float(min_rr_required),
+            "sources": context_sources_fingerprint(),
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def has(self, key: str) -> bool:
+        return self.readable and self._path(key).is_file()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        if not self.readable:
+            self.misses += 1
+            return None
+        try:
+            result = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        if not self.writable:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Scenario workers may share symbols, so write-then-rename.
+        tmp_path = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path(key))
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "dir": str(self.cache_dir),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
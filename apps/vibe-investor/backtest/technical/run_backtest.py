@@ -10,7 +10,7 @@ import subprocess
 import sys
 import tempfile
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
-from dataclasses import asdict
+from dataclasses import asdict, replace
 from pathlib import Path
 from typing import Any
 
@@ -42,7 +42,16 @@ from lib.execution import (
     update_trailing_stop,
     update_position_counters,
 )
-from lib.context import build_daily_context, ensure_skill_path
+from lib.context import (
+    CONTEXT_ENGINES,
+    VisibleHistory,
+    build_daily_context,
+    build_daily_context_inprocess,
+    daily_slice_frame,
+    ensure_skill_path,
+    stream_daily_features,
+)
+from lib.context_cache import CONTEXT_CACHE_MODES, ContextCache, prefix_digests
 from lib.report import build_report
 from lib.llm_policy import (
     CodexCliAdapter,
@@ -78,12 +87,14 @@ def _bar_trade_date(bar: pd.Series) -> str:
 def _context_for_position_state(
     *,
     contexts: dict[str, dict[str, dict[str, Any]]],
-    payloads: dict[str, dict[str, Any]],
+    histories: dict[str, VisibleHistory],
     scenario_id: str,
     contexts_dir: Path,
     symbol: str,
     modules: str,
     min_rr_required: float,
+    context_engine: str,
+    context_cache: ContextCache,
     trade_date: str,
     position_state: str,
 ) -> dict[str, Any]:
@@ -92,18 +103,29 @@ def _context_for_position_state(
     cached = state_contexts.get(desired_state)
     if cached is not None:
         return cached
-    payload = payloads.get(trade_date)
-    if payload is None:
-        raise KeyError(f"missing cached history payload for {trade_date}")
+    day_history = histories.get(trade_date)
+    if day_history is None:
+        raise KeyError(f"missing cached visible history for {trade_date}")
+    result = _load_cached_context(
+        context_cache=context_cache, day_history=day_history,
+        context_path=contexts_dir / f"{trade_date}.{desired_state}.json",
+        symbol=symbol, modules=modules, position_state=desired_state,
+        min_rr_required=min_rr_required,
+    )
+    if result is not None:
+        state_contexts[desired_state] = result
+        return result
     _, built_state, result = _build_single_context(
         scenario_id=scenario_id,
         trade_date=trade_date,
-        day_history_payload=payload,
+        day_history=day_history,
         contexts_dir=contexts_dir,
         symbol=symbol,
         modules=modules,
         position_state=desired_state,
         min_rr_required=min_rr_required,
+        context_engine=context_engine,
+        context_cache=context_cache,
     )
     state_contexts[built_state] = result
     return result
@@ -275,58 +297,143 @@ def _summarize_strategy(
 # Context building
 # ---------------------------------------------------------------------------
 
+def _context_cache_key(
+    *, context_cache: ContextCache, day_history: VisibleHistory, symbol: str, modules: str,
+    position_state: str, min_rr_required: float,
+) -> str:
+    if day_history.digest is None:
+        raise ValueError("visible history is missing its content digest")
+    return context_cache.key(
+        history_digest=day_history.digest, symbol=symbol, modules=modules,
+        position_state=position_state, min_rr_required=min_rr_required,
+    )
+
+
+def _load_cached_context(
+    *, context_cache: ContextCache, day_history: VisibleHistory, context_path: Path,
+    symbol: str, modules: str, position_state: str, min_rr_required: float,
+) -> dict[str, Any] | None:
+    """Return a cached context (and write its context file), or None on a miss."""
+    result = context_cache.get(_context_cache_key(
+        context_cache=context_cache, day_history=day_history, symbol=symbol,
+        modules=modules, position_state=position_state, min_rr_required=min_rr_required,
+    ))
+    if result is not None:
+        with context_path.open("w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
 def _build_single_context(
-    *, scenario_id: str, trade_date: str, day_history_payload: dict[str, Any],
+    *, scenario_id: str, trade_date: str, day_history: VisibleHistory,
     contexts_dir: Path, symbol: str, modules: str, position_state: str, min_rr_required: float,
+    context_engine: str,
+    context_cache: ContextCache,
 ) -> tuple[str, str, dict[str, Any]]:
-    """Build context for a single bar. Designed to run in a thread."""
-    with tempfile.TemporaryDirectory(prefix=f"{scenario_id}-{trade_date}-") as tempdir:
-        snapshot_path = Path(tempdir) / "snapshot.json"
-        context_path = contexts_dir / f"{trade_date}.{position_state}.json"
-        with snapshot_path.open("w", encoding="utf-8") as f:
-            json.dump(day_history_payload, f, indent=2)
-        result = build_daily_context(
-            snapshot_path=snapshot_path, context_path=context_path,
+    """Build context for a single bar with the selected context engine and cache it."""
+    context_path = contexts_dir / f"{trade_date}.{position_state}.json"
+    if context_engine == "inprocess":
+        if day_history.features is not None:
+            daily = day_history.features
+        else:
+            daily = daily_slice_frame(day_history.bars)
+        result = build_daily_context_inprocess(
+            daily=daily, context_path=context_path,
             symbol=symbol, modules=modules, position_state=position_state,
             min_rr_required=min_rr_required,
+            structure_events=day_history.structure_events,
+            wyckoff=day_history.wyckoff,
+            volume_profile=day_history.volume_profile,
         )
+    else:
+        with tempfile.TemporaryDirectory(prefix=f"{scenario_id}-{trade_date}-") as tempdir:
+            snapshot_path = Path(tempdir) / "snapshot.json"
+            with snapshot_path.open("w", encoding="utf-8") as f:
+                json.dump(_daily_slice_to_payload(day_history.bars), f, indent=2)
+            result = build_daily_context(
+                snapshot_path=snapshot_path, context_path=context_path,
+                symbol=symbol, modules=modules, position_state=position_state,
+                min_rr_required=min_rr_required,
+            )
+    context_cache.put(
+        _context_cache_key(
+            context_cache=context_cache, day_history=day_history, symbol=symbol,
+            modules=modules, position_state=position_state, min_rr_required=min_rr_required,
+        ),
+        result,
+    )
     return trade_date, position_state, result
 
 
 def _build_contexts(
     *, scenario: BacktestScenario, history: pd.DataFrame, window: pd.DataFrame,
-    contexts_dir: Path, modules: str, min_rr_required: float,
-) -> tuple[dict[str, dict[str, dict[str, Any]]], dict[str, dict[str, Any]]]:
-    # Pre-compute payloads (cheap) then build flat contexts in parallel.
-    bar_jobs: list[tuple[str, dict[str, Any]]] = []
+    contexts_dir: Path, modules: str, min_rr_required: float, context_engine: str,
+    context_cache: ContextCache,
+) -> tuple[dict[str, dict[str, dict[str, Any]]], dict[str, VisibleHistory]]:
+    if context_engine not in CONTEXT_ENGINES:
+        raise ValueError(f"unsupported context engine: {context_engine}")
+    # History is date-sorted, so each visible slice is a prefix of it and the
+    # chained digest of its last row identifies the whole slice.
+    digests = prefix_digests(_daily_slice_to_payload(history)["daily"])
+    histories: dict[str, VisibleHistory] = {}
     for _, bar in window.iterrows():
         trade_date = _bar_trade_date(bar)
         day_history = _history_visible(history, bar)
         if day_history.empty:
             raise ValueError(f"scenario {scenario.id}: empty visible history on {trade_date}")
-        bar_jobs.append((trade_date, _daily_slice_to_payload(day_history)))
+        histories[trade_date] = VisibleHistory(day_history, digest=digests[len(day_history) - 1])
+
+    contexts: dict[str, dict[str, dict[str, Any]]] = {td: {} for td in histories}
+    misses: list[str] = []
+    for td, day_history in histories.items():
+        cached = _load_cached_context(
+            context_cache=context_cache, day_history=day_history,
+            context_path=contexts_dir / f"{td}.flat.json", symbol=scenario.symbol,
+            modules=modules, position_state="flat", min_rr_required=min_rr_required,
+        )
+        if cached is not None:
+            contexts[td]["flat"] = cached
+        else:
+            misses.append(td)
+    if not misses:
+        return contexts, histories
 
-    payloads = {trade_date: payload for trade_date, payload in bar_jobs}
-    contexts: dict[str, dict[str, dict[str, Any]]] = {
-        trade_date: {} for trade_date, _ in bar_jobs
-    }
-    max_workers = min(len(bar_jobs), os.cpu_count() or 4)
+    if context_engine == "inprocess":
+        streamed = stream_daily_features(
+            daily_slice_frame(history), [len(histories[td].bars) for td in misses]
+        )
+        # Pandas work holds the GIL, so threads would only add contention here.
+        for td in misses:
+            histories[td] = replace(histories[td], **streamed[len(histories[td].bars)])
+            _, position_state, result = _build_single_context(
+                scenario_id=scenario.id, trade_date=td, day_history=histories[td],
+                contexts_dir=contexts_dir, symbol=scenario.symbol,
+                modules=modules, position_state="flat",
+                min_rr_required=min_rr_required, context_engine=context_engine,
+                context_cache=context_cache,
+            )
+            contexts[td][position_state] = result
+        return contexts, histories
+
+    # Subprocess isolation: each bar is its own interpreter, so fan out with threads.
+    max_workers = min(len(misses), os.cpu_count() or 4)
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
         futures = {
             pool.submit(
                 _build_single_context,
-                scenario_id=scenario.id, trade_date=td, day_history_payload=payload,
+                scenario_id=scenario.id, trade_date=td, day_history=histories[td],
                 contexts_dir=contexts_dir, symbol=scenario.symbol,
                 modules=modules, position_state="flat",
-                min_rr_required=min_rr_required,
+                min_rr_required=min_rr_required, context_engine=context_engine,
+                context_cache=context_cache,
             ): td
-            for td, payload in bar_jobs
+            for td in misses
         }
         for future in as_completed(futures):
             td, position_state, result = future.result()
             state_contexts = contexts.setdefault(td, {})
             state_contexts[position_state] = result
-    return contexts, payloads
+    return contexts, histories
 
 
 def _context_path_for_state(trade_date: str, position_state: str) -> str:
@@ -365,10 +472,12 @@ def _simulate_strategy(
     *, strategy_name: str, scenario: BacktestScenario,
     history: pd.DataFrame, window: pd.DataFrame,
     contexts: dict[str, dict[str, dict[str, Any]]],
-    payloads: dict[str, dict[str, Any]],
+    histories: dict[str, VisibleHistory],
     contexts_dir: Path,
     modules: str,
     min_rr_required: float,
+    context_engine: str,
+    context_cache: ContextCache,
     actual_summary: dict[str, Any] | None,
 ) -> dict[str, Any]:
     daily_logs: list[dict[str, Any]] = []
@@ -385,12 +494,14 @@ def _simulate_strategy(
         first_day = _bar_trade_date(window.iloc[0])
         init_context = _context_for_position_state(
             contexts=contexts,
-            payloads=payloads,
+            histories=histories,
             scenario_id=scenario.id,
             contexts_dir=contexts_dir,
             symbol=scenario.symbol,
             modules=modules,
             min_rr_required=min_rr_required,
+            context_engine=context_engine,
+            context_cache=context_cache,
             trade_date=first_day,
             position_state="long",
         )
@@ -411,12 +522,14 @@ def _simulate_strategy(
         if pending_order is not None and pending_order.intended_entry_date == trade_date:
             signal_context = _context_for_position_state(
                 contexts=contexts,
-                payloads=payloads,
+                histories=histories,
                 scenario_id=scenario.id,
                 contexts_dir=contexts_dir,
                 symbol=scenario.symbol,
                 modules=modules,
                 min_rr_required=min_rr_required,
+                context_engine=context_engine,
+                context_cache=context_cache,
                 trade_date=pending_order.signal_date,
                 position_state="flat",
             )
@@ -431,12 +544,14 @@ def _simulate_strategy(
         current_position_state = "long" if open_position is not None else "flat"
         context = _context_for_position_state(
             contexts=contexts,
-            payloads=payloads,
+            histories=histories,
             scenario_id=scenario.id,
             contexts_dir=contexts_dir,
             symbol=scenario.symbol,
             modules=modules,
             min_rr_required=min_rr_required,
+            context_engine=context_engine,
+            context_cache=context_cache,
             trade_date=trade_date,
             position_state=current_position_state,
         )
@@ -627,10 +742,12 @@ def _simulate_llm_ablation(
     history: pd.DataFrame,
     window: pd.DataFrame,
     contexts: dict[str, dict[str, dict[str, Any]]],
-    payloads: dict[str, dict[str, Any]],
+    histories: dict[str, VisibleHistory],
     contexts_dir: Path,
     modules: str,
     min_rr_required: float,
+    context_engine: str,
+    context_cache: ContextCache,
     actual_summary: dict[str, Any] | None,
 ) -> dict[str, Any]:
     if llm_mode not in {"llm_dry_run", "llm_hybrid"}:
@@ -664,12 +781,14 @@ def _simulate_llm_ablation(
         first_day = _bar_trade_date(window.iloc[0])
         init_context = _context_for_position_state(
             contexts=contexts,
-            payloads=payloads,
+            histories=histories,
             scenario_id=scenario.id,
             contexts_dir=contexts_dir,
             symbol=scenario.symbol,
             modules=modules,
             min_rr_required=min_rr_required,
+            context_engine=context_engine,
+            context_cache=context_cache,
             trade_date=first_day,
             position_state="long",
         )
@@ -692,12 +811,14 @@ def _simulate_llm_ablation(
         if pending_order is not None and pending_order.intended_entry_date == trade_date:
             signal_context = _context_for_position_state(
                 contexts=contexts,
-                payloads=payloads,
+                histories=histories,
                 scenario_id=scenario.id,
                 contexts_dir=contexts_dir,
                 symbol=scenario.symbol,
                 modules=modules,
                 min_rr_required=min_rr_required,
+                context_engine=context_engine,
+                context_cache=context_cache,
                 trade_date=pending_order.signal_date,
                 position_state="flat",
             )
@@ -716,12 +837,14 @@ def _simulate_llm_ablation(
         current_position_state = "long" if open_position is not None else "flat"
         context = _context_for_position_state(
             contexts=contexts,
-            payloads=payloads,
+            histories=histories,
             scenario_id=scenario.id,
             contexts_dir=contexts_dir,
             symbol=scenario.symbol,
             modules=modules,
             min_rr_required=min_rr_required,
+            context_engine=context_engine,
+            context_cache=context_cache,
             trade_date=trade_date,
             position_state=current_position_state,
         )
@@ -1157,6 +1280,21 @@ def _llm_batch_summary(results: list[dict[str, Any]]) -> dict[str, Any] | None:
     }
 
 
+def _context_cache_batch_summary(
+    context_cache: ContextCache, results: list[dict[str, Any]],
+) -> dict[str, Any]:
+    hits = sum(int(item.get("context_cache", {}).get("hits", 0)) for item in results)
+    misses = sum(int(item.get("context_cache", {}).get("misses", 0)) for item in results)
+    lookups = hits + misses
+    return {
+        "mode": context_cache.mode,
+        "dir": str(context_cache.cache_dir),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Scenario runner
 # ---------------------------------------------------------------------------
@@ -1171,6 +1309,8 @@ def run_scenario(
     llm_model: str,
     ablation_only: bool,
     llm_infer_soft_limit: int,
+    context_engine: str,
+    context_cache: ContextCache,
 ) -> dict[str, Any]:
     history, window = _prepare_daily_frames(scenario)
     actual_summary = _compute_actual_trade_summary(scenario)
@@ -1178,9 +1318,11 @@ def run_scenario(
     contexts_dir = scenario_dir / "contexts"
     scenario_dir.mkdir(parents=True, exist_ok=True)
     contexts_dir.mkdir(parents=True, exist_ok=True)
-    contexts, payloads = _build_contexts(
+    contexts, histories = _build_contexts(
         scenario=scenario, history=history, window=window,
         contexts_dir=contexts_dir, modules=modules, min_rr_required=min_rr_required,
+        context_engine=context_engine,
+        context_cache=context_cache,
     )
     deterministic_ablation = _simulate_strategy(
         strategy_name="ablation",
@@ -1188,10 +1330,12 @@ def run_scenario(
         history=history,
         window=window,
         contexts=contexts,
-        payloads=payloads,
+        histories=histories,
         contexts_dir=contexts_dir,
         modules=modules,
         min_rr_required=min_rr_required,
+        context_engine=context_engine,
+        context_cache=context_cache,
         actual_summary=actual_summary,
     )
     selected_ablation = deterministic_ablation
@@ -1205,10 +1349,12 @@ def run_scenario(
             history=history,
             window=window,
             contexts=contexts,
-            payloads=payloads,
+            histories=histories,
             contexts_dir=contexts_dir,
             modules=modules,
             min_rr_required=min_rr_required,
+            context_engine=context_engine,
+            context_cache=context_cache,
             actual_summary=actual_summary,
         )
     strategy_results = {"ablation": selected_ablation}
@@ -1222,10 +1368,12 @@ def run_scenario(
                 history=history,
                 window=window,
                 contexts=contexts,
-                payloads=payloads,
+                histories=histories,
                 contexts_dir=contexts_dir,
                 modules=modules,
                 min_rr_required=min_rr_required,
+                context_engine=context_engine,
+                context_cache=context_cache,
                 actual_summary=actual_summary,
             )
     result = {
@@ -1247,6 +1395,7 @@ def run_scenario(
         "trade_ledger": strategy_results["ablation"]["trade_ledger"],
         "open_position": strategy_results["ablation"]["open_position"],
         "scenario_summary": strategy_results["ablation"]["scenario_summary"],
+        "context_cache": context_cache.stats(),
     }
     with (scenario_dir / "result.json").open("w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
@@ -1294,6 +1443,23 @@ def main() -> None:
         action="store_true",
         help="Run only the ablation strategy and skip other baseline strategies.",
     )
+    parser.add_argument(
+        "--context-engine",
+        choices=list(CONTEXT_ENGINES),
+        default="inprocess",
+        help="Build TA contexts in-process (default) or in one subprocess per bar for isolation.",
+    )
+    parser.add_argument(
+        "--context-cache",
+        choices=list(CONTEXT_CACHE_MODES),
+        default="use",
+        help="Reuse cached TA contexts (default), rebuild and overwrite them (refresh), or bypass the cache (off).",
+    )
+    parser.add_argument(
+        "--context-cache-dir",
+        default=str(Path(__file__).resolve().parent / "work" / "context-cache"),
+        help="Directory for the content-addressed TA context cache (default: work/context-cache next to this script).",
+    )
     args = parser.parse_args()
 
     manifest_path = Path(args.manifest).expanduser().resolve()
@@ -1315,6 +1481,9 @@ def main() -> None:
         max_scenarios = min(len(scenarios), os.cpu_count() or 4)
     else:
         max_scenarios = min(len(scenarios), max(1, int(args.llm_max_parallel)))
+    context_cache = ContextCache(
+        Path(args.context_cache_dir).expanduser().resolve(), mode=args.context_cache,
+    )
     with ProcessPoolExecutor(max_workers=max_scenarios) as pool:
         future_to_idx = {
             pool.submit(
@@ -1326,6 +1495,8 @@ def main() -> None:
                 llm_model=args.llm_model,
                 ablation_only=bool(args.ablation_only),
                 llm_infer_soft_limit=int(args.llm_infer_soft_limit),
+                context_engine=args.context_engine,
+                context_cache=context_cache,
             ): i
             for i, scenario in enumerate(scenarios)
         }
@@ -1345,6 +1516,8 @@ def main() -> None:
         "ablation_only": bool(args.ablation_only),
         "selected_scenarios": [s.id for s in scenarios],
         "llm_infer_soft_limit": int(args.llm_infer_soft_limit),
+        "context_engine": args.context_engine,
+        "context_cache": _context_cache_batch_summary(context_cache, results),
         "scenario_count": len(results),
         "batch_summary": strategy_batch_summaries["ablation"],
         "strategy_batch_summaries": strategy_batch_summaries,